@@ -1,37 +1,153 @@
+import threading
 import pygame
 import numpy as np
+from core.assets import assets
+from audio.layer_cache import layer_cache_key, load_layers, save_layers
+from settings import ENGINE_AUDIO_BACKEND
+
+
+# Looping pitch layers, each holding one mixer channel
+ENGINE_LAYERS = 12
 
 
 class EngineSound:
-    def __init__(self, sound_path):
-        self.base_sound = pygame.mixer.Sound(sound_path)
-        self.base_array = pygame.sndarray.array(self.base_sound)
+    def __init__(self, sound_path, first_channel=0, voice=None, background=True):
+        self.sound_path = sound_path
+        self.first_channel = first_channel
+
+        # With a voice, the VoiceManager hands out one channel per
+        # active layer (or none, when culled) and the stereo volume;
+        # otherwise layer i plays on channel first_channel + i.
+        self.voice = voice
 
         self.layers = []
         self.channels = []
 
-        self.num_layers = 12
+        self.num_layers = ENGINE_LAYERS
         self.min_pitch = 0.5
         self.max_pitch = 1.6
 
         self.current_rpm = 0.0
         self.rpm_smoothing = 2.0   # higher = faster response
 
+        # Layers blended between; the rest are paused so the mixer skips them
+        self.active_layers = list(range(self.num_layers))
+        if voice is not None:
+            voice.width = self.num_layers
+
+        # Layers are loaded from the on-disk cache, or decoded and
+        # resampled on a worker thread; the engine is silent until then.
+        self.ready = False
+        self.error = None
+        self._layer_arrays = None
+
+        if background:
+            self._worker = threading.Thread(target=self._build_layers, daemon=True)
+            self._worker.start()
+        else:
+            self._worker = None
+            self._build_layers()
+            self._start_playback()
+
+    # ==========================================================
+    # LOADING
+    # ==========================================================
+    def _build_layers(self):
+        try:
+            key = layer_cache_key(
+                self.sound_path,
+                self.num_layers,
+                self.min_pitch,
+                self.max_pitch,
+                pygame.mixer.get_init()
+            )
+
+            arrays = load_layers(key, self.num_layers)
+
+            if arrays is None:
+                base_array = pygame.sndarray.array(assets.sound(self.sound_path))
+
+                # Pre-generate pitch layers
+                arrays = []
+                for i in range(self.num_layers):
+                    ratio = i / (self.num_layers - 1)
+                    pitch = self.min_pitch + ratio * (self.max_pitch - self.min_pitch)
+                    arrays.append(self._resample(base_array, pitch))
+
+                save_layers(key, arrays)
+
+            self._layer_arrays = arrays
+        except Exception as e:
+            self.error = e
+
+    def _start_playback(self):
+        arrays = self._layer_arrays
+        self._layer_arrays = None
+
+        if arrays is None:
+            return
+
+        self.layers = [
+            pygame.sndarray.make_sound(np.ascontiguousarray(array))
+            for array in arrays
+        ]
+        self.ready = True
+
+        # Voiced layers start once the manager hands out channels
+        if self.voice is not None:
+            return
+
+        for i, sound in enumerate(self.layers):
+            channel = pygame.mixer.Channel(self.first_channel + i)
+            channel.play(sound, loops=-1)
+            channel.set_volume(0)
+            self.channels.append(channel)
 
-        # Pre-generate pitch layers
-        for i in range(self.num_layers):
-            ratio = i / (self.num_layers - 1)
-            pitch = self.min_pitch + ratio * (self.max_pitch - self.min_pitch)
+        self._pause_inactive()
 
-            pitched = self._resample(self.base_array, pitch)
-            sound = pygame.sndarray.make_sound(pitched)
+    def poll(self):
+        # Start playback on the main thread once the worker is done
+        if self.ready or self._worker is None or self._worker.is_alive():
+            return self.ready
 
-            channel = pygame.mixer.Channel(i)
-            channel.play(sound, loops=-1)
+        self._start_playback()
+        return self.ready
+
+    def wait(self):
+        if self._worker is not None:
+            self._worker.join()
+        return self.poll()
+
+    def set_active_layers(self, count):
+        """Blend between `count` evenly spaced pitch layers instead of all of them."""
+        count = max(2, min(count, self.num_layers))
+        last = self.num_layers - 1
+
+        self.active_layers = sorted({round(i * last / (count - 1)) for i in range(count)})
+
+        # A voice just asks for fewer channels; the manager frees the rest
+        if self.voice is not None:
+            self.voice.width = len(self.active_layers)
+        elif self.ready:
+            self._pause_inactive()
+
+    def _bind(self, channels):
+        # New channels from the manager: restart the active layers on them together
+        for channel, layer in zip(channels, self.active_layers):
+            channel.play(self.layers[layer], loops=-1)
             channel.set_volume(0)
 
-            self.layers.append(sound)
-            self.channels.append(channel)
+        self.channels = list(channels)
+
+    def _pause_inactive(self):
+        active = set(self.active_layers)
+
+        for i, channel in enumerate(self.channels):
+            channel.set_volume(0)
+            if i in active:
+                channel.unpause()
+            else:
+                channel.pause()
 
     def _resample(self, array, pitch):
         new_length = int(len(array) / pitch)
@@ -44,22 +160,68 @@ class EngineSound:
 
         return array[indices]
 
+    # ==========================================================
+    # UPDATE
+    # ==========================================================
     def update(self, rpm_ratio, dt):
+        if not self.ready and not self.poll():
+            return
+
         rpm_ratio = max(0, min(rpm_ratio, 1))
 
         # Smooth RPM toward target
         self.current_rpm += (rpm_ratio - self.current_rpm) * self.rpm_smoothing * dt
 
-        position = self.current_rpm * (self.num_layers - 1)
+        active = self.active_layers
+        position = self.current_rpm * (len(active) - 1)
 
         lower = int(position)
-        upper = min(lower + 1, self.num_layers - 1)
+        upper = min(lower + 1, len(active) - 1)
 
         blend = position - lower
 
-        for i in range(self.num_layers):
-            self.channels[i].set_volume(0)
+        if self.voice is None:
+            for i in active:
+                self.channels[i].set_volume(0)
+
+            self.channels[active[lower]].set_volume(1 - blend)
+            self.channels[active[upper]].set_volume(blend)
+            return
+
+        # Revving engines are louder, and win channels more easily
+        voice = self.voice
+        voice.loudness = 0.6 + 0.4 * self.current_rpm
+
+        if voice.channels != self.channels:
+            self._bind(voice.channels)
+
+        # Culled (the manager has stopped the layers), or the layer
+        # count just changed and a new block comes on the next update
+        if len(self.channels) != len(active):
+            return
+
+        # Channels line up with the active layers
+        for channel in self.channels:
+            channel.set_volume(0)
+
+        left, right = voice.left, voice.right
+        self.channels[lower].set_volume((1 - blend) * left, (1 - blend) * right)
+        if upper != lower:
+            self.channels[upper].set_volume(blend * left, blend * right)
+
+
+def create_engine_sound(sound_path, backend=ENGINE_AUDIO_BACKEND, voices=None, anchor=None, priority=0.0):
+    # Either backend gets a voice from `voices`: one channel to stream
+    # into, or a block of one per active layer
+    voice = None
+    if voices is not None:
+        voice = voices.create_voice(anchor, priority=priority)
+
+    if backend == "stream":
+        from audio.engine_stream import StreamingEngineSound
+        return StreamingEngineSound(sound_path, voice=voice)
 
-        self.channels[lower].set_volume(1 - blend)
-        self.channels[upper].set_volume(blend)
+    if backend == "layers":
+        return EngineSound(sound_path, voice=voice)
 
+    raise ValueError(f"Unknown engine audio backend: {backend}")
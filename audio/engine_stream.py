@@ -0,0 +1,182 @@
+import threading
+import pygame
+import numpy as np
+from core.assets import assets
+from audio.layer_cache import layer_cache_key, load_layers, save_layers
+from settings import FPS, ENGINE_STREAM_BUFFER, ENGINE_STREAM_LEAD, ENGINE_STREAM_MAX_LEAD
+
+
+# Sample dtype per mixer size, as pygame.sndarray uses them (32-bit is float)
+SAMPLE_TYPES = {
+    8: np.uint8,
+    -8: np.int8,
+    16: np.uint16,
+    -16: np.int16,
+    32: np.float32,
+    -32: np.float32,
+}
+
+
+class StreamingEngineSound:
+    """
+    Engine audio rendered on the fly into one mixer channel.
+
+    Instead of looping a pre-pitched copy of the sample per RPM band,
+    the source sample is read at a variable rate with linear
+    interpolation and streamed in small buffers through a single
+    channel's queue. Pitch glides across each buffer so RPM changes
+    stay smooth. Memory stays at one copy of the sample however fine
+    the pitch steps are.
+
+    Each buffer covers `lead` of the longest recent frame times (at
+    least buffer_frames), so a hitch that outlasts one frame still
+    finds audio queued instead of a dropout.
+    """
+
+    def __init__(self, sound_path, channel=None, voice=None, background=True):
+        self.sound_path = sound_path
+
+        # With a voice, the VoiceManager decides the channel (or none,
+        # when culled) and the stereo volume; otherwise use `channel`.
+        self.voice = voice
+        self.channel = channel
+
+        self.min_pitch = 0.5
+        self.max_pitch = 1.6
+        self.buffer_frames = ENGINE_STREAM_BUFFER
+        self.lead = ENGINE_STREAM_LEAD
+        self.max_lead = ENGINE_STREAM_MAX_LEAD
+        self.volume = 1.0
+
+        # Longest recent frame time, decaying back once hitches stop
+        self.frame_time = 1 / FPS
+
+        self.current_rpm = 0.0
+        self.rpm_smoothing = 2.0   # higher = faster response
+
+        self.source = None
+        self.phase = 0.0
+        self.pitch = self.min_pitch
+
+        self.ready = False
+        self.error = None
+
+        if background:
+            self._worker = threading.Thread(target=self._load, daemon=True)
+            self._worker.start()
+        else:
+            self._worker = None
+            self._load()
+            self.poll()
+
+    # ==========================================================
+    # LOADING
+    # ==========================================================
+    def _load(self):
+        try:
+            mixer_format = pygame.mixer.get_init()
+            self.frequency, size, self.channels = mixer_format
+            self.sample_type = SAMPLE_TYPES[size]
+
+            # The float source is cached like a single unpitched layer,
+            # so the sample is only decoded on a miss
+            key = layer_cache_key(self.sound_path, 1, 1.0, 1.0, mixer_format)
+            cached = load_layers(key, 1)
+
+            if cached is None:
+                array = pygame.sndarray.array(assets.sound(self.sound_path))
+                source = array.astype(np.float32)
+                save_layers(key, [source])
+            else:
+                source = cached[0]
+
+            if source.shape[1:] != ((self.channels,) if self.channels > 1 else ()):
+                raise ValueError(f"sample shape {source.shape} doesn't fit a {self.channels}-channel mixer")
+
+            self.source = source
+        except Exception as e:
+            self.error = e
+
+    def poll(self):
+        if self.ready or self.source is None:
+            return self.ready
+
+        if self.channel is None and self.voice is None:
+            self.channel = pygame.mixer.find_channel(True)
+
+        self.ready = True
+        return True
+
+    def wait(self):
+        if self._worker is not None:
+            self._worker.join()
+        return self.poll()
+
+    # ==========================================================
+    # RENDERING
+    # ==========================================================
+    def render(self, target_pitch, frames=None):
+        """Render the next buffer, gliding from the last pitch to target_pitch."""
+        length = len(self.source)
+        if frames is None:
+            frames = self.buffer_frames
+
+        steps = np.linspace(self.pitch, target_pitch, frames, dtype=np.float64)
+        positions = self.phase + np.cumsum(steps) - steps[0]
+
+        self.phase = (positions[-1] + steps[-1]) % length
+        self.pitch = target_pitch
+
+        positions %= length
+        index = positions.astype(np.int64)
+        frac = (positions - index).astype(np.float32)
+        following = index + 1
+        following[following == length] = 0
+
+        if self.source.ndim > 1:
+            frac = frac[:, None]
+
+        samples = self.source[index] * (1 - frac) + self.source[following] * frac
+        return pygame.sndarray.make_sound(samples.astype(self.sample_type))
+
+    def frames_ahead(self, dt):
+        """Frames per buffer to cover `lead` of the longest recent frames."""
+        self.frame_time = max(dt, self.frame_time * 0.99, 1 / FPS)
+
+        lead = min(self.frame_time * self.lead, self.max_lead)
+        return max(self.buffer_frames, int(lead * self.frequency))
+
+    # ==========================================================
+    # UPDATE
+    # ==========================================================
+    def update(self, rpm_ratio, dt):
+        if not self.ready and not self.poll():
+            return
+
+        rpm_ratio = max(0, min(rpm_ratio, 1))
+
+        # Smooth RPM toward target
+        self.current_rpm += (rpm_ratio - self.current_rpm) * self.rpm_smoothing * dt
+
+        if self.voice is not None:
+            # Revving engines are louder, and win channels more easily
+            self.voice.loudness = 0.6 + 0.4 * self.current_rpm
+            self.channel = self.voice.channel
+
+        # Culled voices skip rendering entirely
+        if self.channel is None:
+            return
+
+        target_pitch = self.min_pitch + self.current_rpm * (self.max_pitch - self.min_pitch)
+        frames = self.frames_ahead(dt)
+
+        # Keep one buffer playing and one queued behind it
+        if not self.channel.get_busy():
+            self.channel.play(self.render(target_pitch, frames))
+        if self.channel.get_queue() is None:
+            self.channel.queue(self.render(target_pitch, frames))
+
+        if self.voice is not None:
+            self.voice.apply_volume(self.volume)
+        else:
+            self.channel.set_volume(self.volume)
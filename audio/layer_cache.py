@@ -0,0 +1,60 @@
+import hashlib
+import os
+import shutil
+import numpy as np
+from settings import AUDIO_CACHE_DIR
+
+
+# Bump when the resampling changes, so stale layers are never reused
+CACHE_VERSION = 1
+
+
+def layer_cache_key(sound_path, num_layers, min_pitch, max_pitch, mixer_format):
+    digest = hashlib.sha1()
+
+    with open(sound_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+
+    digest.update(
+        repr((CACHE_VERSION, num_layers, min_pitch, max_pitch, mixer_format)).encode()
+    )
+
+    return digest.hexdigest()
+
+
+def _layer_path(directory, index):
+    return os.path.join(directory, f"layer_{index:02d}.npy")
+
+
+def load_layers(key, num_layers, cache_dir=AUDIO_CACHE_DIR):
+    """Memory-map cached layers, or return None on a miss."""
+    directory = os.path.join(cache_dir, key)
+
+    try:
+        return [
+            np.load(_layer_path(directory, i), mmap_mode="r")
+            for i in range(num_layers)
+        ]
+    except (OSError, ValueError):
+        return None
+
+
+def save_layers(key, layers, cache_dir=AUDIO_CACHE_DIR):
+    directory = os.path.join(cache_dir, key)
+    staging = directory + f".tmp{os.getpid()}"
+
+    os.makedirs(staging, exist_ok=True)
+    for i, layer in enumerate(layers):
+        np.save(_layer_path(staging, i), layer)
+
+    # Only saved after a miss, so an entry already here is unreadable;
+    # os.replace can't swap a directory onto a non-empty one
+    shutil.rmtree(directory, ignore_errors=True)
+
+    # Publish atomically so a crash never leaves a half-written entry
+    try:
+        os.replace(staging, directory)
+    except OSError:
+        # Another process got there first
+        shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,148 @@
+import math
+import pygame
+from settings import (
+    VOICE_REFERENCE_DISTANCE,
+    VOICE_MAX_DISTANCE,
+    VOICE_PAN_DISTANCE,
+    VOICE_AUDIBLE_THRESHOLD,
+)
+
+
+class Voice:
+    """
+    A sound source asking for a mixer channel.
+
+    anchor is any object with a `position` (usually a Car); voices
+    without one play at the listener. A voice asks for `width`
+    channels at once (a layered engine needs one per layer) and gets
+    all of them or none. After VoiceManager.update the voice has its
+    channels (empty when culled or stolen) and the left and right
+    volumes to play at.
+    """
+
+    def __init__(self, anchor=None, loudness=1.0, priority=0.0, width=1):
+        self.anchor = anchor
+        self.loudness = loudness
+        self.priority = priority
+        self.width = width
+
+        self.channels = []
+        self.gain = 0.0
+        self.left = 0.0
+        self.right = 0.0
+        self.audibility = 0.0
+
+    @property
+    def channel(self):
+        return self.channels[0] if self.channels else None
+
+    @property
+    def active(self):
+        return bool(self.channels)
+
+    def apply_volume(self, volume=1.0):
+        for channel in self.channels:
+            channel.set_volume(self.left * volume, self.right * volume)
+
+
+class VoiceManager:
+    """
+    Shares a fixed block of mixer channels between any number of voices.
+
+    Every update, voices are ranked by how loud they would be at the
+    listener (distance attenuation times loudness) plus their priority.
+    Voices take channels in that order while enough are left for
+    their width; the rest are culled, and a voice pushed out of the
+    budget has its channels stolen.
+    """
+
+    def __init__(self, first_channel, num_channels):
+        self.channels = [
+            pygame.mixer.Channel(i)
+            for i in range(first_channel, first_channel + num_channels)
+        ]
+        self.free_channels = list(self.channels)
+        self.voices = []
+
+        self.steals = 0
+
+    # ==========================================================
+    # VOICES
+    # ==========================================================
+    def create_voice(self, anchor=None, loudness=1.0, priority=0.0, width=1):
+        voice = Voice(anchor, loudness, priority, width)
+        self.voices.append(voice)
+        return voice
+
+    def release(self, voice):
+        self._take_channels(voice)
+        self.voices.remove(voice)
+
+    # ==========================================================
+    # UPDATE
+    # ==========================================================
+    def update(self, listener_position):
+        for voice in self.voices:
+            self._spatialize(voice, listener_position)
+
+        ranked = sorted(
+            (v for v in self.voices if v.gain >= VOICE_AUDIBLE_THRESHOLD),
+            key=lambda v: v.audibility,
+            reverse=True
+        )
+
+        # A wide voice that doesn't fit leaves room for narrower ones
+        winners = []
+        budget = len(self.channels)
+        for voice in ranked:
+            if voice.width <= budget:
+                winners.append(voice)
+                budget -= voice.width
+        winner_ids = {id(v) for v in winners}
+
+        # Free channels from voices that lost their place first
+        for voice in self.voices:
+            if not voice.channels:
+                continue
+
+            if id(voice) not in winner_ids:
+                if voice.gain >= VOICE_AUDIBLE_THRESHOLD:
+                    self.steals += 1
+                self._take_channels(voice)
+            elif len(voice.channels) != voice.width:
+                # Width changed: handed a fresh block below
+                self._take_channels(voice)
+
+        for voice in winners:
+            if not voice.channels:
+                voice.channels = [self.free_channels.pop() for _ in range(voice.width)]
+
+    def _spatialize(self, voice, listener_position):
+        if voice.anchor is None:
+            distance = 0.0
+            pan = 0.0
+        else:
+            offset = voice.anchor.position - listener_position
+            distance = offset.length()
+            pan = max(-1.0, min(offset.x / VOICE_PAN_DISTANCE, 1.0))
+
+        # Inverse-distance rolloff, silent past the max distance
+        if distance >= VOICE_MAX_DISTANCE:
+            attenuation = 0.0
+        else:
+            attenuation = VOICE_REFERENCE_DISTANCE / max(distance, VOICE_REFERENCE_DISTANCE)
+
+        voice.gain = voice.loudness * attenuation
+        voice.audibility = voice.gain + voice.priority
+
+        # Constant-power pan, normalized so centre plays at full gain
+        angle = (pan + 1) * math.pi / 4
+        voice.left = min(1.0, voice.gain * math.sqrt(2) * math.cos(angle))
+        voice.right = min(1.0, voice.gain * math.sqrt(2) * math.sin(angle))
+
+    def _take_channels(self, voice):
+        for channel in voice.channels:
+            channel.stop()
+            self.free_channels.append(channel)
+
+        voice.channels = []
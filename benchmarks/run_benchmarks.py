@@ -0,0 +1,435 @@
+"""
+Microbenchmarks for the per-frame hot paths.
+
+Runs under the SDL dummy video/audio drivers, measures every benchmark
+at several entity counts and writes the results as JSON. With
+--compare, results are checked against a stored baseline and any
+benchmark that slowed down past the threshold is flagged.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --compare bench.json
+    python -m benchmarks.run_benchmarks car_draw --quality 2
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+
+DEFAULT_SIZES = (1, 10, 100, 1000)
+DEFAULT_REPEAT = 7
+DEFAULT_THRESHOLD = 0.15
+
+# Each timed sample runs long enough to swamp timer resolution
+MIN_SAMPLE_TIME = 0.005
+
+# One second of audio per resample, so n=1000 stays tractable
+RESAMPLE_FRAMES = 44100
+
+
+# ==========================================================
+# BENCHMARKS
+# ==========================================================
+# Each benchmark takes (context, n) and returns a zero-argument
+# callable that performs one iteration over n entities.
+
+def bench_car_update(context, n):
+    from settings import PHYSICS_DT
+    from systems.input import Controls
+    from vehicles.car import Car
+
+    cars = [Car(i * 10, 0) for i in range(n)]
+    controls = Controls(throttle=True, left=True, drift=True)
+
+    def run():
+        for car in cars:
+            car.update(PHYSICS_DT, controls)
+
+    return run
+
+
+def bench_lod_update(context, n):
+    from settings import PHYSICS_DT, SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT
+    from systems.input import ScriptedInput, Controls
+    from systems.lod import LodScheduler
+    from vehicles.car import Car
+
+    # Same population as car_update, spread over the world around the view
+    rng = np.random.default_rng(n)
+    lod = LodScheduler()
+    for x, y in rng.uniform(0, (WORLD_WIDTH, WORLD_HEIGHT), (n, 2)):
+        lod.add(Car(x, y), ScriptedInput([(1, Controls(throttle=True, left=True))], loop=True))
+
+    view_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    view_rect.center = (WORLD_WIDTH // 2, WORLD_HEIGHT // 2)
+
+    def run():
+        lod.update(PHYSICS_DT, view_rect)
+
+    return run
+
+
+def bench_surface_lookup(context, n):
+    from settings import WORLD_WIDTH, WORLD_HEIGHT
+    from world.map import TrackMap
+    from world.surface_grid import SurfaceGrid
+
+    # Per-tick surface queries for a fleet spread over the world
+    grid = SurfaceGrid(TrackMap.default())
+    positions = np.random.default_rng(n).uniform(0, (WORLD_WIDTH, WORLD_HEIGHT), (n, 2))
+
+    def run():
+        grid.multipliers(positions)
+        grid.on_track(positions)
+
+    return run
+
+
+def bench_car_draw(context, n):
+    from vehicles.car import Car
+
+    screen = context["screen"]
+    cars = [Car(i % 1280, (i * 7) % 720) for i in range(n)]
+    for i, car in enumerate(cars):
+        car.angle = i * 13.7
+
+    offset = pygame.Vector2(0, 0)
+
+    def run():
+        for car in cars:
+            car.angle += 1.3
+            car.draw(screen, offset)
+
+    return run
+
+
+def bench_culled_draw(context, n):
+    from camera import Camera
+    from settings import WORLD_WIDTH, WORLD_HEIGHT
+    from systems.entities import EntityRegistry
+    from vehicles.car import Car
+
+    # car_draw's population spread over the world, drawn through the registry
+    screen = context["screen"]
+    rng = np.random.default_rng(n)
+
+    registry = EntityRegistry()
+    for x, y in rng.uniform(0, (WORLD_WIDTH, WORLD_HEIGHT), (n, 2)):
+        registry.add(Car(x, y))
+
+    camera = Camera()
+    camera.offset.update(WORLD_WIDTH / 2, WORLD_HEIGHT / 2)
+
+    def run():
+        registry.update()
+        registry.draw(screen, camera)
+
+    return run
+
+
+def bench_tile_chunks(context, n):
+    import tempfile
+    from settings import WORLD_CHUNK_SIZE
+    from tools.bake_map import bake
+    from world.map import TrackMap, TileMap
+
+    # World-layer chunk misses on a streamed map, everything loaded.
+    # Every chunk is in memory before the bake is deleted, so the
+    # timed draws never touch the disk.
+    with tempfile.TemporaryDirectory(prefix="bench_map_") as path:
+        bake(TrackMap.default(), path)
+
+        tile_map = TileMap.load(path)
+        tile_map.prefetch(tile_map.get_bounds())
+        tile_map.streamer.wait()
+
+    chunk = pygame.Surface((WORLD_CHUNK_SIZE, WORLD_CHUNK_SIZE)).convert()
+    keys = list(tile_map.chunks_in(tile_map.get_bounds()))
+    regions = [
+        pygame.Rect(cx * WORLD_CHUNK_SIZE, cy * WORLD_CHUNK_SIZE, WORLD_CHUNK_SIZE, WORLD_CHUNK_SIZE)
+        for cx, cy in (keys[i % len(keys)] for i in range(n))
+    ]
+
+    def run():
+        for region in regions:
+            tile_map.draw_region(chunk, region)
+
+    return run
+
+
+def bench_particles(context, n):
+    from settings import PHYSICS_DT, SCREEN_WIDTH, SCREEN_HEIGHT
+    from systems.particles import ParticleSystem
+
+    screen = context["screen"]
+    particles = ParticleSystem(smoke_cap=n, spark_cap=n, seed=n)
+    view_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    offset = pygame.Vector2(0, 0)
+
+    rng = np.random.default_rng(n)
+    points = rng.uniform(0, (SCREEN_WIDTH, SCREEN_HEIGHT), (n, 2))
+    particles.emit_smoke(points, (300, 0))
+
+    def run():
+        # Keep the pools full, recycling the oldest as in a long drift
+        particles.emit_smoke(points[:2], (300, 0))
+        particles.update(PHYSICS_DT)
+        particles.draw(screen, offset, view_rect)
+
+    return run
+
+
+def bench_engine_update(context, n):
+    game = context["game"]
+    engine = game.engine
+    engine.wait()
+
+    # The engine only mixes once the voice manager has handed it channels
+    game.voices.update(game.car.position)
+    rpm_values = np.linspace(0, 1, n)
+
+    def run():
+        for rpm in rpm_values:
+            engine.update(rpm, 1 / 60)
+
+    return run
+
+
+def bench_engine_resample(context, n):
+    from audio.engine import EngineSound
+    from core.assets import assets
+
+    engine = context["game"].engine
+    if not isinstance(engine, EngineSound):
+        engine = EngineSound(engine.sound_path, background=False)
+
+    pitches = np.linspace(engine.min_pitch, engine.max_pitch, n)
+
+    base_array = pygame.sndarray.array(assets.sound(engine.sound_path))
+    block = base_array[:RESAMPLE_FRAMES]
+
+    def run():
+        for pitch in pitches:
+            engine._resample(block, pitch)
+
+    return run
+
+
+def bench_engine_stream(context, n):
+    from audio.engine_stream import StreamingEngineSound
+
+    engine = StreamingEngineSound(context["game"].engine.sound_path, background=False)
+    pitches = np.linspace(engine.min_pitch, engine.max_pitch, n)
+
+    def run():
+        for pitch in pitches:
+            engine.render(pitch)
+
+    return run
+
+
+def bench_hud_draw(context, n):
+    game = context["game"]
+
+    def run():
+        for i in range(n):
+            game.car.velocity.x = i
+            game.draw_hud()
+
+    return run
+
+
+def bench_upgrade_overlay(context, n):
+    game = context["game"]
+    game.run_manager.generate_upgrades()
+
+    def run():
+        for _ in range(n):
+            game.draw_upgrade_overlay()
+
+    return run
+
+
+def bench_upgrade_choices(context, n):
+    from core.upgrades.upgrade_pool import generate_upgrade_choices
+
+    def run():
+        generate_upgrade_choices(n)
+
+    return run
+
+
+BENCHMARKS = {
+    "car_update": bench_car_update,
+    "lod_update": bench_lod_update,
+    "surface_lookup": bench_surface_lookup,
+    "car_draw": bench_car_draw,
+    "culled_draw": bench_culled_draw,
+    "tile_chunks": bench_tile_chunks,
+    "particles": bench_particles,
+    "engine_update": bench_engine_update,
+    "engine_resample": bench_engine_resample,
+    "engine_stream": bench_engine_stream,
+    "hud_draw": bench_hud_draw,
+    "upgrade_overlay": bench_upgrade_overlay,
+    "upgrade_choices": bench_upgrade_choices,
+}
+
+
+# ==========================================================
+# RUNNER
+# ==========================================================
+
+def create_context(quality=0):
+    pygame.init()
+    pygame.mixer.init(44100, -16, 2, 512)
+    pygame.mixer.set_num_channels(32)
+
+    from game import Game
+
+    game = Game()
+    game.start_audio()
+
+    # Every quality setting held at one level, so runs are comparable
+    game.quality.pin_all(quality)
+    return {"game": game, "screen": game.screen}
+
+
+def calibrate(run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+
+    if elapsed <= 0:
+        return 1000
+    return max(1, int(MIN_SAMPLE_TIME / elapsed) + 1)
+
+
+def measure(run, repeat):
+    # The calibration pass doubles as the cache warm-up
+    loops = calibrate(run)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        samples.append((time.perf_counter() - start) / loops)
+
+    return {
+        "loops": loops,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def run_benchmarks(names, sizes, repeat, quality=0):
+    context = create_context(quality)
+    results = {}
+
+    for name in names:
+        results[name] = {}
+
+        for n in sizes:
+            run = BENCHMARKS[name](context, n)
+            stats = measure(run, repeat)
+            stats["per_entity"] = stats["min"] / n
+            results[name][str(n)] = stats
+
+            print(
+                f"{name:>16} n={n:<5} "
+                f"min {stats['min'] * 1e3:9.4f} ms  "
+                f"per entity {stats['per_entity'] * 1e6:9.3f} us"
+            )
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "quality": quality,
+        },
+        "results": results,
+    }
+
+
+# ==========================================================
+# COMPARE
+# ==========================================================
+
+def compare(current, baseline, threshold):
+    regressions = []
+
+    for name, sizes in current["results"].items():
+        for size, stats in sizes.items():
+            base = baseline["results"].get(name, {}).get(size)
+            if base is None:
+                continue
+
+            ratio = stats["min"] / base["min"]
+            status = "ok"
+            if ratio > 1 + threshold:
+                status = "REGRESSION"
+                regressions.append((name, size, ratio))
+            elif ratio < 1 - threshold:
+                status = "faster"
+
+            print(f"{name:>16} n={size:<5} {ratio:6.2f}x  {status}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", help="subset to run (default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--quality", type=int, default=0,
+                        help="quality level to pin every setting at (0 = best)")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before flagging (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    names = args.benchmarks or list(BENCHMARKS)
+    results = run_benchmarks(names, args.sizes, args.repeat, args.quality)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) past {args.threshold:.0%}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Startup benchmark: time to first frame, broken down by phase.
+
+Every run is a fresh interpreter, so import and cache costs are real.
+Phases are timed inside the child and reported as the median over
+--repeat runs; "interpreter" is the rest of the wall time measured by
+the parent (Python itself starting and exiting).
+
+Usage (from the repository root):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --cold --output startup.json
+"""
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+
+
+DEFAULT_REPEAT = 5
+
+# Everything up to and including first_frame is time to first frame
+FIRST_FRAME_PHASES = (
+    "import_pygame",
+    "init",
+    "import_game",
+    "display",
+    "world",
+    "hud",
+    "loading_screen",
+    "first_frame",
+)
+
+
+# ==========================================================
+# CHILD
+# ==========================================================
+
+def child():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    phases = {}
+    mark = _START
+
+    def phase(name):
+        nonlocal mark
+        now = time.perf_counter()
+        phases[name] = now - mark
+        mark = now
+
+    import pygame
+    phase("import_pygame")
+
+    from settings import AUDIO_CHANNELS
+
+    pygame.init()
+    pygame.mixer.init(44100, -16, 2, 512)
+    pygame.mixer.set_num_channels(AUDIO_CHANNELS)
+    phase("init")
+
+    from game import Game
+    phase("import_game")
+
+    game = Game()
+    phases.update(game.startup_times)
+    mark = time.perf_counter()
+
+    game.show_loading_screen()
+    phase("loading_screen")
+
+    game.dt = 1 / 60
+    game.handle_events()
+    game.step_physics(game.dt)
+    game.update()
+    game.draw()
+    phase("first_frame")
+
+    game.start_audio()
+    game.engine.wait()
+    phase("audio_ready")
+
+    json.dump(phases, sys.stdout)
+
+
+# ==========================================================
+# PARENT
+# ==========================================================
+
+def clear_caches():
+    from settings import AUDIO_CACHE_DIR, FONT_CACHE_PATH
+
+    shutil.rmtree(AUDIO_CACHE_DIR, ignore_errors=True)
+    if os.path.exists(FONT_CACHE_PATH):
+        os.remove(FONT_CACHE_PATH)
+
+
+def run_once(cold):
+    if cold:
+        clear_caches()
+
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    wall = time.perf_counter() - start
+
+    phases = json.loads(output.strip().splitlines()[-1])
+    phases["interpreter"] = wall - sum(phases.values())
+    return phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--cold", action="store_true", help="clear the font and audio caches before every run")
+    parser.add_argument("--output", help="write the per-run results as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return 0
+
+    runs = [run_once(args.cold) for _ in range(args.repeat)]
+
+    phases = ["interpreter"] + [name for name in runs[0] if name != "interpreter"]
+    medians = {name: statistics.median(run[name] for run in runs) for name in phases}
+
+    for name in phases:
+        print(f"{name:>16}  {medians[name] * 1000:9.1f} ms")
+
+    first_frame = statistics.median(
+        sum(run[name] for name in FIRST_FRAME_PHASES if name in run)
+        for run in runs
+    )
+    print(f"{'first frame':>16}  {first_frame * 1000:9.1f} ms  (after the interpreter is up)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cold": args.cold, "median": medians, "runs": runs}, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
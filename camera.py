@@ -1,15 +1,47 @@
+import math
 import pygame
 from settings import *
 
 class Camera:
-    def __init__(self):
+    def __init__(self, zoom=1.0):
+        # World position of the view's top-left corner
         self.offset = pygame.Vector2(0, 0)
 
+        # Screen pixels per world pixel
+        self.zoom = zoom
+
+    @property
+    def view_size(self):
+        return pygame.Vector2(SCREEN_WIDTH / self.zoom, SCREEN_HEIGHT / self.zoom)
+
     def update(self, target_position, dt):
-        target_offset = target_position - pygame.Vector2(
-            SCREEN_WIDTH / 2,
-            SCREEN_HEIGHT / 2
-        )
+        target_offset = target_position - self.view_size / 2
 
         # Smooth follow
         self.offset += (target_offset - self.offset) * 5 * dt
+
+    def set_zoom(self, zoom):
+        # Zoom about the view's center
+        center = self.offset + self.view_size / 2
+        self.zoom = zoom
+        self.offset = center - self.view_size / 2
+
+    # ==========================================================
+    # VIEW
+    # ==========================================================
+    def get_view_rect(self, margin=0):
+        """The world-space rect on screen, grown by margin on every side."""
+        width, height = self.view_size
+
+        return pygame.Rect(
+            math.floor(self.offset.x) - margin,
+            math.floor(self.offset.y) - margin,
+            math.ceil(width) + 1 + margin * 2,
+            math.ceil(height) + 1 + margin * 2
+        )
+
+    def world_to_screen(self, position):
+        return (pygame.Vector2(position) - self.offset) * self.zoom
+
+    def screen_to_world(self, position):
+        return pygame.Vector2(position) / self.zoom + self.offset
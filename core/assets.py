@@ -0,0 +1,256 @@
+import json
+import os
+import threading
+import pygame
+from settings import FONT_CACHE_PATH
+
+
+ASSET_ROOT = "assets"
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+SOUND_EXTENSIONS = (".mp3", ".wav", ".ogg")
+
+
+class AssetManager:
+    """
+    Load-once registry for images, sounds and fonts.
+
+    Every asset is loaded the first time it is asked for and shared
+    after that. preload() decodes a manifest of the asset tree's images
+    on a background thread, and they are converted to the display
+    format on first use from the main thread. Sounds are left out of
+    the manifest: the engine sample is only decoded when its layer
+    cache misses, and explicitly listed sounds load after the images.
+
+    Font files found for a SysFont name are remembered in
+    FONT_CACHE_PATH, so later launches skip the system font scan.
+    """
+
+    def __init__(self, root=ASSET_ROOT):
+        self.root = root
+
+        self.images = {}
+        self.sounds = {}
+        self.fonts = {}
+
+        # Decoded by the preloader, waiting for conversion
+        self._raw_images = {}
+
+        # Images the main thread has taken over; the preloader leaves them
+        self._claimed = set()
+
+        # name -> font file (or None for pygame's default font)
+        self.font_paths = None
+
+        # Separate locks, so converting an image never waits on a
+        # sound being decoded
+        self._lock = threading.Lock()
+        self._sound_lock = threading.Lock()
+
+        # The image the preloader is decoding, if any
+        self._decoding = None
+        self._decoded = threading.Condition(self._lock)
+
+        self._worker = None
+        self.preload_total = 0
+        self.preload_done = 0
+        self.preload_images = 0
+        self.errors = {}
+
+    # ==========================================================
+    # ACCESS
+    # ==========================================================
+    def image(self, path):
+        path = os.path.normpath(path)
+
+        surface = self.images.get(path)
+        if surface is not None:
+            return surface
+
+        with self._lock:
+            # Mid-decode on the preloader: wait for it rather than decode twice
+            while self._decoding == path:
+                self._decoded.wait()
+
+            surface = self._raw_images.pop(path, None)
+
+            # Claimed before loading, so the preloader skips it from here on
+            self._claimed.add(path)
+
+        if surface is None:
+            surface = pygame.image.load(path)
+
+        # Conversion needs a display; headless games keep the raw surface
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+
+        self.images[path] = surface
+        return surface
+
+    def sound(self, path):
+        path = os.path.normpath(path)
+
+        # Held while decoding, so the preloader and a caller never
+        # decode the same file twice
+        with self._sound_lock:
+            sound = self.sounds.get(path)
+            if sound is None:
+                sound = pygame.mixer.Sound(path)
+                self.sounds[path] = sound
+
+        return sound
+
+    def font(self, name, size):
+        key = (name, size)
+
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(self.font_path(name), size)
+            self.fonts[key] = font
+
+        return font
+
+    def font_path(self, name):
+        if self.font_paths is None:
+            self.font_paths = self._load_font_paths()
+
+        if name in self.font_paths:
+            path = self.font_paths[name]
+            if path is None or os.path.exists(path):
+                return path
+
+        # The slow part: the first match_font scans every system font
+        path = pygame.font.match_font(name)
+        self.font_paths[name] = path
+        self._save_font_paths()
+
+        return path
+
+    def _load_font_paths(self):
+        try:
+            with open(FONT_CACHE_PATH) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_font_paths(self):
+        try:
+            os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+            with open(FONT_CACHE_PATH, "w") as f:
+                json.dump(self.font_paths, f, indent=2)
+        except OSError:
+            pass
+
+    # ==========================================================
+    # PRELOADING
+    # ==========================================================
+    def manifest(self):
+        paths = []
+        for directory, _, files in os.walk(self.root):
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.normpath(os.path.join(directory, name)))
+        return paths
+
+    def preload(self, paths=None):
+        paths = self.manifest() if paths is None else [os.path.normpath(p) for p in paths]
+
+        # Images gate the first frame, so they go first
+        paths.sort(key=lambda path: path.lower().endswith(SOUND_EXTENSIONS))
+
+        self.preload_total = len(paths)
+        self.preload_done = 0
+        self.preload_images = sum(1 for path in paths if not path.lower().endswith(SOUND_EXTENSIONS))
+
+        self._worker = threading.Thread(target=self._preload, args=(paths,), daemon=True)
+        self._worker.start()
+
+    def _preload(self, paths):
+        for path in paths:
+            try:
+                if path.lower().endswith(SOUND_EXTENSIONS):
+                    if pygame.mixer.get_init():
+                        self.sound(path)
+                else:
+                    self._preload_image(path)
+            except (pygame.error, OSError) as e:
+                self.errors[path] = e
+
+            self.preload_done += 1
+
+    def _preload_image(self, path):
+        with self._lock:
+            if path in self._claimed or path in self._raw_images:
+                return
+            self._decoding = path
+
+        try:
+            surface = pygame.image.load(path)
+
+            # image() waits while this is decoding, so nothing claimed it
+            with self._lock:
+                self._raw_images[path] = surface
+        finally:
+            with self._lock:
+                self._decoding = None
+                self._decoded.notify_all()
+
+    @property
+    def loading(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    @property
+    def progress(self):
+        if self.preload_total == 0:
+            return 1.0
+        return self.preload_done / self.preload_total
+
+    @property
+    def images_loading(self):
+        return self.loading and self.preload_done < self.preload_images
+
+    @property
+    def image_progress(self):
+        if self.preload_images == 0:
+            return 1.0
+        return min(1.0, self.preload_done / self.preload_images)
+
+    def wait(self):
+        if self._worker is not None:
+            self._worker.join()
+
+    # ==========================================================
+    # MEMORY
+    # ==========================================================
+    def memory_report(self):
+        """(kind, name, bytes) for every loaded asset, largest first."""
+        report = []
+
+        for path, surface in self.images.items():
+            report.append(("image", path, _surface_bytes(surface)))
+
+        with self._lock:
+            for path, surface in self._raw_images.items():
+                report.append(("image", path, _surface_bytes(surface)))
+
+        with self._sound_lock:
+            for path, sound in self.sounds.items():
+                report.append(("sound", path, _sound_bytes(sound)))
+
+        report.sort(key=lambda entry: entry[2], reverse=True)
+        return report
+
+    def total_bytes(self):
+        return sum(size for _, _, size in self.memory_report())
+
+
+def _surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def _sound_bytes(sound):
+    frequency, size, channels = pygame.mixer.get_init()
+    return int(sound.get_length() * frequency) * channels * abs(size) // 8
+
+
+assets = AssetManager()
@@ -1,8 +1,8 @@
-from core.upgrades.upgrade_pool import generate_upgrade_choices
+from core.upgrades.upgrade_pool import UpgradePool
 
 
 class RunManager:
-    def __init__(self):
+    def __init__(self, seed=None):
         # --------------------------
         # Level Timing
         # --------------------------
@@ -25,6 +25,7 @@ class RunManager:
         # Upgrade System
         # --------------------------
         self.available_upgrades = []
+        self.upgrade_pool = UpgradePool(seed)
 
     # ==========================================================
     # UPDATE
@@ -62,7 +63,7 @@ class RunManager:
     # UPGRADES
     # ==========================================================
     def generate_upgrades(self):
-        self.available_upgrades = generate_upgrade_choices(3)
+        self.available_upgrades = self.upgrade_pool.generate_choices(3)
 
     def apply_upgrade(self, car, upgrade):
         upgrade.apply(car)
@@ -0,0 +1,379 @@
+import os
+import random
+import struct
+from core.upgrades.base_upgrade import Upgrade, RARITY_WEIGHTS
+from core.upgrades.upgrade_pool import UPGRADE_TYPES
+from vehicles.car_stats import CarStats, StatModifier, STAT_NAMES
+
+
+# ==========================================================
+# FILE FORMAT
+# ==========================================================
+#
+#   header    "PZSV", version u16
+#   sections  tag u16, length u32, payload
+#
+# Readers skip sections with unknown tags, and ignore payload bytes
+# past the fields they know, so newer saves still load in older
+# builds and fields can be appended to a section without a new tag.
+# Stats are stored by name and upgrades carry their own modifiers,
+# so saves survive stats and upgrade types being added. VERSION only
+# changes for layouts older builds can't read, so those refuse it.
+
+MAGIC = b"PZSV"
+VERSION = 1
+
+HEADER = struct.Struct("<4sH")
+SECTION = struct.Struct("<HI")
+
+SECTION_RUN = 1
+SECTION_CAR = 2
+SECTION_BASE_STATS = 3
+SECTION_STAT_STACK = 4
+SECTION_OFFERS = 5
+SECTION_RNG = 6
+
+RUN = struct.Struct("<Idd?qq")
+CAR = struct.Struct("<6dBd")
+
+_OPS = (StatModifier.ADD, StatModifier.MULTIPLY)
+_OP_CODES = {op: i for i, op in enumerate(_OPS)}
+
+_UPGRADE_CLASSES = {cls.__name__: cls for cls in UPGRADE_TYPES}
+
+
+class SaveError(Exception):
+    pass
+
+
+class SavedUpgrade(Upgrade):
+    """
+    An upgrade whose type (or rarity) this build doesn't know.
+
+    It keeps the saved modifiers and type name, so it still applies
+    exactly as saved and is written back unchanged.
+    """
+
+    def __init__(self, type_name, name, rarity, modifiers, resets_stats):
+        super().__init__(name, rarity)
+        self.type_name = type_name
+        self.saved_modifiers = modifiers
+        self.resets_stats = resets_stats
+
+    def modifiers(self):
+        return list(self.saved_modifiers)
+
+
+# ==========================================================
+# ENCODING
+# ==========================================================
+
+class _Writer:
+    def __init__(self):
+        self.buffer = bytearray(HEADER.pack(MAGIC, VERSION))
+
+    def section(self, tag, payload):
+        self.buffer += SECTION.pack(tag, len(payload))
+        self.buffer += payload
+
+
+def _pack_str(buffer, text):
+    data = text.encode("utf-8")
+    buffer += struct.pack("<H", len(data))
+    buffer += data
+
+
+def _pack_modifiers(buffer, modifiers):
+    buffer += struct.pack("<H", len(modifiers))
+    for modifier in modifiers:
+        _pack_str(buffer, modifier.stat)
+        buffer += struct.pack("<Bd", _OP_CODES[modifier.op], modifier.value)
+
+
+def _pack_upgrade(buffer, upgrade, modifiers=None):
+    if upgrade is None:
+        _pack_str(buffer, "")
+        _pack_str(buffer, "")
+        _pack_str(buffer, "")
+        buffer += struct.pack("<?", False)
+    else:
+        _pack_str(buffer, getattr(upgrade, "type_name", type(upgrade).__name__))
+        _pack_str(buffer, upgrade.name)
+        _pack_str(buffer, upgrade.rarity)
+        buffer += struct.pack("<?", upgrade.resets_stats)
+
+    if modifiers is None:
+        modifiers = upgrade.modifiers()
+    _pack_modifiers(buffer, modifiers)
+
+
+def _pack_rng(buffer, rng):
+    version, state, gauss_next = rng.getstate()
+    buffer += struct.pack("<BH", version, len(state))
+    buffer += struct.pack(f"<{len(state)}I", *state)
+    buffer += struct.pack("<?d", gauss_next is not None, gauss_next or 0.0)
+
+
+def dumps(run_manager, car):
+    writer = _Writer()
+
+    writer.section(SECTION_RUN, RUN.pack(
+        run_manager.current_level,
+        run_manager.level_timer,
+        run_manager.level_duration,
+        run_manager.in_upgrade_phase,
+        run_manager.money_collected,
+        run_manager.total_money
+    ))
+
+    writer.section(SECTION_CAR, CAR.pack(
+        car.position.x,
+        car.position.y,
+        car.velocity.x,
+        car.velocity.y,
+        car.angle,
+        car.angular_velocity,
+        car.current_gear,
+        car.engine_rpm
+    ))
+
+    payload = bytearray(struct.pack("<H", len(STAT_NAMES)))
+    for name, value in zip(STAT_NAMES, car.base_stats.as_tuple()):
+        _pack_str(payload, name)
+        payload += struct.pack("<d", value)
+    writer.section(SECTION_BASE_STATS, payload)
+
+    payload = bytearray(struct.pack("<H", len(car.stat_stack.entries)))
+    for source, modifiers in car.stat_stack.entries:
+        _pack_upgrade(payload, source, modifiers)
+    writer.section(SECTION_STAT_STACK, payload)
+
+    payload = bytearray(struct.pack("<H", len(run_manager.available_upgrades)))
+    for upgrade in run_manager.available_upgrades:
+        _pack_upgrade(payload, upgrade)
+    writer.section(SECTION_OFFERS, payload)
+
+    pool = run_manager.upgrade_pool
+    payload = bytearray()
+    _pack_rng(payload, pool.rarity_rng)
+    _pack_rng(payload, pool.type_rng)
+    writer.section(SECTION_RNG, payload)
+
+    return bytes(writer.buffer)
+
+
+# ==========================================================
+# DECODING
+# ==========================================================
+
+class _Reader:
+    def __init__(self, data, offset=0, end=None):
+        self.data = data
+        self.offset = offset
+        self.end = len(data) if end is None else end
+
+    def unpack(self, fmt):
+        if isinstance(fmt, str):
+            fmt = struct.Struct(fmt)
+
+        if self.offset + fmt.size > self.end:
+            raise SaveError("save data is truncated")
+
+        values = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
+        return values
+
+    def str(self):
+        length, = self.unpack("<H")
+        if self.offset + length > self.end:
+            raise SaveError("save data is truncated")
+
+        try:
+            text = bytes(self.data[self.offset:self.offset + length]).decode("utf-8")
+        except UnicodeDecodeError:
+            raise SaveError("save data has a corrupt string") from None
+
+        self.offset += length
+        return text
+
+
+def _read_modifiers(reader):
+    count, = reader.unpack("<H")
+
+    modifiers = []
+    for _ in range(count):
+        stat = reader.str()
+        op, value = reader.unpack("<Bd")
+
+        if op >= len(_OPS):
+            raise SaveError(f"unknown modifier op {op}")
+
+        # Kept even for stats this build doesn't have: they change
+        # nothing here, but are written back for the build that does
+        modifiers.append(StatModifier(stat, _OPS[op], value))
+
+    return modifiers
+
+
+def _read_upgrade(reader):
+    type_name = reader.str()
+    name = reader.str()
+    rarity = reader.str()
+    resets_stats, = reader.unpack("<?")
+    modifiers = _read_modifiers(reader)
+
+    if not type_name:
+        return None, modifiers
+
+    # Upgrade types size their modifiers by rarity, so one with a rarity
+    # from a newer build is kept as saved, like an unknown type
+    upgrade_class = _UPGRADE_CLASSES.get(type_name)
+    if upgrade_class is None or rarity not in RARITY_WEIGHTS:
+        return SavedUpgrade(type_name, name, rarity, modifiers, resets_stats), modifiers
+
+    return upgrade_class(name, rarity), modifiers
+
+
+def _read_rng(reader):
+    version, length = reader.unpack("<BH")
+    state = reader.unpack(f"<{length}I")
+    has_gauss, gauss_next = reader.unpack("<?d")
+
+    state = (version, state, gauss_next if has_gauss else None)
+
+    # Tried on a spare generator, so a bad state fails before anything is applied
+    try:
+        random.Random().setstate(state)
+    except (TypeError, ValueError):
+        raise SaveError("save has an invalid RNG state") from None
+
+    return state
+
+
+def loads(data, run_manager, car):
+    """
+    Restore a snapshot from dumps() into an existing RunManager and Car.
+
+    The whole file is parsed before anything is applied, so a save that
+    raises SaveError leaves the run and car as they were.
+    """
+    if len(data) < HEADER.size:
+        raise SaveError("not a save file")
+
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SaveError("not a save file")
+
+    if version > VERSION:
+        raise SaveError(f"save version {version} is newer than this build ({VERSION})")
+
+    run = car_state = base_stats = stat_stack = offers = rng_states = None
+
+    offset = HEADER.size
+    while offset < len(data):
+        if offset + SECTION.size > len(data):
+            raise SaveError("save data is truncated")
+
+        tag, length = SECTION.unpack_from(data, offset)
+        offset += SECTION.size
+
+        if offset + length > len(data):
+            raise SaveError("save data is truncated")
+
+        reader = _Reader(data, offset, offset + length)
+        offset += length
+
+        if tag == SECTION_RUN:
+            run = reader.unpack(RUN)
+
+        elif tag == SECTION_CAR:
+            car_state = reader.unpack(CAR)
+
+        elif tag == SECTION_BASE_STATS:
+            count, = reader.unpack("<H")
+
+            # Stats missing from the save keep this build's defaults
+            base_stats = CarStats()
+            for _ in range(count):
+                name = reader.str()
+                value, = reader.unpack("<d")
+                if name in STAT_NAMES:
+                    setattr(base_stats, name, value)
+
+        elif tag == SECTION_STAT_STACK:
+            count, = reader.unpack("<H")
+            stat_stack = [_read_upgrade(reader) for _ in range(count)]
+
+        elif tag == SECTION_OFFERS:
+            count, = reader.unpack("<H")
+            offers = [_read_upgrade(reader)[0] for _ in range(count)]
+
+        elif tag == SECTION_RNG:
+            rng_states = (_read_rng(reader), _read_rng(reader))
+
+    # ----------------------------------------------------------
+    # Everything parsed: apply it
+    # ----------------------------------------------------------
+    if run is not None:
+        (
+            run_manager.current_level,
+            run_manager.level_timer,
+            run_manager.level_duration,
+            run_manager.in_upgrade_phase,
+            run_manager.money_collected,
+            run_manager.total_money,
+        ) = run
+
+    if car_state is not None:
+        x, y, vx, vy, angle, angular_velocity, gear, rpm = car_state
+
+        car.position.update(x, y)
+        car.velocity.update(vx, vy)
+        car.angle = angle
+        car.angular_velocity = angular_velocity
+        car.current_gear = gear
+        car.engine_rpm = rpm
+        car.store_previous_state()
+
+    if base_stats is not None:
+        car.base_stats = base_stats
+        car.stat_stack.set_base(base_stats)
+
+    if stat_stack is not None:
+        car.stat_stack.clear()
+        for source, modifiers in stat_stack:
+            car.stat_stack.push(modifiers, source=source)
+
+    if offers is not None:
+        run_manager.available_upgrades = offers
+
+    if rng_states is not None:
+        run_manager.upgrade_pool.rarity_rng.setstate(rng_states[0])
+        run_manager.upgrade_pool.type_rng.setstate(rng_states[1])
+
+
+# ==========================================================
+# FILES
+# ==========================================================
+
+def save_game(path, run_manager, car):
+    data = dumps(run_manager, car)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Written aside and swapped in, so a crash mid-save keeps the old file
+    staging = path + ".tmp"
+    with open(staging, "wb") as f:
+        f.write(data)
+    os.replace(staging, path)
+
+    return len(data)
+
+
+def load_game(path, run_manager, car):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    loads(data, run_manager, car)
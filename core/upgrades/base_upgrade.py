@@ -1,4 +1,5 @@
 import random
+from vehicles.car_stats import StatModifier
 
 
 class Rarity:
@@ -25,13 +26,23 @@ RARITY_COLORS = {
 
 
 class Upgrade:
+    # Upgrades that replace the car drop every earlier modifier
+    resets_stats = False
+
     def __init__(self, name, rarity):
         self.name = name
         self.rarity = rarity
 
-    def apply(self, car):
+    def modifiers(self):
         raise NotImplementedError
 
+    def apply(self, car):
+        car.stat_stack.push(
+            self.modifiers(),
+            source=self,
+            replace=self.resets_stats
+        )
+
     def get_display_name(self):
         return f"{self.name} ({self.rarity})"
 
@@ -41,7 +52,7 @@ class Upgrade:
 # ==========================================================
 
 class EngineUpgrade(Upgrade):
-    def apply(self, car):
+    def modifiers(self):
         bonus = {
             Rarity.COMMON: 80,
             Rarity.RARE: 140,
@@ -49,7 +60,7 @@ class EngineUpgrade(Upgrade):
             Rarity.LEGENDARY: 350,
         }[self.rarity]
 
-        car.stats.acceleration += bonus
+        return [StatModifier("acceleration", StatModifier.ADD, bonus)]
 
 
 # ==========================================================
@@ -57,7 +68,7 @@ class EngineUpgrade(Upgrade):
 # ==========================================================
 
 class TopSpeedUpgrade(Upgrade):
-    def apply(self, car):
+    def modifiers(self):
         bonus = {
             Rarity.COMMON: 100,
             Rarity.RARE: 180,
@@ -65,7 +76,7 @@ class TopSpeedUpgrade(Upgrade):
             Rarity.LEGENDARY: 450,
         }[self.rarity]
 
-        car.stats.max_speed += bonus
+        return [StatModifier("max_speed", StatModifier.ADD, bonus)]
 
 
 # ==========================================================
@@ -73,7 +84,7 @@ class TopSpeedUpgrade(Upgrade):
 # ==========================================================
 
 class GripUpgrade(Upgrade):
-    def apply(self, car):
+    def modifiers(self):
         bonus = {
             Rarity.COMMON: 0.3,
             Rarity.RARE: 0.5,
@@ -81,7 +92,7 @@ class GripUpgrade(Upgrade):
             Rarity.LEGENDARY: 1.2,
         }[self.rarity]
 
-        car.stats.grip += bonus
+        return [StatModifier("grip", StatModifier.ADD, bonus)]
 
 
 # ==========================================================
@@ -89,7 +100,7 @@ class GripUpgrade(Upgrade):
 # ==========================================================
 
 class DriftUpgrade(Upgrade):
-    def apply(self, car):
+    def modifiers(self):
         bonus = {
             Rarity.COMMON: 1.0,
             Rarity.RARE: 1.8,
@@ -97,7 +108,7 @@ class DriftUpgrade(Upgrade):
             Rarity.LEGENDARY: 5.0,
         }[self.rarity]
 
-        car.stats.oversteer_strength += bonus
+        return [StatModifier("oversteer_strength", StatModifier.ADD, bonus)]
 
 
 # ==========================================================
@@ -105,10 +116,10 @@ class DriftUpgrade(Upgrade):
 # ==========================================================
 
 class NewCarUpgrade(Upgrade):
-    def apply(self, car):
-        # Simple stat reset + buff for now
-        car.stats = car.base_stats.copy()
+    # Simple stat reset + buff for now
+    resets_stats = True
 
+    def modifiers(self):
         rarity_bonus = {
             Rarity.COMMON: 1.05,
             Rarity.RARE: 1.10,
@@ -116,5 +127,7 @@ class NewCarUpgrade(Upgrade):
             Rarity.LEGENDARY: 1.30,
         }[self.rarity]
 
-        car.stats.acceleration *= rarity_bonus
-        car.stats.max_speed *= rarity_bonus
+        return [
+            StatModifier("acceleration", StatModifier.MULTIPLY, rarity_bonus),
+            StatModifier("max_speed", StatModifier.MULTIPLY, rarity_bonus),
+        ]
@@ -19,34 +19,144 @@ UPGRADE_TYPES = [
     NewCarUpgrade,
 ]
 
+UPGRADE_NAMES = {
+    EngineUpgrade: "Engine Upgrade",
+    TopSpeedUpgrade: "Top Speed Upgrade",
+    GripUpgrade: "Grip Kit",
+    DriftUpgrade: "Drift Tuning",
+    NewCarUpgrade: "New Car",
+}
 
-def roll_rarity():
-    total = sum(RARITY_WEIGHTS.values())
-    roll = random.uniform(0, total)
 
-    cumulative = 0
-    for rarity, weight in RARITY_WEIGHTS.items():
-        cumulative += weight
-        if roll <= cumulative:
-            return rarity
+# ==========================================================
+# ALIAS TABLE
+# ==========================================================
 
-    return Rarity.COMMON
+class AliasTable:
+    """
+    Walker/Vose alias table: O(1) weighted sampling after an O(n) build.
+    """
 
+    def __init__(self, outcomes, weights):
+        self.outcomes = list(outcomes)
+        n = len(self.outcomes)
 
-def generate_upgrade():
-    rarity = roll_rarity()
-    upgrade_class = random.choice(UPGRADE_TYPES)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+
+            scaled[l] -= 1 - scaled[s]
+            if scaled[l] < 1:
+                small.append(l)
+            else:
+                large.append(l)
+
+        # Leftovers are 1 up to rounding error
+        for i in small + large:
+            self.prob[i] = 1.0
+            self.alias[i] = i
+
+    def sample_index(self, rng):
+        # One uniform draw picks the column and the coin flip
+        u = rng.random() * len(self.prob)
+        column = int(u)
+        return column if u - column < self.prob[column] else self.alias[column]
+
+    def sample(self, rng):
+        return self.outcomes[self.sample_index(rng)]
+
+    def sample_indices(self, generator, n):
+        import numpy as np
+
+        prob = np.asarray(self.prob)
+        alias = np.asarray(self.alias)
+
+        u = generator.random(n) * len(prob)
+        columns = u.astype(np.int64)
+        return np.where(u - columns < prob[columns], columns, alias[columns])
+
+
+# ==========================================================
+# UPGRADE POOL
+# ==========================================================
+
+class UpgradePool:
+    """
+    Seedable source of upgrade offers.
+
+    Rarity and upgrade type are drawn from separate RNG streams derived
+    from one seed, so a run with the same seed is offered the same
+    upgrades in the same order.
+    """
+
+    def __init__(self, seed=None, rarity_weights=RARITY_WEIGHTS, upgrade_types=UPGRADE_TYPES):
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        self.seed = seed
 
-    name_map = {
-        EngineUpgrade: "Engine Upgrade",
-        TopSpeedUpgrade: "Top Speed Upgrade",
-        GripUpgrade: "Grip Kit",
-        DriftUpgrade: "Drift Tuning",
-        NewCarUpgrade: "New Car",
-    }
+        self.rarity_table = AliasTable(rarity_weights.keys(), rarity_weights.values())
+        self.type_table = AliasTable(upgrade_types, [1] * len(upgrade_types))
 
-    return upgrade_class(name_map[upgrade_class], rarity)
+        self.rarity_rng = random.Random(f"{seed}:rarity")
+        self.type_rng = random.Random(f"{seed}:type")
+
+    def roll_rarity(self):
+        return self.rarity_table.sample(self.rarity_rng)
+
+    def roll_upgrade_type(self):
+        return self.type_table.sample(self.type_rng)
+
+    def generate_upgrade(self):
+        rarity = self.roll_rarity()
+        upgrade_class = self.roll_upgrade_type()
+
+        return upgrade_class(UPGRADE_NAMES[upgrade_class], rarity)
+
+    def generate_choices(self, count=3):
+        return [self.generate_upgrade() for _ in range(count)]
+
+    def sample(self, n):
+        return [self.generate_upgrade() for _ in range(n)]
+
+    def sample_indices(self, n):
+        """
+        Draw n offers at once as NumPy index arrays into
+        rarity_table.outcomes and type_table.outcomes, for balance
+        simulations that don't need Upgrade objects.
+        """
+        import numpy as np
+
+        generator = np.random.default_rng(
+            [self.rarity_rng.getrandbits(64), self.type_rng.getrandbits(64)]
+        )
+
+        rarities = self.rarity_table.sample_indices(generator, n)
+        types = self.type_table.sample_indices(generator, n)
+        return rarities, types
+
+
+_default_pool = UpgradePool()
+
+
+def roll_rarity():
+    return _default_pool.roll_rarity()
+
+
+def generate_upgrade():
+    return _default_pool.generate_upgrade()
 
 
 def generate_upgrade_choices(count=3):
-    return [generate_upgrade() for _ in range(count)]
+    return _default_pool.generate_choices(count)
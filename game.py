@@ -1,48 +1,250 @@
+import math
+import os
+import time
 import pygame
 from settings import *
 from camera import Camera
 from vehicles.car import Car
-from audio.engine import EngineSound
+from vehicles.sprite_cache import sprite_cache
 from core.run_manager import RunManager
+from core.assets import assets
 from core.upgrades.base_upgrade import RARITY_COLORS
+from systems.input import InputManager
+from systems.debug import FrameProfiler
+from systems.lod import LodScheduler
+from systems.entities import EntityRegistry
+from systems.particles import ParticleSystem
+from systems.quality import QualityGovernor
+from world.map import load_track
+from world.surface_grid import SurfaceGrid
+from world.world_layer import ChunkedWorldLayer
+from world.decals import DecalLayer
+from systems.collision import CollisionWorld
+from systems.hud import Hud, UpgradeOverlay, text_cache
+
+
+# Audio, replays and saves are imported on first use, after the
+# first frame is up.
 
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption(TITLE)
+    def __init__(self, headless=False, input_source=None):
+        # Headless games never open a window, load fonts or touch the
+        # mixer; drive them with simulate() instead of run().
+        self.headless = headless
+
+        # Seconds spent in each phase of startup, in order
+        self.startup_times = {}
+        phase_start = time.perf_counter()
+
+        if not headless:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption(TITLE)
+
+            assets.preload()
+
+            phase_start = self._mark_startup("display", phase_start)
+
+        self.input = InputManager(input_source)
+        self.profiler = FrameProfiler(
+            capacity=PROFILER_FRAMES,
+            enabled=PROFILER_ENABLED
+        )
 
         self.clock = pygame.time.Clock()
         self.running = True
         self.dt = 0
 
+        # Fixed-timestep state
+        self.accumulator = 0.0
+        self.alpha = 1.0
+
+        self.track = load_track(MAP_PATH)
+        self.world_layer = ChunkedWorldLayer(self.track)
+        self.collision = CollisionWorld(self.track)
+
+        # Grip and drag by surface, baked from shapes or streamed tiles
+        self.surfaces = SurfaceGrid(self.track)
+
         self.camera = Camera()
-        self.car = Car(WORLD_WIDTH // 2, WORLD_HEIGHT // 2)
+        self.car = Car(*self.track.spawn)
+        self.car.surface_grid = self.surfaces
+
+        # Every other car (traffic, rivals) is stepped by distance to the view
+        self.lod = LodScheduler(self.collision)
+
+        # Everything drawn in the world; only what's in view is drawn
+        self.entities = EntityRegistry()
+        self.entities.add(self.car, layer=2)
+
+        # World-space render target when zoomed, scaled onto the screen
+        self.view_surface = None
+
+        # Tire smoke, sparks and skid marks; headless games skip them
+        self.effects_enabled = not headless
+        self.particles = ParticleSystem()
+        self.decals = DecalLayer()
+
+        # Replays (F5 records, F6 races the last recording)
+        self.recorder = None
+        self.last_replay = None
+        self.ghost = None
 
         self.run_manager = RunManager()
 
-        self.walls = [
-            pygame.Rect(1100, 1700, 1800, 20),
-            pygame.Rect(1100, 2000, 1800, 20),
-        ]
+        # Headless games are for simulation; they never touch saves
+        self.autosave_enabled = not headless
+
+        # Started by start_audio() once the first frame is on screen
+        self.voices = None
+        self.engine = None
+
+        # Steps detail down when frames run over budget (see run())
+        self.quality = QualityGovernor(enabled=QUALITY_GOVERNOR_ENABLED and not headless)
+        self.setup_quality()
 
-        self.engine = EngineSound("assets/sounds/engine_idle.mp3")
+        phase_start = self._mark_startup("world", phase_start)
 
-        self.font = pygame.font.SysFont("consolas", 32)
-        self.small_font = pygame.font.SysFont("consolas", 22)
+        if not headless:
+            self.font = assets.font("consolas", 32)
+            self.small_font = assets.font("consolas", 22)
+
+            self.hud = Hud((15, 15, 260, 140))
+            self.hud.add("speed", self.font, (30, 25))
+            self.hud.add("gear", self.small_font, (30, 65), (200, 200, 255))
+            self.hud.add("rpm", self.small_font, (130, 65), (180, 180, 180))
+            self.hud.add("level", self.small_font, (30, 100))
+            self.hud.add("timer", self.small_font, (150, 100))
+
+            self.upgrade_overlay = UpgradeOverlay(
+                self.font,
+                self.small_font,
+                RARITY_COLORS
+            )
+
+            self._mark_startup("hud", phase_start)
+
+    def _mark_startup(self, phase, phase_start):
+        now = time.perf_counter()
+        self.startup_times[phase] = now - phase_start
+        return now
+
+    def setup_quality(self):
+        # Added in the order they are given up
+        self.quality.add("particles", QUALITY_PARTICLE_LEVELS, self.set_effect_caps)
+        self.quality.add("shadows", QUALITY_SHADOW_LEVELS, self.set_shadows)
+        self.quality.add("offscreen", QUALITY_OFFSCREEN_LEVELS, self.set_offscreen_rates)
+        self.quality.add("audio", QUALITY_ENGINE_LAYERS, self.set_engine_layers)
+        self.quality.add("rotation", QUALITY_ROTATION_STEPS, sprite_cache.set_step)
+
+    def set_effect_caps(self, caps):
+        smoke_cap, spark_cap, decal_chunks = caps
+        self.particles.set_caps(smoke_cap, spark_cap)
+        self.decals.set_max_chunks(decal_chunks)
+
+    def set_shadows(self, enabled):
+        Car.shadows = enabled
+
+    def set_offscreen_rates(self, rates):
+        self.lod.set_rates(*rates)
+
+    def set_engine_layers(self, count):
+        # Only the layered backend has layers to drop
+        if hasattr(self.engine, "set_active_layers"):
+            self.engine.set_active_layers(count)
+
+    def start_audio(self):
+        from audio.engine import create_engine_sound
+        from audio.voices import VoiceManager
+
+        # Every channel is shared out by the voice manager, the engine's included
+        self.voices = VoiceManager(0, pygame.mixer.get_num_channels())
+
+        self.engine = create_engine_sound(
+            "assets/sounds/engine_idle.mp3",
+            voices=self.voices,
+            anchor=self.car,
+            priority=PLAYER_VOICE_PRIORITY
+        )
+        self.set_engine_layers(self.quality.value("audio"))
 
     # ==========================================================
     # MAIN LOOP
     # ==========================================================
     def run(self):
+        self.show_loading_screen()
+
         while self.running:
             self.dt = self.clock.tick(FPS) / 1000
-            self.handle_events()
+            self.profiler.begin_frame()
+
+            # Raw time is the last frame's work, without the limiter's sleep
+            self.quality.observe(self.clock.get_rawtime() / 1000)
+
+            with self.profiler.scope("events"):
+                self.handle_events()
+
+            self.step_physics(self.dt)
             self.update()
             self.draw()
 
+            # Audio loads behind the first frame instead of before it
+            if self.engine is None:
+                self.start_audio()
+
+            self.profiler.end_frame()
+
+        if self.profiler.frames_recorded:
+            self.profiler.dump(PROFILER_DUMP_PATH)
+
+        self.stop_recording()
+        self.autosave()
+
         pygame.quit()
 
+    def show_loading_screen(self):
+        # Wait for the preloaded images; sounds load when first asked for
+        while assets.images_loading and self.running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.running = False
+
+            self.screen.fill((0, 0, 0))
+
+            bar = pygame.Rect(0, 0, 400, 20)
+            bar.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+            pygame.draw.rect(self.screen, (255, 255, 255), bar, 2)
+
+            fill = bar.inflate(-6, -6)
+            fill.width = int(fill.width * assets.image_progress)
+            pygame.draw.rect(self.screen, (255, 255, 255), fill)
+
+            pygame.display.flip()
+            self.clock.tick(FPS)
+
+        # Don't count the loading time as the first frame's
+        self.clock.tick()
+
+    def step_physics(self, frame_time):
+        self.accumulator += frame_time
+
+        steps = 0
+        while self.accumulator >= PHYSICS_DT and steps < MAX_SUBSTEPS:
+            self.fixed_update(PHYSICS_DT)
+            self.accumulator -= PHYSICS_DT
+            steps += 1
+
+        # Too far behind: drop the backlog instead of spiralling
+        if steps == MAX_SUBSTEPS and self.accumulator >= PHYSICS_DT:
+            self.accumulator = 0.0
+
+        self.alpha = self.accumulator / PHYSICS_DT
+
+    def simulate(self, ticks, dt=PHYSICS_DT):
+        # Step physics as fast as possible, with no rendering or audio
+        for _ in range(ticks):
+            self.fixed_update(dt)
+
     # ==========================================================
     # EVENTS
     # ==========================================================
@@ -55,6 +257,26 @@ class Game:
                 if event.key == pygame.K_r:
                     self.reset_car()
 
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle()
+
+                if event.key == pygame.K_F5:
+                    if self.recorder is None:
+                        self.start_recording()
+                    else:
+                        self.stop_recording()
+
+                if event.key == pygame.K_F6:
+                    self.toggle_ghost()
+
+                if event.key == pygame.K_F9:
+                    self.load_autosave()
+
+                if event.key == pygame.K_MINUS:
+                    self.step_zoom(-1)
+                if event.key == pygame.K_EQUALS:
+                    self.step_zoom(1)
+
                 if self.run_manager.in_upgrade_phase:
                     if event.key == pygame.K_1:
                         self.select_upgrade(0)
@@ -64,68 +286,225 @@ class Game:
                         self.select_upgrade(2)
 
     def reset_car(self):
-        self.car.position = pygame.Vector2(
-            WORLD_WIDTH // 2,
-            WORLD_HEIGHT // 2
-        )
+        self.car.position = pygame.Vector2(self.track.spawn)
         self.car.velocity = pygame.Vector2(0, 0)
         self.car.angle = 0
+        self.car.store_previous_state()
+
+        if self.recorder is not None:
+            self.recorder.mark()
 
     def select_upgrade(self, index):
         if index < len(self.run_manager.available_upgrades):
             upgrade = self.run_manager.available_upgrades[index]
             self.run_manager.apply_upgrade(self.car, upgrade)
+            self.autosave()
+
+    # ==========================================================
+    # SAVES
+    # ==========================================================
+    def autosave(self):
+        if self.autosave_enabled:
+            from core.save_state import save_game
+
+            save_game(AUTOSAVE_PATH, self.run_manager, self.car)
+
+    def load_autosave(self):
+        from core.save_state import load_game, SaveError
+
+        try:
+            load_game(AUTOSAVE_PATH, self.run_manager, self.car)
+        except (OSError, SaveError):
+            return False
+
+        if self.recorder is not None:
+            self.recorder.mark()
+        return True
+
+    # ==========================================================
+    # REPLAYS
+    # ==========================================================
+    def start_recording(self, path=None):
+        if path is None:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            path = os.path.join(REPLAY_DIR, time.strftime("%Y%m%d-%H%M%S.rpl"))
+
+        from systems.replay import ReplayRecorder
+
+        self.recorder = ReplayRecorder(self.input.source, self.car, path)
+        self.input.set_source(self.recorder)
+
+    def stop_recording(self):
+        if self.recorder is None:
+            return
+
+        self.recorder.close()
+        self.input.set_source(self.recorder.source)
+
+        self.last_replay = self.recorder.writer.path
+        self.recorder = None
+
+    def toggle_ghost(self):
+        if self.ghost is not None:
+            self.entities.remove(self.ghost)
+            self.ghost.close()
+            self.ghost = None
+        elif self.last_replay is not None:
+            from vehicles.ghost_car import GhostCar
+
+            self.ghost = GhostCar(
+                self.last_replay,
+                collision=self.collision,
+                surface_grid=self.surfaces
+            )
+            self.entities.add(self.ghost, layer=1)
+
+    # ==========================================================
+    # WORLD
+    # ==========================================================
+    def add_traffic(self, car, driver=None):
+        car.surface_grid = self.surfaces
+        self.lod.add(car, driver)
+        self.entities.add(car, layer=0)
+        return car
+
+    def remove_traffic(self, car):
+        self.lod.remove(car)
+        self.entities.remove(car)
+
+    def step_zoom(self, direction):
+        levels = CAMERA_ZOOM_LEVELS
+        current = min(range(len(levels)), key=lambda i: abs(levels[i] - self.camera.zoom))
+        index = max(0, min(current + direction, len(levels) - 1))
+        self.camera.set_zoom(levels[index])
 
     # ==========================================================
     # UPDATE
     # ==========================================================
+    def fixed_update(self, dt):
+        with self.profiler.scope("run_manager"):
+            was_upgrading = self.run_manager.in_upgrade_phase
+            self.run_manager.update(dt)
+
+            if self.run_manager.in_upgrade_phase and not was_upgrading:
+                self.autosave()
+
+        with self.profiler.scope("car_physics"):
+            self.surfaces.sync()
+
+            # Input is only sampled (and recorded) on ticks the car
+            # drives, so a replay holds no frozen upgrade-phase ticks
+            if not self.run_manager.in_upgrade_phase:
+                controls = self.input.sample()
+                self.car.update(dt, controls)
+
+                impact_velocity = pygame.Vector2(self.car.velocity)
+                collided = self.collision.resolve(self.car)
+
+                if self.effects_enabled:
+                    self.emit_car_effects(self.car, impact_velocity, collided)
+
+                self.lod.update(dt, self.camera.get_view_rect())
+
+                # Ticks in step with the recording, which skips the upgrade phase
+                if self.ghost is not None:
+                    self.ghost.advance(dt)
+            else:
+                self.car.store_previous_state()
+
+                if self.ghost is not None:
+                    self.ghost.store_previous_state()
+
+    def emit_car_effects(self, car, impact_velocity, collided):
+        if car.drifting:
+            wheels = car.get_rear_wheel_positions()
+            previous_wheels = car.get_rear_wheel_positions(
+                car.previous_position,
+                car.previous_angle
+            )
+
+            for start, end in zip(previous_wheels, wheels):
+                self.decals.stamp_line(start, end)
+
+            self.particles.emit_smoke(wheels, car.velocity)
+
+        if collided:
+            normal = self.collision.last_normal
+            impact = -impact_velocity.dot(normal)
+
+            if impact > SPARK_MIN_SPEED:
+                point = car.position - normal * (car.size[1] / 2)
+                self.particles.emit_sparks(point, normal, impact)
+
     def update(self):
-        self.run_manager.update(self.dt)
+        with self.profiler.scope("camera"):
+            car_position, _ = self.car.get_render_state(self.alpha)
+            self.camera.update(car_position, self.dt)
+            self.entities.update()
 
-        if not self.run_manager.in_upgrade_phase:
-            self.car.update(self.dt)
+            # Streamed maps load what's about to come into view
+            self.track.prefetch(self.camera.get_view_rect(MAP_PREFETCH_MARGIN))
+
+        with self.profiler.scope("effects"):
+            self.particles.update(self.dt)
+
+        if self.engine is None:
+            return
 
-        self.camera.update(self.car.position, self.dt)
+        with self.profiler.scope("audio"):
+            listener = self.camera.offset + self.camera.view_size / 2
+            self.voices.update(listener)
 
-        rpm = self.car.get_engine_rpm()
-        self.engine.update(rpm, self.dt)
+            rpm = self.car.get_engine_rpm()
+            self.engine.update(rpm, self.dt)
 
     # ==========================================================
     # DRAW
     # ==========================================================
     def draw(self):
-        self.screen.fill((30, 150, 30))
+        target = self.get_world_target()
 
-        # -------- Track Geometry --------
-        straight_rect = pygame.Rect(1200, 1800, 1600, 200)
-        pygame.draw.rect(
-            self.screen,
-            (60, 60, 60),
-            straight_rect.move(-self.camera.offset)
-        )
+        with self.profiler.scope("world_draw"):
+            self.draw_world(target)
 
-        hairpin_rect = pygame.Rect(2600, 1400, 400, 400)
-        pygame.draw.rect(
-            self.screen,
-            (60, 60, 60),
-            hairpin_rect.move(-self.camera.offset)
-        )
+        with self.profiler.scope("car_draw"):
+            self.particles.draw(target, self.camera.offset, self.camera.get_view_rect(ENTITY_DRAW_MARGIN))
+            self.entities.draw(target, self.camera, self.alpha, ENTITY_DRAW_MARGIN)
 
-        drift_center = pygame.Vector2(1800, 1300)
-        pygame.draw.circle(
-            self.screen,
-            (60, 60, 60),
-            drift_center - self.camera.offset,
-            300
-        )
+            if target is not self.screen:
+                pygame.transform.scale(target, self.screen.get_size(), self.screen)
+
+        with self.profiler.scope("hud"):
+            self.draw_hud()
+
+            if self.run_manager.in_upgrade_phase:
+                self.draw_upgrade_overlay()
+
+        self.profiler.draw(self.screen)
 
-        # -------- Car --------
-        self.car.draw(self.screen, self.camera.offset)
+        with self.profiler.scope("flip"):
+            pygame.display.flip()
 
-        # ======================================================
-        # HUD
-        # ======================================================
+    def get_world_target(self):
+        if self.camera.zoom == 1:
+            return self.screen
 
+        width, height = self.camera.view_size
+        size = (math.ceil(width), math.ceil(height))
+
+        if self.view_surface is None or self.view_surface.get_size() != size:
+            self.view_surface = pygame.Surface(size).convert()
+
+        return self.view_surface
+
+    def draw_world(self, surface):
+        self.world_layer.draw(surface, self.camera.offset)
+        self.decals.draw(surface, self.camera.offset)
+
+    # ==========================================================
+    # HUD
+    # ==========================================================
+    def draw_hud(self):
         PIXELS_TO_MPH = 0.15
         speed = self.car.velocity.length()
         speed_mph = int(speed * PIXELS_TO_MPH)
@@ -137,87 +516,43 @@ class Game:
         else:
             speed_color = (0, 255, 0)
 
-        hud_rect = pygame.Rect(15, 15, 260, 140)
-        pygame.draw.rect(self.screen, (0, 0, 0), hud_rect)
-        pygame.draw.rect(self.screen, (255, 255, 255), hud_rect, 2)
-
-        speed_text = self.font.render(
-            f"{speed_mph} MPH",
-            True,
-            speed_color
-        )
-        self.screen.blit(speed_text, (30, 25))
-
-        gear_text = self.small_font.render(
-            f"GEAR: {self.car.current_gear}",
-            True,
-            (200, 200, 255)
-        )
-        self.screen.blit(gear_text, (30, 65))
-
-        rpm_text = self.small_font.render(
-            f"RPM: {int(self.car.get_engine_rpm() * 100)}%",
-            True,
-            (180, 180, 180)
-        )
-        self.screen.blit(rpm_text, (130, 65))
-
-        level_text = self.small_font.render(
-            f"LEVEL: {self.run_manager.current_level}",
-            True,
-            (255, 255, 255)
-        )
-        self.screen.blit(level_text, (30, 100))
+        self.hud.set("speed", f"{speed_mph} MPH", speed_color)
+        self.hud.set("gear", f"GEAR: {self.car.current_gear}")
+        self.hud.set("rpm", f"RPM: {int(self.car.get_engine_rpm() * 100)}%")
+        self.hud.set("level", f"LEVEL: {self.run_manager.current_level}")
 
         if not self.run_manager.in_upgrade_phase:
             time_left = int(
                 self.run_manager.level_duration -
                 self.run_manager.level_timer
             )
+            self.hud.set("timer", f"TIME: {time_left}")
+        else:
+            self.hud.set("timer", "")
 
-            timer_text = self.small_font.render(
-                f"TIME: {time_left}",
-                True,
-                (255, 255, 255)
-            )
-            self.screen.blit(timer_text, (150, 100))
-
-        # ======================================================
-        # UPGRADE PHASE
-        # ======================================================
-
-        if self.run_manager.in_upgrade_phase:
-            overlay = pygame.Surface(
-                (SCREEN_WIDTH, SCREEN_HEIGHT),
-                pygame.SRCALPHA
-            )
-            overlay.fill((0, 0, 0, 200))
-            self.screen.blit(overlay, (0, 0))
+        self.hud.draw(self.screen)
 
-            title = self.font.render(
-                "CHOOSE AN UPGRADE",
-                True,
-                (255, 255, 255)
+        if self.engine is not None and self.engine.error is not None:
+            # The game runs on silently, so say why
+            failed = text_cache.render(
+                self.small_font,
+                f"AUDIO UNAVAILABLE: {self.engine.error}",
+                (220, 90, 90)
             )
-            self.screen.blit(
-                title,
-                (SCREEN_WIDTH // 2 - 220, 200)
+            self.screen.blit(failed, (30, SCREEN_HEIGHT - 40))
+        elif self.engine is None or not self.engine.ready:
+            loading = text_cache.render(
+                self.small_font,
+                "LOADING AUDIO...",
+                (180, 180, 180)
             )
+            self.screen.blit(loading, (30, SCREEN_HEIGHT - 40))
 
-            for i, upgrade in enumerate(
-                self.run_manager.available_upgrades
-            ):
-                color = RARITY_COLORS[upgrade.rarity]
-
-                text = self.small_font.render(
-                    f"{i+1}. {upgrade.get_display_name()}",
-                    True,
-                    color
-                )
-
-                self.screen.blit(
-                    text,
-                    (SCREEN_WIDTH // 2 - 220, 260 + i * 40)
-                )
-
-        pygame.display.flip()
+    # ==========================================================
+    # UPGRADE PHASE
+    # ==========================================================
+    def draw_upgrade_overlay(self):
+        self.upgrade_overlay.draw(
+            self.screen,
+            self.run_manager.available_upgrades
+        )
@@ -1,11 +1,12 @@
 import pygame
+from settings import AUDIO_CHANNELS
 from game import Game
 
 def main():
     pygame.init()
 
     pygame.mixer.init(44100, -16, 2, 512)
-    pygame.mixer.set_num_channels(32)    
+    pygame.mixer.set_num_channels(AUDIO_CHANNELS)
 
     game = Game()
     game.run()
@@ -2,9 +2,110 @@ SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 FPS = 60
 
+# Fixed-timestep physics
+PHYSICS_HZ = 120
+PHYSICS_DT = 1 / PHYSICS_HZ
+MAX_SUBSTEPS = 8             # physics steps per rendered frame before dropping time
+DAMPING_REFERENCE_HZ = 60    # rate the per-tick damping constants were tuned at
+
 WORLD_WIDTH = 4000
 WORLD_HEIGHT = 4000
+WORLD_CHUNK_SIZE = 512      # px per side of a pre-rendered world chunk
+WORLD_LAYER_MAX_CHUNKS = 64 # pre-rendered chunks kept (1 MB each at 512 px)
 
 TITLE = "Phase Zero"
 
-PIXELS_TO_MPH = 0.12
\ No newline at end of file
+PIXELS_TO_MPH = 0.12
+
+# Sprite rotation cache
+ROTATION_STEP = 2                           # degrees per cached rotation
+ROTATION_CACHE_BUDGET = 32 * 1024 * 1024    # bytes
+
+# Frame profiler (F3 toggles it in game)
+PROFILER_ENABLED = False
+PROFILER_FRAMES = 600                       # ring buffer length
+PROFILER_DUMP_PATH = "profile.json"         # .json or .csv, written on exit
+
+# Surfaces (baked per cell from the track shapes)
+SURFACE_CELL_SIZE = 16                      # px per surface-grid cell
+SURFACE_MAX_DISTANCE = 512                  # px; further off the track reads as this
+SURFACE_DISTANCE_BUDGET = 1024 * 1024       # bytes of tile-map distance blocks kept baked
+SURFACE_GRIP = {"grass": 0.45, "tarmac": 1.0, "gravel": 0.6}   # x car grip
+SURFACE_DRAG = {"grass": 4.0, "tarmac": 1.0, "gravel": 2.5}    # x rolling drag
+
+# Collision
+COLLISION_CELL_SIZE = 128                   # px per wall-grid cell
+WALL_RESTITUTION = 0.2                      # bounce off walls (0 = none)
+WALL_FRICTION = 0.1                         # tangential speed lost per hit
+
+# HUD
+TEXT_CACHE_SIZE = 512                       # rendered strings kept in the LRU
+FONT_CACHE_PATH = "cache/fonts.json"        # resolved SysFont files, reused between launches
+
+# Audio
+AUDIO_CHANNELS = 32                         # mixer channels allocated at startup
+AUDIO_CACHE_DIR = "cache/engine_layers"     # resampled engine layers
+ENGINE_AUDIO_BACKEND = "layers"             # "layers" or "stream"
+ENGINE_STREAM_BUFFER = 1024                 # fewest frames per streamed buffer
+ENGINE_STREAM_LEAD = 3                      # frame times of audio each buffer covers
+ENGINE_STREAM_MAX_LEAD = 0.25               # s; longest buffer, so a stall doesn't add latency
+
+# Voice allocation
+VOICE_REFERENCE_DISTANCE = 300              # px at which a voice plays at full gain
+VOICE_MAX_DISTANCE = 2500                   # px beyond which a voice is culled
+VOICE_PAN_DISTANCE = 800                    # px offset for a hard left/right pan
+VOICE_AUDIBLE_THRESHOLD = 0.02              # gain below which a voice gets no channel
+PLAYER_VOICE_PRIORITY = 10.0                # keeps the player's engine from being stolen
+
+# Replays
+REPLAY_DIR = "replays"                      # F5 recordings are written here
+REPLAY_KEYFRAME_INTERVAL = 120              # physics ticks between car state keyframes
+GHOST_ALPHA = 110                           # ghost car opacity (0-255)
+
+# Saves
+AUTOSAVE_PATH = "saves/autosave.sav"        # written at level transitions and on quit
+
+# Vehicle level of detail (px beyond the view rect)
+LOD_FULL_MARGIN = 300                       # full physics every tick inside this
+LOD_REDUCED_MARGIN = 1200                   # reduced-rate physics inside this, coasting beyond
+LOD_REDUCED_INTERVAL = 4                    # ticks between reduced-rate updates
+LOD_DISTANT_PERIOD = 30                     # ticks to visit every coasting car once
+
+# Camera and culling
+CAMERA_ZOOM_LEVELS = (0.5, 0.75, 1.0, 1.5, 2.0)   # -/= step through these
+ENTITY_CELL_SIZE = 256                      # px per entity-registry cell
+ENTITY_DRAW_MARGIN = 32                     # px around the view still drawn
+
+# Particles and decals
+SMOKE_PARTICLE_CAP = 1024                   # tire smoke particles alive at once
+SPARK_PARTICLE_CAP = 256                    # wall sparks alive at once
+DECAL_MAX_CHUNKS = 24                       # skid-mark chunks kept (1 MB each at 512 px)
+SPARK_MIN_SPEED = 200                       # px/s into a wall before it sparks
+
+# Quality governor (frame budget is 1 / FPS)
+QUALITY_GOVERNOR_ENABLED = True
+QUALITY_WINDOW = 30                         # frames whose median work time is checked
+QUALITY_DOWN_RATIO = 0.9                    # step down over this fraction of the budget
+QUALITY_UP_RATIO = 0.6                      # step up under this fraction of the budget...
+QUALITY_UP_FRAMES = 180                     # ...for this many frames in a row
+QUALITY_UP_FRAMES_MAX = 1800                # doubled up to this when a step up doesn't hold
+
+# Quality levels, best first; settings are lowered in this order
+QUALITY_PARTICLE_LEVELS = (                 # (smoke cap, spark cap, decal chunks)
+    (SMOKE_PARTICLE_CAP, SPARK_PARTICLE_CAP, DECAL_MAX_CHUNKS),
+    (512, 128, 16),
+    (128, 32, 8),
+)
+QUALITY_SHADOW_LEVELS = (True, False)
+QUALITY_OFFSCREEN_LEVELS = (                # (reduced interval, distant period) in ticks
+    (LOD_REDUCED_INTERVAL, LOD_DISTANT_PERIOD),
+    (8, 60),
+    (16, 120),
+)
+QUALITY_ENGINE_LAYERS = (12, 6, 3)          # layered engine pitch layers mixed
+QUALITY_ROTATION_STEPS = (ROTATION_STEP, 4, 8)   # degrees per cached rotation
+
+# Streamed tile maps (baked with tools/bake_map.py)
+MAP_PATH = "maps/default"                   # loaded if baked, else the built-in track
+MAP_CHUNK_BUDGET = 4 * 1024 * 1024          # bytes of tile chunks kept loaded
+MAP_PREFETCH_MARGIN = 512                   # px around the view streamed in ahead
@@ -0,0 +1,281 @@
+import math
+import pygame
+from settings import COLLISION_CELL_SIZE, WALL_RESTITUTION, WALL_FRICTION
+
+
+# Fraction of the sweep to back off from a contact, so the car stops
+# just short of the wall instead of touching it.
+CONTACT_EPSILON = 0.01
+
+# Contacts resolved per step; leftover motion slides along each wall
+MAX_ITERATIONS = 3
+
+_WORLD_AXES = (pygame.Vector2(1, 0), pygame.Vector2(0, 1))
+
+
+# ==========================================================
+# SHAPES
+# ==========================================================
+
+class OrientedBox:
+    def __init__(self, center, half_length, half_width, angle):
+        self.center = pygame.Vector2(center)
+        self.half_length = half_length
+        self.half_width = half_width
+
+        # Same convention as Car: forward is (1, 0) rotated by -angle
+        self.forward = pygame.Vector2(1, 0).rotate(-angle)
+        self.right = pygame.Vector2(0, 1).rotate(-angle)
+
+    def corners(self):
+        f = self.forward * self.half_length
+        r = self.right * self.half_width
+        c = self.center
+        return [c + f + r, c + f - r, c - f - r, c - f + r]
+
+    def project(self, axis):
+        center = self.center.dot(axis)
+        extent = (
+            abs(self.forward.dot(axis)) * self.half_length +
+            abs(self.right.dot(axis)) * self.half_width
+        )
+        return center - extent, center + extent
+
+    def get_bounds(self):
+        x_min, x_max = self.project(_WORLD_AXES[0])
+        y_min, y_max = self.project(_WORLD_AXES[1])
+        return pygame.Rect(
+            math.floor(x_min),
+            math.floor(y_min),
+            math.ceil(x_max - x_min) + 1,
+            math.ceil(y_max - y_min) + 1
+        )
+
+
+def _project_rect(rect, axis):
+    center_x, center_y = rect.center
+    center = center_x * axis.x + center_y * axis.y
+    extent = abs(axis.x) * rect.width / 2 + abs(axis.y) * rect.height / 2
+    return center - extent, center + extent
+
+
+# ==========================================================
+# SPATIAL INDEX
+# ==========================================================
+
+class WallGrid:
+    """
+    Uniform grid over static wall rects.
+
+    Each wall is listed in every cell it overlaps, so a query only
+    looks at walls in the cells under the query rect.
+    """
+
+    def __init__(self, walls=(), cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.walls = []
+        self.cells = {}
+
+        self.rebuild(walls)
+
+    def rebuild(self, walls):
+        self.walls = [pygame.Rect(wall) for wall in walls]
+        self.cells = {}
+
+        for index, wall in enumerate(self.walls):
+            for cell in self._cells_in(wall):
+                self.cells.setdefault(cell, []).append(index)
+
+    def query(self, rect):
+        found = set()
+        for cell in self._cells_in(rect):
+            indices = self.cells.get(cell)
+            if indices:
+                found.update(indices)
+
+        return [self.walls[i] for i in found]
+
+    def _cells_in(self, rect):
+        size = self.cell_size
+
+        first_x = rect.left // size
+        first_y = rect.top // size
+        last_x = (rect.right - 1) // size
+        last_y = (rect.bottom - 1) // size
+
+        for cy in range(first_y, last_y + 1):
+            for cx in range(first_x, last_x + 1):
+                yield cx, cy
+
+
+# ==========================================================
+# SWEPT TESTS
+# ==========================================================
+
+def sweep_box_against_rect(box, motion, rect):
+    """
+    Continuous separating-axis test of a box moving by `motion`
+    against a static rect.
+
+    Returns (time, normal, depth) for the first contact in [0, 1],
+    or None. time is 0 with a positive depth when the box already
+    overlaps the rect; the normal always points away from the rect.
+    """
+    enter = -math.inf
+    leave = math.inf
+    hit_normal = None
+
+    min_overlap = math.inf
+    overlap_normal = None
+
+    for axis in (box.forward, box.right, *_WORLD_AXES):
+        box_min, box_max = box.project(axis)
+        rect_min, rect_max = _project_rect(rect, axis)
+        speed = motion.dot(axis)
+
+        if box_max <= rect_min:
+            if speed <= 0:
+                return None
+            axis_enter = (rect_min - box_max) / speed
+            axis_leave = (rect_max - box_min) / speed
+            normal = -axis
+        elif box_min >= rect_max:
+            if speed >= 0:
+                return None
+            axis_enter = (rect_max - box_min) / speed
+            axis_leave = (rect_min - box_max) / speed
+            normal = axis
+        else:
+            # Already overlapping on this axis
+            axis_enter = -math.inf
+            if speed > 0:
+                axis_leave = (rect_max - box_min) / speed
+            elif speed < 0:
+                axis_leave = (rect_min - box_max) / speed
+            else:
+                axis_leave = math.inf
+
+            push_positive = rect_max - box_min
+            push_negative = box_max - rect_min
+            if push_positive < push_negative:
+                depth, normal = push_positive, axis
+            else:
+                depth, normal = push_negative, -axis
+
+            if depth < min_overlap:
+                min_overlap = depth
+                overlap_normal = normal
+
+        if axis_enter > enter:
+            enter = axis_enter
+            hit_normal = normal
+        leave = min(leave, axis_leave)
+
+        if enter > leave or enter > 1 or leave < 0:
+            return None
+
+    if hit_normal is None:
+        # Overlapping on every axis: push out along the shallowest one
+        return 0.0, overlap_normal, min_overlap
+
+    return max(0.0, enter), hit_normal, 0.0
+
+
+# ==========================================================
+# COLLISION WORLD
+# ==========================================================
+
+class CollisionWorld:
+    """Resolves car movement against the walls of a TrackMap."""
+
+    def __init__(self, world_map, cell_size=COLLISION_CELL_SIZE):
+        self.world_map = world_map
+        self.grid = WallGrid(world_map.walls, cell_size)
+        self.map_version = world_map.version
+
+        # Normal of the wall hit by the last resolve() that collided
+        self.last_normal = None
+
+    def sync(self):
+        if self.world_map.version != self.map_version:
+            self.grid.rebuild(self.world_map.walls)
+            self.map_version = self.world_map.version
+
+    def get_car_box(self, car, position):
+        return OrientedBox(position, car.size[0] / 2, car.size[1] / 2, car.angle)
+
+    def resolve(self, car):
+        """
+        Sweep the car from where it started this step to where it ended
+        up, stopping it at the first wall and sliding along it.
+        """
+        self.sync()
+
+        start = pygame.Vector2(car.previous_position)
+        motion = car.position - start
+        collided = False
+
+        # Bounding circle of the car, for a cheap broad phase
+        radius = math.hypot(*car.size) / 2
+
+        for _ in range(MAX_ITERATIONS):
+            end = start + motion
+            swept = pygame.Rect(
+                math.floor(min(start.x, end.x) - radius),
+                math.floor(min(start.y, end.y) - radius),
+                math.ceil(abs(motion.x) + radius * 2) + 2,
+                math.ceil(abs(motion.y) + radius * 2) + 2
+            )
+
+            walls = self.grid.query(swept)
+            if not walls:
+                start = end
+                break
+
+            start_box = self.get_car_box(car, start)
+
+            # Earliest contact wins; among overlaps, the deepest
+            first = None
+            for wall in walls:
+                hit = sweep_box_against_rect(start_box, motion, wall)
+                if hit and (first is None or (hit[0], -hit[2]) < (first[0], -first[2])):
+                    first = hit
+
+            if first is None:
+                start += motion
+                break
+
+            time, normal, depth = first
+            collided = True
+            self.last_normal = normal
+
+            if depth > 0:
+                # Started inside a wall: push straight out
+                start += normal * depth
+            else:
+                start += motion * max(0.0, time - CONTACT_EPSILON)
+
+            self._respond(car, normal)
+
+            # Slide the remaining motion along the wall
+            remaining = motion * (1 - time)
+            motion = remaining - normal * remaining.dot(normal)
+
+            if motion.length_squared() < 1e-6:
+                break
+
+        car.position.update(start)
+        return collided
+
+    def _respond(self, car, normal):
+        into_wall = car.velocity.dot(normal)
+        if into_wall >= 0:
+            return
+
+        normal_velocity = normal * into_wall
+        tangent_velocity = car.velocity - normal_velocity
+
+        car.velocity = (
+            tangent_velocity * (1 - WALL_FRICTION) -
+            normal_velocity * WALL_RESTITUTION
+        )
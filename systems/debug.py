@@ -0,0 +1,211 @@
+import json
+import time
+import pygame
+import numpy as np
+from settings import SCREEN_WIDTH, FPS
+from core.assets import assets
+
+
+PROFILE_SCOPES = (
+    "events",
+    "run_manager",
+    "car_physics",
+    "camera",
+    "effects",
+    "audio",
+    "world_draw",
+    "car_draw",
+    "hud",
+    "flip",
+)
+
+
+class _Scope:
+    __slots__ = ("row", "index", "start")
+
+    def __init__(self, row, index):
+        self.row = row
+        self.index = index
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.row[self.index] += time.perf_counter() - self.start
+        return False
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class FrameProfiler:
+    """
+    Per-frame scope timings stored in a preallocated ring buffer.
+
+    Scopes are timed with `with profiler.scope("hud"):`. Time spent in
+    a scope is summed over the frame, so physics substeps add up. While
+    disabled, scope() hands back a shared no-op context manager.
+    """
+
+    def __init__(self, scopes=PROFILE_SCOPES, capacity=600, enabled=False):
+        self.scopes = tuple(scopes)
+        self.capacity = capacity
+        self.enabled = enabled
+        self.show_overlay = enabled
+
+        # One row per frame: a column per scope, then the frame total
+        self.samples = np.zeros((capacity, len(self.scopes) + 1))
+        self.cursor = 0
+        self.frames_recorded = 0
+
+        self.row = np.zeros(len(self.scopes) + 1)
+        self.frame_start = 0.0
+        self.frame_open = False
+        self._scope_objects = {
+            name: _Scope(self.row, i) for i, name in enumerate(self.scopes)
+        }
+
+        self.font = None
+        self.stats_refresh = 30
+        self.cached_stats = None
+
+    # ==========================================================
+    # RECORDING
+    # ==========================================================
+    def scope(self, name):
+        if not self.enabled:
+            return _NULL_SCOPE
+        return self._scope_objects[name]
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+
+        self.row[:] = 0
+        self.frame_start = time.perf_counter()
+        self.frame_open = True
+
+    def end_frame(self):
+        # Frames where the profiler was toggled on mid-frame are skipped
+        if not self.frame_open:
+            return
+
+        self.frame_open = False
+
+        self.row[-1] = time.perf_counter() - self.frame_start
+        self.samples[self.cursor] = self.row
+
+        self.cursor = (self.cursor + 1) % self.capacity
+        self.frames_recorded += 1
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.show_overlay = self.enabled
+
+    # ==========================================================
+    # STATISTICS
+    # ==========================================================
+    def recorded(self):
+        # Rows in chronological order, oldest first
+        if self.frames_recorded < self.capacity:
+            return self.samples[:self.frames_recorded]
+        return np.roll(self.samples, -self.cursor, axis=0)
+
+    def percentiles(self):
+        rows = self.recorded()
+        if len(rows) == 0:
+            return {}
+
+        p50 = np.percentile(rows, 50, axis=0)
+        p99 = np.percentile(rows, 99, axis=0)
+
+        names = self.scopes + ("frame",)
+        return {
+            name: (float(p50[i]), float(p99[i])) for i, name in enumerate(names)
+        }
+
+    # ==========================================================
+    # OVERLAY
+    # ==========================================================
+    def draw(self, surface):
+        if not self.show_overlay or self.frames_recorded == 0:
+            return
+
+        if self.font is None:
+            self.font = assets.font("consolas", 14)
+
+        if self.cached_stats is None or self.frames_recorded % self.stats_refresh == 0:
+            self.cached_stats = self.percentiles()
+
+        width, height = 300, 90
+        left = SCREEN_WIDTH - width - 15
+        top = 15
+
+        panel = pygame.Rect(left, top, width, height + 20 + 16 * len(self.cached_stats))
+        pygame.draw.rect(surface, (0, 0, 0), panel)
+        pygame.draw.rect(surface, (255, 255, 255), panel, 1)
+
+        # -------- Frame-time graph --------
+        budget = 1 / FPS
+        scale = height / (budget * 2)
+
+        totals = self.recorded()[-width:, -1]
+        points = [
+            (left + i, top + height - min(total * scale, height))
+            for i, total in enumerate(totals)
+        ]
+        if len(points) > 1:
+            pygame.draw.lines(surface, (0, 255, 0), False, points)
+
+        budget_y = top + height - budget * scale
+        pygame.draw.line(surface, (255, 80, 80), (left, budget_y), (left + width, budget_y))
+
+        # -------- Per-scope percentiles --------
+        y = top + height + 8
+        for name, (p50, p99) in self.cached_stats.items():
+            text = self.font.render(
+                f"{name:<12} p50 {p50 * 1000:6.2f}  p99 {p99 * 1000:6.2f} ms",
+                True,
+                (220, 220, 220)
+            )
+            surface.blit(text, (left + 6, y))
+            y += 16
+
+    # ==========================================================
+    # EXPORT
+    # ==========================================================
+    def dump(self, path):
+        rows = self.recorded()
+        names = self.scopes + ("frame",)
+
+        if path.endswith(".csv"):
+            with open(path, "w") as f:
+                f.write(",".join(names) + "\n")
+                for row in rows:
+                    f.write(",".join(f"{value:.9f}" for value in row) + "\n")
+            return
+
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "scopes": list(names),
+                    "frames": rows.tolist(),
+                    "percentiles": {
+                        name: {"p50": p50, "p99": p99}
+                        for name, (p50, p99) in self.percentiles().items()
+                    },
+                },
+                f
+            )
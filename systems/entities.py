@@ -0,0 +1,137 @@
+import math
+from settings import ENTITY_CELL_SIZE
+
+
+class _Entry:
+    __slots__ = ("entity", "radius", "layer", "order", "cell")
+
+    def __init__(self, entity, radius, layer, order, cell):
+        self.entity = entity
+        self.radius = radius
+        self.layer = layer
+        self.order = order
+        self.cell = cell
+
+
+class EntityRegistry:
+    """
+    Everything drawable in the world, bucketed in a uniform grid.
+
+    Entities need a `position` and a `draw(surface, offset, alpha)`.
+    Each one lives in the cell under its position; update() re-buckets
+    only the ones that crossed into a new cell. query() visits only the
+    cells around a rect, grown by the largest entity radius so nothing
+    overlapping the rect from a neighbouring cell is missed.
+    """
+
+    def __init__(self, cell_size=ENTITY_CELL_SIZE):
+        self.cell_size = cell_size
+
+        self.entries = {}   # id(entity) -> _Entry
+        self.cells = {}     # (cx, cy) -> set of _Entry
+
+        self.max_radius = 0
+        self.next_order = 0
+
+        # Entities re-bucketed by the last update()
+        self.moved = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, entity):
+        return id(entity) in self.entries
+
+    # ==========================================================
+    # ENTITIES
+    # ==========================================================
+    def add(self, entity, radius=None, layer=0):
+        """Register an entity. Lower layers draw first; radius defaults to its size."""
+        if entity in self:
+            self.remove(entity)
+
+        if radius is None:
+            radius = math.hypot(*entity.size) / 2
+
+        entry = _Entry(entity, radius, layer, self.next_order, self._cell_of(entity.position))
+        self.next_order += 1
+
+        self.entries[id(entity)] = entry
+        self.cells.setdefault(entry.cell, set()).add(entry)
+        self.max_radius = max(self.max_radius, radius)
+
+        return entity
+
+    def remove(self, entity):
+        entry = self.entries.pop(id(entity), None)
+        if entry is not None:
+            self._unlink(entry)
+
+    def update(self):
+        moved = 0
+
+        for entry in self.entries.values():
+            cell = self._cell_of(entry.entity.position)
+            if cell != entry.cell:
+                self._unlink(entry)
+                entry.cell = cell
+                self.cells.setdefault(cell, set()).add(entry)
+                moved += 1
+
+        self.moved = moved
+
+    # ==========================================================
+    # QUERIES
+    # ==========================================================
+    def query(self, rect):
+        """Entities that may overlap rect, in draw order."""
+        reach = math.ceil(self.max_radius)
+        size = self.cell_size
+
+        left = (rect.left - reach) // size
+        top = (rect.top - reach) // size
+        right = (rect.right + reach) // size
+        bottom = (rect.bottom + reach) // size
+
+        found = []
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                cell = self.cells.get((cx, cy))
+                if not cell:
+                    continue
+
+                for entry in cell:
+                    x, y = entry.entity.position
+                    r = entry.radius
+                    if (
+                        x + r >= rect.left and x - r <= rect.right and
+                        y + r >= rect.top and y - r <= rect.bottom
+                    ):
+                        found.append(entry)
+
+        found.sort(key=lambda entry: (entry.layer, entry.order))
+        return [entry.entity for entry in found]
+
+    def draw(self, surface, camera, alpha=1.0, margin=0):
+        visible = self.query(camera.get_view_rect(margin))
+        for entity in visible:
+            entity.draw(surface, camera.offset, alpha)
+        return len(visible)
+
+    # ==========================================================
+    # INTERNALS
+    # ==========================================================
+    def _cell_of(self, position):
+        return (
+            int(position[0] // self.cell_size),
+            int(position[1] // self.cell_size)
+        )
+
+    def _unlink(self, entry):
+        cell = self.cells.get(entry.cell)
+        if cell is None:
+            return
+
+        cell.discard(entry)
+        if not cell:
+            del self.cells[entry.cell]
@@ -0,0 +1,183 @@
+import pygame
+from collections import OrderedDict
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, TEXT_CACHE_SIZE
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces, keyed by font, text and color."""
+
+    def __init__(self, capacity=TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (id(font), text, color)
+
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+
+        self.entries[key] = surface
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+
+text_cache = TextCache()
+
+
+# ==========================================================
+# WIDGETS
+# ==========================================================
+
+class TextWidget:
+    def __init__(self, font, position, color=(255, 255, 255)):
+        self.font = font
+        self.position = position
+
+        self.text = ""
+        self.color = color
+        self.surface = None
+        self.rect = pygame.Rect(position, (0, 0))
+
+    def set(self, text, color=None):
+        # Returns the area that needs repainting, or None if unchanged
+        color = color if color else self.color
+        if text == self.text and color == self.color:
+            return None
+
+        old_rect = self.rect
+
+        self.text = text
+        self.color = color
+
+        if text:
+            self.surface = text_cache.render(self.font, text, color)
+            self.rect = self.surface.get_rect(topleft=self.position)
+        else:
+            self.surface = None
+            self.rect = pygame.Rect(self.position, (0, 0))
+
+        return old_rect.union(self.rect)
+
+    def draw(self, surface):
+        if self.surface is not None:
+            surface.blit(self.surface, self.rect)
+
+
+class Hud:
+    """
+    Retained HUD panel composited into one cached surface.
+
+    Widgets are positioned relative to the panel. When a widget's text
+    changes, only its old and new area is repainted on the cached
+    surface; the screen gets one blit per frame.
+    """
+
+    def __init__(self, rect, background=(0, 0, 0), border=(255, 255, 255)):
+        self.rect = pygame.Rect(rect)
+        self.widgets = {}
+
+        self.background = pygame.Surface(self.rect.size).convert()
+        self.background.fill(background)
+        pygame.draw.rect(self.background, border, self.background.get_rect(), 2)
+
+        self.surface = self.background.copy()
+        self.dirty_rects = []
+
+    def add(self, name, font, position, color=(255, 255, 255)):
+        x, y = position
+        local = (x - self.rect.x, y - self.rect.y)
+
+        self.widgets[name] = TextWidget(font, local, color)
+
+    def set(self, name, text, color=None):
+        dirty = self.widgets[name].set(text, color)
+        if dirty is not None:
+            self.dirty_rects.append(dirty)
+
+    def draw(self, surface):
+        if self.dirty_rects:
+            self._repaint()
+
+        surface.blit(self.surface, self.rect)
+
+    def _repaint(self):
+        for rect in self.dirty_rects:
+            self.surface.blit(self.background, rect, rect)
+
+        # Neighbours overlapping a repainted area are drawn again too
+        for widget in self.widgets.values():
+            if widget.rect.collidelist(self.dirty_rects) != -1:
+                widget.draw(self.surface)
+
+        self.dirty_rects.clear()
+
+
+# ==========================================================
+# UPGRADE OVERLAY
+# ==========================================================
+
+class UpgradeOverlay:
+    """
+    Full-screen upgrade prompt, rebuilt only when the offered
+    upgrades change.
+    """
+
+    def __init__(self, font, small_font, colors):
+        self.font = font
+        self.small_font = small_font
+        self.colors = colors
+
+        # Built on first use, not at startup
+        self.dim = None
+        self.title = None
+
+        self.surface = None
+        self.upgrades = None
+
+    def draw(self, surface, upgrades):
+        if self.surface is None or upgrades != self.upgrades:
+            self._build(upgrades)
+
+        surface.blit(self.surface, (0, 0))
+
+    def _build(self, upgrades):
+        self.upgrades = list(upgrades)
+
+        if self.dim is None:
+            self.dim = pygame.Surface(
+                (SCREEN_WIDTH, SCREEN_HEIGHT),
+                pygame.SRCALPHA
+            ).convert_alpha()
+            self.dim.fill((0, 0, 0, 200))
+
+            self.title = self.font.render("CHOOSE AN UPGRADE", True, (255, 255, 255))
+
+        self.surface = self.dim.copy()
+        self.surface.blit(self.title, (SCREEN_WIDTH // 2 - 220, 200))
+
+        for i, upgrade in enumerate(self.upgrades):
+            text = self.small_font.render(
+                f"{i+1}. {upgrade.get_display_name()}",
+                True,
+                # Rarities from a newer build's save have no colour here
+                self.colors.get(upgrade.rarity, (255, 255, 255))
+            )
+
+            self.surface.blit(
+                text,
+                (SCREEN_WIDTH // 2 - 220, 260 + i * 40)
+            )
@@ -0,0 +1,151 @@
+import pygame
+
+
+class Controls:
+    """Driver controls for a single physics tick."""
+
+    __slots__ = ("throttle", "brake", "left", "right", "drift")
+
+    def __init__(self, throttle=False, brake=False, left=False, right=False, drift=False):
+        self.throttle = throttle
+        self.brake = brake
+        self.left = left
+        self.right = right
+        self.drift = drift
+
+    @property
+    def steer(self):
+        # Right wins when both are held, as it always has
+        if self.right:
+            return -1
+        if self.left:
+            return 1
+        return 0
+
+    def copy(self):
+        return Controls(self.throttle, self.brake, self.left, self.right, self.drift)
+
+    def __eq__(self, other):
+        return isinstance(other, Controls) and (
+            self.throttle == other.throttle and
+            self.brake == other.brake and
+            self.left == other.left and
+            self.right == other.right and
+            self.drift == other.drift
+        )
+
+    def __repr__(self):
+        held = [name for name in self.__slots__ if getattr(self, name)]
+        return f"Controls({', '.join(held)})"
+
+
+NO_CONTROLS = Controls()
+
+
+# ==========================================================
+# INPUT SOURCES
+# ==========================================================
+
+class InputSource:
+    def sample(self):
+        raise NotImplementedError
+
+
+class KeyboardInput(InputSource):
+    def sample(self):
+        keys = pygame.key.get_pressed()
+
+        return Controls(
+            throttle=keys[pygame.K_w],
+            brake=keys[pygame.K_s],
+            left=keys[pygame.K_a],
+            right=keys[pygame.K_d],
+            drift=keys[pygame.K_SPACE],
+        )
+
+
+class ScriptedInput(InputSource):
+    """
+    Plays a list of (ticks, Controls) segments in order.
+
+    Once the script runs out it keeps returning NO_CONTROLS, or starts
+    over when loop is set.
+    """
+
+    def __init__(self, segments, loop=False):
+        self.segments = list(segments)
+        self.loop = loop
+
+        self.segment_index = 0
+        self.ticks_left = self.segments[0][0] if self.segments else 0
+
+    def sample(self):
+        while self.ticks_left <= 0:
+            self.segment_index += 1
+
+            if self.segment_index >= len(self.segments):
+                if not self.loop or not self.segments:
+                    return NO_CONTROLS
+                self.segment_index = 0
+
+            self.ticks_left = self.segments[self.segment_index][0]
+
+        self.ticks_left -= 1
+        return self.segments[self.segment_index][1]
+
+
+class RecordedInput(InputSource):
+    """Plays back one Controls per tick, as captured by InputRecorder."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.tick = 0
+
+    @property
+    def finished(self):
+        return self.tick >= len(self.frames)
+
+    def sample(self):
+        if self.finished:
+            return NO_CONTROLS
+
+        controls = self.frames[self.tick]
+        self.tick += 1
+        return controls
+
+
+class InputRecorder(InputSource):
+    """Passes another source through, keeping every sample."""
+
+    def __init__(self, source):
+        self.source = source
+        self.frames = []
+
+    def sample(self):
+        controls = self.source.sample()
+        self.frames.append(controls)
+        return controls
+
+    def playback(self):
+        return RecordedInput(list(self.frames))
+
+
+# ==========================================================
+# INPUT MANAGER
+# ==========================================================
+
+class InputManager:
+    """Samples the active source exactly once per physics tick."""
+
+    def __init__(self, source=None):
+        self.source = source if source else KeyboardInput()
+        self.current = NO_CONTROLS
+        self.tick = 0
+
+    def set_source(self, source):
+        self.source = source
+
+    def sample(self):
+        self.current = self.source.sample()
+        self.tick += 1
+        return self.current
@@ -0,0 +1,195 @@
+import math
+from systems.input import NO_CONTROLS
+from vehicles.car import VELOCITY_DRAG
+from settings import (
+    DAMPING_REFERENCE_HZ,
+    LOD_FULL_MARGIN,
+    LOD_REDUCED_MARGIN,
+    LOD_REDUCED_INTERVAL,
+    LOD_DISTANT_PERIOD,
+)
+
+
+class LodTier:
+    FULL = 0        # full physics every tick
+    REDUCED = 1     # full physics every few ticks, with the elapsed time
+    DISTANT = 2     # coarse kinematics, time-sliced across ticks
+
+
+class LodEntry:
+    __slots__ = ("car", "driver", "tier", "pending", "phase")
+
+    def __init__(self, car, driver, phase):
+        self.car = car
+        self.driver = driver
+        self.tier = LodTier.FULL
+
+        # Simulated time this car is owed since its last update
+        self.pending = 0.0
+
+        # Staggers reduced-rate updates so they don't all land on one tick
+        self.phase = phase
+
+
+class LodScheduler:
+    """
+    Steps a population of cars at a fidelity set by distance to the view.
+
+    Cars inside the view plus full_margin get full physics every tick.
+    Out to reduced_margin they are stepped every reduced_interval ticks
+    with the time they are owed. Beyond that they coast on their
+    current velocity, and only a slice of them is updated each tick so
+    that every distant car is visited once per distant_period ticks.
+
+    A car crossing inward first catches up on the time it is owed at
+    its old tier, so it arrives at the new tier with its position up
+    to date and no interpolation jump.
+
+    Drivers are polled once per update, not once per tick, so they
+    should decide from the car's state rather than count ticks.
+    """
+
+    def __init__(
+        self,
+        collision=None,
+        full_margin=LOD_FULL_MARGIN,
+        reduced_margin=LOD_REDUCED_MARGIN,
+        reduced_interval=LOD_REDUCED_INTERVAL,
+        distant_period=LOD_DISTANT_PERIOD
+    ):
+        self.collision = collision
+
+        self.full_margin = full_margin
+        self.reduced_margin = reduced_margin
+        self.reduced_interval = reduced_interval
+        self.distant_period = distant_period
+
+        self.entries = []
+        self.tick = 0
+
+        # The distant list is rebuilt every tick, so the time slice
+        # resumes after the last car it coasted rather than at an index
+        self.last_coasted = None
+
+        # Cars per tier after the last update, and cars actually stepped
+        self.tier_counts = [0, 0, 0]
+        self.updated = 0
+
+    # ==========================================================
+    # ENTITIES
+    # ==========================================================
+    def add(self, car, driver=None):
+        entry = LodEntry(car, driver, len(self.entries) % self.reduced_interval)
+        self.entries.append(entry)
+        return entry
+
+    def remove(self, car):
+        self.entries = [entry for entry in self.entries if entry.car is not car]
+
+    def cars(self):
+        return [entry.car for entry in self.entries]
+
+    def set_rates(self, reduced_interval, distant_period):
+        # Cars keep the time they are owed, so this can change any tick
+        self.reduced_interval = reduced_interval
+        self.distant_period = distant_period
+
+    # ==========================================================
+    # UPDATE
+    # ==========================================================
+    def update(self, dt, view_rect):
+        self.tick += 1
+        self.updated = 0
+
+        full_rect = view_rect.inflate(self.full_margin * 2, self.full_margin * 2)
+        reduced_rect = view_rect.inflate(self.reduced_margin * 2, self.reduced_margin * 2)
+
+        counts = [0, 0, 0]
+        distant = []
+        start = 0
+
+        for entry in self.entries:
+            position = entry.car.position
+
+            if full_rect.collidepoint(position):
+                tier = LodTier.FULL
+            elif reduced_rect.collidepoint(position):
+                tier = LodTier.REDUCED
+            else:
+                tier = LodTier.DISTANT
+
+            if tier < entry.tier:
+                self._promote(entry)
+            entry.tier = tier
+
+            entry.pending += dt
+            counts[tier] += 1
+
+            if tier == LodTier.FULL:
+                self._step(entry)
+            elif tier == LodTier.REDUCED:
+                if (self.tick + entry.phase) % self.reduced_interval == 0:
+                    self._step(entry)
+            else:
+                distant.append(entry)
+
+            if entry is self.last_coasted:
+                start = len(distant)
+
+        if distant:
+            budget = math.ceil(len(distant) / self.distant_period)
+            for i in range(start, start + budget):
+                entry = distant[i % len(distant)]
+                self._coast(entry)
+            self.last_coasted = entry
+
+        self.tier_counts = counts
+
+    def _promote(self, entry):
+        # Settle the time owed at the old tier before the new one starts
+        if entry.pending > 0:
+            if entry.tier == LodTier.DISTANT:
+                self._coast(entry)
+            else:
+                self._step(entry)
+
+        entry.car.store_previous_state()
+
+    # ==========================================================
+    # INTEGRATION
+    # ==========================================================
+    def _step(self, entry):
+        car = entry.car
+        controls = entry.driver.sample() if entry.driver else NO_CONTROLS
+
+        car.update(entry.pending, controls)
+        if self.collision is not None:
+            self.collision.resolve(car)
+
+        entry.pending = 0.0
+        self.updated += 1
+
+    def _coast(self, entry):
+        car = entry.car
+        elapsed = entry.pending
+
+        car.store_previous_state()
+
+        # Same drag and damping as Car.step, over the whole coast at once
+        damping_steps = elapsed * DAMPING_REFERENCE_HZ
+
+        drag_scale = 1.0
+        if car.surface_grid is not None:
+            drag_scale = car.surface_grid.multipliers_at(*car.position)[1]
+
+        car.velocity *= VELOCITY_DRAG ** (damping_steps * drag_scale)
+        car.angular_velocity *= car.stats.angular_damping ** damping_steps
+        car.angle += car.angular_velocity * elapsed
+        car.position += car.velocity * elapsed
+
+        # The sweep covers the whole coast, so walls still stop it
+        if self.collision is not None:
+            self.collision.resolve(car)
+
+        entry.pending = 0.0
+        self.updated += 1
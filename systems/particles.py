@@ -0,0 +1,226 @@
+import pygame
+import numpy as np
+from settings import SMOKE_PARTICLE_CAP, SPARK_PARTICLE_CAP
+
+
+SIZE_BUCKETS = 8
+ALPHA_BUCKETS = 8
+
+
+class ParticlePool:
+    """
+    Fixed-capacity particles stored as NumPy columns.
+
+    Slots are handed out round-robin, so once the pool is full each new
+    particle replaces the oldest one. Update is a handful of array ops
+    for the whole pool, and drawing is a single blits() call using
+    sprites pre-rendered per (size, alpha) bucket.
+    """
+
+    def __init__(self, capacity, color, start_size, end_size, drag, start_alpha=255):
+        self.color = color
+        self.start_size = start_size
+        self.end_size = end_size
+        self.drag = drag              # fraction of velocity kept per second
+        self.start_alpha = start_alpha
+
+        self.capacity = 0
+        self.resize(capacity)
+
+        self.sprites = self._build_sprites()
+        self.sprite_half = np.array(
+            [sprite.get_width() / 2 for sprite in self.sprites],
+            dtype=np.float32
+        )
+
+        # Live particles overwritten before they finished
+        self.recycled = 0
+
+    # ==========================================================
+    # STORAGE
+    # ==========================================================
+    def resize(self, capacity):
+        """Change the cap, keeping the newest particles that still fit."""
+        keep = []
+        if self.capacity:
+            live = np.flatnonzero(self.alive)
+            keep = live[np.argsort(self.age[live])][:capacity]
+
+        position = np.zeros((capacity, 2), dtype=np.float32)
+        velocity = np.zeros((capacity, 2), dtype=np.float32)
+        age = np.ones(capacity, dtype=np.float32)
+        lifetime = np.zeros(capacity, dtype=np.float32)
+
+        if len(keep):
+            count = len(keep)
+            position[:count] = self.position[keep]
+            velocity[:count] = self.velocity[keep]
+            age[:count] = self.age[keep]
+            lifetime[:count] = self.lifetime[keep]
+
+        self.position = position
+        self.velocity = velocity
+        self.age = age
+        self.lifetime = lifetime
+
+        self.capacity = capacity
+        self.cursor = len(keep) % capacity if capacity else 0
+
+    @property
+    def alive(self):
+        return self.age < self.lifetime
+
+    @property
+    def count(self):
+        return int(np.count_nonzero(self.alive))
+
+    # ==========================================================
+    # EMIT + UPDATE
+    # ==========================================================
+    def emit(self, positions, velocities, lifetimes):
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 2)
+        count = min(len(positions), self.capacity)
+        if count == 0:
+            return
+
+        slots = (self.cursor + np.arange(count)) % self.capacity
+        self.cursor = int(slots[-1] + 1) % self.capacity
+
+        self.recycled += int(np.count_nonzero(self.age[slots] < self.lifetime[slots]))
+
+        self.position[slots] = positions[:count]
+        self.velocity[slots] = np.asarray(velocities, dtype=np.float32).reshape(-1, 2)[:count]
+        self.lifetime[slots] = np.broadcast_to(lifetimes, (len(positions),))[:count]
+        self.age[slots] = 0
+
+    def update(self, dt):
+        alive = self.alive
+        if not alive.any():
+            return
+
+        self.velocity[alive] *= self.drag ** dt
+        self.position[alive] += self.velocity[alive] * dt
+        self.age[alive] += dt
+
+    # ==========================================================
+    # DRAW
+    # ==========================================================
+    def draw(self, surface, offset, view_rect):
+        alive = self.alive
+        if not alive.any():
+            return
+
+        position = self.position[alive]
+        progress = self.age[alive] / self.lifetime[alive]
+
+        visible = (
+            (position[:, 0] >= view_rect.left) & (position[:, 0] < view_rect.right) &
+            (position[:, 1] >= view_rect.top) & (position[:, 1] < view_rect.bottom)
+        )
+        if not visible.any():
+            return
+
+        position = position[visible]
+        progress = progress[visible]
+
+        # Grows from start_size to end_size while fading out
+        size_bucket = np.minimum((progress * SIZE_BUCKETS).astype(np.int64), SIZE_BUCKETS - 1)
+        alpha_bucket = np.minimum((progress * ALPHA_BUCKETS).astype(np.int64), ALPHA_BUCKETS - 1)
+        sprite_index = size_bucket * ALPHA_BUCKETS + alpha_bucket
+
+        half = self.sprite_half[sprite_index]
+        x = (position[:, 0] - offset.x - half).astype(np.int64)
+        y = (position[:, 1] - offset.y - half).astype(np.int64)
+
+        sprites = self.sprites
+        surface.blits(
+            [
+                (sprites[i], (px, py))
+                for i, px, py in zip(sprite_index.tolist(), x.tolist(), y.tolist())
+            ],
+            doreturn=False
+        )
+
+    def _build_sprites(self):
+        sprites = []
+
+        for size_bucket in range(SIZE_BUCKETS):
+            t = size_bucket / (SIZE_BUCKETS - 1)
+            radius = max(1, round(self.start_size + (self.end_size - self.start_size) * t))
+
+            for alpha_bucket in range(ALPHA_BUCKETS):
+                alpha = round(self.start_alpha * (1 - alpha_bucket / ALPHA_BUCKETS))
+
+                sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(sprite, (*self.color, alpha), (radius, radius), radius)
+                sprites.append(sprite)
+
+        return sprites
+
+
+class ParticleSystem:
+    """Tire smoke and wall sparks for the cars in view."""
+
+    def __init__(self, smoke_cap=SMOKE_PARTICLE_CAP, spark_cap=SPARK_PARTICLE_CAP, seed=None):
+        self.seed = seed
+        self._rng = None
+
+        self.smoke = ParticlePool(
+            smoke_cap,
+            color=(200, 200, 200),
+            start_size=4,
+            end_size=18,
+            drag=0.1,
+            start_alpha=90
+        )
+
+        self.sparks = ParticlePool(
+            spark_cap,
+            color=(255, 200, 80),
+            start_size=2,
+            end_size=1,
+            drag=0.02
+        )
+
+    @property
+    def rng(self):
+        # numpy.random is slow to import; don't pay for it before the first emit
+        if self._rng is None:
+            self._rng = np.random.default_rng(self.seed)
+        return self._rng
+
+    def emit_smoke(self, points, car_velocity):
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        count = len(points)
+
+        # Left behind the car, drifting slowly outward
+        velocity = np.asarray(car_velocity, dtype=np.float32) * 0.1
+        velocities = velocity + self.rng.normal(0, 25, (count, 2))
+
+        self.smoke.emit(points, velocities, self.rng.uniform(0.6, 1.2, count))
+
+    def emit_sparks(self, point, normal, speed, count=12):
+        normal = np.asarray(normal, dtype=np.float32)
+        tangent = np.array((-normal[1], normal[0]), dtype=np.float32)
+
+        # Sprayed off the wall, along it in both directions
+        along = self.rng.uniform(-1, 1, count)[:, None] * tangent
+        away = self.rng.uniform(0.2, 1, count)[:, None] * normal
+        velocities = (along + away) * min(speed, 800) * self.rng.uniform(0.3, 1, count)[:, None]
+
+        points = np.broadcast_to(np.asarray(point, dtype=np.float32), (count, 2))
+        self.sparks.emit(points, velocities, self.rng.uniform(0.15, 0.4, count))
+
+    def set_caps(self, smoke_cap, spark_cap):
+        if smoke_cap != self.smoke.capacity:
+            self.smoke.resize(smoke_cap)
+        if spark_cap != self.sparks.capacity:
+            self.sparks.resize(spark_cap)
+
+    def update(self, dt):
+        self.smoke.update(dt)
+        self.sparks.update(dt)
+
+    def draw(self, surface, offset, view_rect):
+        self.smoke.draw(surface, offset, view_rect)
+        self.sparks.draw(surface, offset, view_rect)
@@ -0,0 +1,196 @@
+from collections import deque
+from settings import (
+    FPS,
+    QUALITY_WINDOW,
+    QUALITY_DOWN_RATIO,
+    QUALITY_UP_RATIO,
+    QUALITY_UP_FRAMES,
+    QUALITY_UP_FRAMES_MAX,
+)
+
+
+class QualitySetting:
+    __slots__ = ("name", "levels", "apply", "level", "pinned")
+
+    def __init__(self, name, levels, apply):
+        self.name = name
+        self.levels = tuple(levels)     # best first
+        self.apply = apply
+        self.level = 0
+        self.pinned = False
+
+    @property
+    def value(self):
+        return self.levels[self.level]
+
+    @property
+    def lowest(self):
+        return len(self.levels) - 1
+
+
+class QualityGovernor:
+    """
+    Trades detail for frame time when frames run over budget.
+
+    Feed it each frame's work time (without the frame limiter's sleep)
+    through observe(). Once the median of the last `window` frames is
+    over down_ratio of the budget, one setting drops a level; once it
+    has stayed under up_ratio for up_frames frames, one comes back.
+
+    Settings are lowered a level at a time, round-robin in the order
+    they were added, and raised again in reverse, so the first added
+    is the first to go and the last to return. The gap between the two
+    ratios, refilling the window after every change and doubling
+    up_frames whenever a step up has to be undone keep it from
+    oscillating.
+
+    Pinned settings hold their level and are skipped by the governor;
+    pin everything to benchmark at a fixed quality.
+    """
+
+    def __init__(
+        self,
+        budget=1 / FPS,
+        window=QUALITY_WINDOW,
+        down_ratio=QUALITY_DOWN_RATIO,
+        up_ratio=QUALITY_UP_RATIO,
+        up_frames=QUALITY_UP_FRAMES,
+        max_up_frames=QUALITY_UP_FRAMES_MAX,
+        enabled=True
+    ):
+        self.budget = budget
+        self.down_ratio = down_ratio
+        self.up_ratio = up_ratio
+        self.base_up_frames = up_frames
+        self.up_frames = up_frames
+        self.max_up_frames = max_up_frames
+        self.enabled = enabled
+
+        self.settings = {}
+
+        self.history = deque(maxlen=window)
+        self.frames_under = 0
+
+        # Frames since the last step up, to spot one that didn't hold
+        self.since_step_up = None
+
+    # ==========================================================
+    # SETTINGS
+    # ==========================================================
+    def add(self, name, levels, apply):
+        """Register a setting; apply(value) is called with its best level now."""
+        setting = QualitySetting(name, levels, apply)
+        self.settings[name] = setting
+        apply(setting.value)
+        return setting
+
+    def value(self, name):
+        return self.settings[name].value
+
+    @property
+    def levels(self):
+        return {name: setting.level for name, setting in self.settings.items()}
+
+    def set_level(self, name, level):
+        setting = self.settings[name]
+        level = max(0, min(level, setting.lowest))
+
+        if level != setting.level:
+            setting.level = level
+            setting.apply(setting.value)
+
+    # ==========================================================
+    # PINNING
+    # ==========================================================
+    def pin(self, name, level=None):
+        """Hold a setting at `level` (default: where it is now)."""
+        if level is not None:
+            self.set_level(name, level)
+        self.settings[name].pinned = True
+
+    def unpin(self, name):
+        self.settings[name].pinned = False
+
+    def pin_all(self, level):
+        # Levels past a setting's lowest clamp to it, so pin_all(99) is "all lowest"
+        for name in self.settings:
+            self.pin(name, level)
+
+    def unpin_all(self):
+        for setting in self.settings.values():
+            setting.pinned = False
+        self.reset()
+
+    # ==========================================================
+    # GOVERNING
+    # ==========================================================
+    def observe(self, frame_time):
+        """Record a frame's work time; returns the setting changed, if any."""
+        if not self.enabled:
+            return None
+
+        history = self.history
+        history.append(frame_time)
+
+        if self.since_step_up is not None:
+            self.since_step_up += 1
+
+        if len(history) < history.maxlen:
+            return None
+
+        median = sorted(history)[len(history) // 2]
+
+        if median > self.budget * self.down_ratio:
+            return self.step_down()
+
+        if median < self.budget * self.up_ratio:
+            self.frames_under += 1
+            if self.frames_under >= self.up_frames:
+                return self.step_up()
+        else:
+            self.frames_under = 0
+
+        return None
+
+    def step_down(self):
+        candidates = [
+            setting for setting in self.settings.values()
+            if not setting.pinned and setting.level < setting.lowest
+        ]
+        if not candidates:
+            return None
+
+        # A step up that couldn't hold makes the next one wait longer
+        if self.since_step_up is not None and self.since_step_up < self.up_frames:
+            self.up_frames = min(self.up_frames * 2, self.max_up_frames)
+        self.since_step_up = None
+
+        setting = min(candidates, key=lambda s: s.level)
+        self.set_level(setting.name, setting.level + 1)
+        self.reset()
+        return setting
+
+    def step_up(self):
+        candidates = [
+            setting for setting in reversed(self.settings.values())
+            if not setting.pinned and setting.level > 0
+        ]
+        if not candidates:
+            self.frames_under = 0
+            return None
+
+        setting = max(candidates, key=lambda s: s.level)
+        self.set_level(setting.name, setting.level - 1)
+        self.reset()
+        self.since_step_up = 0
+
+        # Back at full quality: nothing left to undo
+        if all(s.level == 0 for s in self.settings.values()):
+            self.up_frames = self.base_up_frames
+
+        return setting
+
+    def reset(self):
+        # Frames measured at the old levels say nothing about the new ones
+        self.history.clear()
+        self.frames_under = 0
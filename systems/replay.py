@@ -0,0 +1,438 @@
+import mmap
+import struct
+from bisect import bisect_right
+from systems.input import Controls, InputSource, NO_CONTROLS
+from settings import PHYSICS_HZ, REPLAY_KEYFRAME_INTERVAL
+
+
+# ==========================================================
+# FILE FORMAT
+# ==========================================================
+#
+#   header    "PZRP", version u8, physics hz u16, keyframe interval u16
+#   records   RUN       control bits (0-31), varint ticks held
+#             KEYFRAME  0x20, tick u32, position/velocity/angle/
+#                       angular velocity as float32, gear u8
+#             INDEX     0x40, varint count, then varint deltas of
+#                       (tick, file offset) for every keyframe
+#   trailer   index offset u64, "PZIX"
+#
+# Inputs are run-length encoded, so a held input costs nothing per
+# tick and every change costs two or three bytes. Runs never span a
+# keyframe, so playback can start at any keyframe. The index and
+# trailer are written on close; files from a crashed session are
+# scanned for keyframes instead.
+
+MAGIC = b"PZRP"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBHH")
+KEYFRAME = struct.Struct("<I6fB")
+TRAILER = struct.Struct("<Q4s")
+TRAILER_MAGIC = b"PZIX"
+
+TAG_KEYFRAME = 0x20
+TAG_INDEX = 0x40
+
+_CONTROL_BITS = (
+    ("throttle", 1),
+    ("brake", 2),
+    ("left", 4),
+    ("right", 8),
+    ("drift", 16),
+)
+
+
+def controls_to_bits(controls):
+    bits = 0
+    for name, bit in _CONTROL_BITS:
+        if getattr(controls, name):
+            bits |= bit
+    return bits
+
+
+def bits_to_controls(bits):
+    return _CONTROLS_BY_BITS[bits]
+
+
+# One shared Controls per bit pattern, so playback never allocates
+_CONTROLS_BY_BITS = tuple(
+    Controls(**{name: bool(bits & bit) for name, bit in _CONTROL_BITS})
+    for bits in range(32)
+)
+
+
+def _write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, offset):
+    value = 0
+    shift = 0
+
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+# ==========================================================
+# KEYFRAMES
+# ==========================================================
+
+class Keyframe:
+    """Car state at the start of a tick, before that tick's input."""
+
+    __slots__ = ("tick", "x", "y", "vx", "vy", "angle", "angular_velocity", "gear")
+
+    def __init__(self, tick, x, y, vx, vy, angle, angular_velocity, gear):
+        self.tick = tick
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.angle = angle
+        self.angular_velocity = angular_velocity
+        self.gear = gear
+
+    @classmethod
+    def from_car(cls, tick, car):
+        return cls(
+            tick,
+            car.position.x,
+            car.position.y,
+            car.velocity.x,
+            car.velocity.y,
+            car.angle,
+            car.angular_velocity,
+            car.current_gear
+        )
+
+    def pack(self):
+        return KEYFRAME.pack(
+            self.tick,
+            self.x,
+            self.y,
+            self.vx,
+            self.vy,
+            self.angle,
+            self.angular_velocity,
+            self.gear
+        )
+
+    def apply(self, car):
+        car.position.update(self.x, self.y)
+        car.velocity.update(self.vx, self.vy)
+        car.angle = self.angle
+        car.angular_velocity = self.angular_velocity
+        car.current_gear = self.gear
+
+
+# ==========================================================
+# WRITING
+# ==========================================================
+
+class ReplayWriter:
+    """Streams one Controls (and the car state it is applied to) per tick."""
+
+    def __init__(self, path, physics_hz=PHYSICS_HZ, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, physics_hz, keyframe_interval))
+        self.offset = HEADER.size
+
+        self.tick = 0
+        self.run_bits = None
+        self.run_length = 0
+        self.force_keyframe = True
+
+        self.keyframes = []
+
+    def write(self, controls, car):
+        if self.force_keyframe or self.tick % self.keyframe_interval == 0:
+            self._flush_run()
+            self._write_keyframe(car)
+            self.force_keyframe = False
+
+        bits = controls_to_bits(controls)
+
+        if bits != self.run_bits:
+            self._flush_run()
+            self.run_bits = bits
+
+        self.run_length += 1
+        self.tick += 1
+
+    def mark(self):
+        # The car jumped (reset, teleport): store its state next tick
+        self.force_keyframe = True
+
+    def close(self):
+        if self.file is None:
+            return
+
+        self._flush_run()
+
+        index_offset = self.offset
+        record = bytearray((TAG_INDEX,))
+        _write_varint(record, len(self.keyframes))
+
+        last_tick = 0
+        last_offset = 0
+        for tick, offset in self.keyframes:
+            _write_varint(record, tick - last_tick)
+            _write_varint(record, offset - last_offset)
+            last_tick = tick
+            last_offset = offset
+
+        record += TRAILER.pack(index_offset, TRAILER_MAGIC)
+        self._append(record)
+
+        self.file.close()
+        self.file = None
+
+    def _write_keyframe(self, car):
+        self.keyframes.append((self.tick, self.offset))
+        self._append(bytes((TAG_KEYFRAME,)) + Keyframe.from_car(self.tick, car).pack())
+
+    def _flush_run(self):
+        if self.run_length == 0:
+            return
+
+        record = bytearray((self.run_bits,))
+        _write_varint(record, self.run_length)
+        self._append(record)
+
+        self.run_length = 0
+        self.run_bits = None
+
+    def _append(self, data):
+        self.file.write(data)
+        self.offset += len(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayRecorder(InputSource):
+    """Passes another source through, writing every tick to a replay file."""
+
+    def __init__(self, source, car, path):
+        self.source = source
+        self.car = car
+        self.writer = ReplayWriter(path)
+
+    def sample(self):
+        controls = self.source.sample()
+        self.writer.write(controls, self.car)
+        return controls
+
+    def mark(self):
+        self.writer.mark()
+
+    def close(self):
+        self.writer.close()
+
+
+# ==========================================================
+# READING
+# ==========================================================
+
+class ReplayReader:
+    """
+    Memory-mapped replay file.
+
+    Nothing is decoded up front except the keyframe index; playback
+    walks the mapped bytes, so the OS only pages in what is played.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{self.path} is not a replay file")
+
+        magic, version, self.physics_hz, self.keyframe_interval = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} replay file")
+
+        self.end = len(self.data)
+        self.keyframe_ticks = []
+        self.keyframe_offsets = []
+
+        if not self._read_index():
+            self._scan_index()
+
+    @property
+    def ticks(self):
+        # Ticks up to the last keyframe, plus whatever follows it
+        if not self.keyframe_offsets:
+            return 0
+
+        tick = self.keyframe_ticks[-1]
+        offset = self.keyframe_offsets[-1] + 1 + KEYFRAME.size
+
+        while offset < self.end and self.data[offset] < TAG_KEYFRAME:
+            length, offset = _read_varint(self.data, offset + 1)
+            tick += length
+
+        return tick
+
+    def keyframe(self, index):
+        offset = self.keyframe_offsets[index]
+        return Keyframe(*KEYFRAME.unpack_from(self.data, offset + 1))
+
+    def keyframe_before(self, tick):
+        """Index of the last keyframe at or before tick."""
+        return max(0, bisect_right(self.keyframe_ticks, tick) - 1)
+
+    def playback(self, tick=0):
+        return ReplayInput(self, tick)
+
+    def close(self):
+        # Safe to call twice; the mapping is released on the first
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_index(self):
+        if self.end < HEADER.size + TRAILER.size:
+            return False
+
+        index_offset, magic = TRAILER.unpack_from(self.data, self.end - TRAILER.size)
+        if magic != TRAILER_MAGIC or self.data[index_offset] != TAG_INDEX:
+            return False
+
+        count, offset = _read_varint(self.data, index_offset + 1)
+
+        tick = 0
+        record_offset = 0
+        for _ in range(count):
+            delta, offset = _read_varint(self.data, offset)
+            tick += delta
+            delta, offset = _read_varint(self.data, offset)
+            record_offset += delta
+
+            self.keyframe_ticks.append(tick)
+            self.keyframe_offsets.append(record_offset)
+
+        self.end = index_offset
+        return True
+
+    def _scan_index(self):
+        offset = HEADER.size
+        data = self.data
+
+        while offset < self.end:
+            tag = data[offset]
+
+            if tag == TAG_KEYFRAME:
+                if offset + 1 + KEYFRAME.size > self.end:
+                    break
+                self.keyframe_ticks.append(KEYFRAME.unpack_from(data, offset + 1)[0])
+                self.keyframe_offsets.append(offset)
+                offset += 1 + KEYFRAME.size
+            elif tag < TAG_KEYFRAME:
+                try:
+                    _, offset = _read_varint(data, offset + 1)
+                except IndexError:
+                    break
+            else:
+                break
+
+        # Drop a record cut off by a crash
+        self.end = min(offset, self.end)
+
+
+class ReplayInput(InputSource):
+    """
+    Streams the Controls of a replay, one per tick.
+
+    Starts at the keyframe at or before `tick` and skips forward to
+    it exactly. The keyframe most recently passed is left in
+    `keyframe` until a consumer takes it, for snapping a ghost car
+    back onto the recording.
+    """
+
+    def __init__(self, reader, tick=0):
+        self.reader = reader
+        self.current = NO_CONTROLS
+        self.run_left = 0
+        self.keyframe = None
+
+        if reader.keyframe_offsets:
+            index = reader.keyframe_before(tick)
+            self.tick = reader.keyframe_ticks[index]
+            self.offset = reader.keyframe_offsets[index]
+        else:
+            self.tick = 0
+            self.offset = reader.end
+
+        self.finished = False
+
+        while self.tick < tick and not self.finished:
+            self.sample()
+
+        # Skipped keyframes are behind the start tick
+        self.keyframe = None
+
+    def sample(self):
+        while self.run_left == 0:
+            if not self._next_record():
+                self.finished = True
+                return NO_CONTROLS
+
+        self.run_left -= 1
+        self.tick += 1
+        return self.current
+
+    def take_keyframe(self):
+        keyframe = self.keyframe
+        self.keyframe = None
+        return keyframe
+
+    def _next_record(self):
+        data = self.reader.data
+        offset = self.offset
+
+        if offset >= self.reader.end:
+            return False
+
+        tag = data[offset]
+
+        if tag == TAG_KEYFRAME:
+            self.keyframe = Keyframe(*KEYFRAME.unpack_from(data, offset + 1))
+            self.offset = offset + 1 + KEYFRAME.size
+            return True
+
+        if tag < TAG_KEYFRAME:
+            self.current = bits_to_controls(tag)
+            self.run_left, self.offset = _read_varint(data, offset + 1)
+            return True
+
+        return False
@@ -0,0 +1,153 @@
+"""
+Bake a TrackMap into a streamed tile map.
+
+Each tile takes the colour of the last track shape covering its centre
+(or the background), chunks that are all background are left out, and
+walls are kept as rects for collision. --copies N lays the track out
+N x N times, for worlds bigger than the built-in one.
+
+Usage (from the repository root):
+    python -m tools.bake_map
+    python -m tools.bake_map maps/big --copies 8 --tile-size 16
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pygame
+
+from settings import MAP_PATH, WORLD_CHUNK_SIZE
+from world.map import TrackMap, TrackShape, GRASS_COLOR, TARMAC_COLOR, GRAVEL_COLOR, MAP_FILE, MAP_FORMAT_VERSION
+
+
+DEFAULT_TILE_SIZE = 8
+
+TILE_NAMES = {
+    GRASS_COLOR: "grass",
+    TARMAC_COLOR: "tarmac",
+    GRAVEL_COLOR: "gravel",
+}
+
+
+def tile_palette(track):
+    # The background is always tile 0
+    colors = [tuple(track.background)]
+    for shape in track.shapes:
+        if tuple(shape.color) not in colors:
+            colors.append(tuple(shape.color))
+
+    return [
+        {"name": TILE_NAMES.get(color, "tile_{}_{}_{}".format(*color)), "color": list(color)}
+        for color in colors
+    ]
+
+
+def bake_chunk(shapes, origin, tile_size, chunk_tiles):
+    # Tile centres in world space
+    steps = (np.arange(chunk_tiles) + 0.5) * tile_size
+    x = origin[0] + steps[None, :]
+    y = origin[1] + steps[:, None]
+
+    tiles = np.zeros((chunk_tiles, chunk_tiles), dtype=np.uint8)
+
+    # Later shapes draw over earlier ones, as in TrackMap.draw_region
+    for shape, tile in shapes:
+        if shape.kind == "rect":
+            rect = shape.bounds
+            inside = (x >= rect.left) & (x < rect.right) & (y >= rect.top) & (y < rect.bottom)
+        else:
+            inside = (x - shape.center.x) ** 2 + (y - shape.center.y) ** 2 <= shape.radius ** 2
+
+        tiles[inside] = tile
+
+    return tiles
+
+
+def bake(track, path, tile_size=DEFAULT_TILE_SIZE, chunk_size=WORLD_CHUNK_SIZE, copies=1):
+    if chunk_size % tile_size:
+        raise ValueError("chunk size must be a whole number of tiles")
+
+    chunk_tiles = chunk_size // tile_size
+    tiles = tile_palette(track)
+    colors = [tuple(tile["color"]) for tile in tiles]
+
+    # Every shape and wall, once per copy
+    shapes = []
+    walls = []
+    for copy_y in range(copies):
+        for copy_x in range(copies):
+            offset = pygame.Vector2(copy_x * track.width, copy_y * track.height)
+
+            for shape in track.shapes:
+                moved = TrackShape(
+                    shape.kind,
+                    shape.bounds.move(offset),
+                    shape.color,
+                    shape.center + offset if shape.center is not None else None,
+                    shape.radius
+                )
+                shapes.append((moved, colors.index(tuple(shape.color))))
+
+            walls.extend(wall.move(offset) for wall in track.walls)
+
+    chunks_x = -(-track.width * copies // chunk_size)
+    chunks_y = -(-track.height * copies // chunk_size)
+
+    os.makedirs(os.path.join(path, "chunks"), exist_ok=True)
+
+    stored = []
+    for cy in range(chunks_y):
+        for cx in range(chunks_x):
+            region = pygame.Rect(cx * chunk_size, cy * chunk_size, chunk_size, chunk_size)
+            touching = [(shape, tile) for shape, tile in shapes if shape.bounds.colliderect(region)]
+            if not touching:
+                continue
+
+            chunk = bake_chunk(touching, region.topleft, tile_size, chunk_tiles)
+            if not chunk.any():
+                continue
+
+            np.save(os.path.join(path, "chunks", f"{cx}_{cy}.npy"), chunk)
+            stored.append([cx, cy])
+
+    meta = {
+        "version": MAP_FORMAT_VERSION,
+        "tile_size": tile_size,
+        "chunk_tiles": chunk_tiles,
+        "chunks": [chunks_x, chunks_y],
+        "tiles": tiles,
+        "background": 0,
+        "spawn": list(track.spawn),
+        "walls": [list(wall) for wall in walls],
+        "stored": stored,
+    }
+
+    # Written last, so a map is only loadable once its chunks are on disk
+    with open(os.path.join(path, MAP_FILE), "w") as f:
+        json.dump(meta, f)
+
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default=MAP_PATH, help="map directory to write")
+    parser.add_argument("--tile-size", type=int, default=DEFAULT_TILE_SIZE, help="px per tile")
+    parser.add_argument("--chunk-size", type=int, default=WORLD_CHUNK_SIZE, help="px per chunk")
+    parser.add_argument("--copies", type=int, default=1, help="lay the track out N x N times")
+    args = parser.parse_args()
+
+    meta = bake(TrackMap.default(), args.path, args.tile_size, args.chunk_size, args.copies)
+
+    chunks_x, chunks_y = meta["chunks"]
+    print(
+        f"{args.path}: {chunks_x * args.chunk_size}x{chunks_y * args.chunk_size} px, "
+        f"{len(meta['stored'])} of {chunks_x * chunks_y} chunks stored"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Parity check between CarFleet and the scalar Car model.
+
+Drives a set of Cars and a CarFleet with the same scripted controls,
+each running free from the same start state, and reports the largest
+divergence in every state column seen at each comparison (relative to
+the column's size, for continuous ones). With
+--surfaces the cars start around the default track and both models
+read grip and drag from its surface grid.
+
+Usage (from the repository root):
+    python -m tools.fleet_parity [--cars 32] [--ticks 1200] [--seed 1] [--surfaces] [--interval 60]
+"""
+import argparse
+import random
+import sys
+
+import numpy as np
+
+from settings import PHYSICS_DT
+from vehicles.car import Car, GEAR_RATIOS
+from vehicles.car_fleet import CarFleet
+from vehicles.car_stats import CarStats
+from world.map import TrackMap
+from world.surface_grid import SurfaceGrid
+
+
+# Continuous columns are compared relative to their size (at least 1),
+# since rounding grows with the values over a free-running test
+POSITION_TOLERANCE = 1e-9
+VELOCITY_TOLERANCE = 1e-9
+ANGLE_TOLERANCE = 1e-9
+RPM_TOLERANCE = 1e-9
+
+# Gear and RPM jump at each gear threshold, so cars this close to one
+# can land either side from rounding alone and are not compared there
+GEAR_BOUNDARY = 1e-9
+
+# Ticks between comparisons of the free-running models
+DEFAULT_INTERVAL = 60
+
+
+def random_stats(rng):
+    return CarStats(
+        acceleration=rng.uniform(300, 900),
+        brake_force=rng.uniform(1800, 3000),
+        turn_speed=rng.uniform(300, 600),
+        max_speed=rng.uniform(900, 2000),
+        grip=rng.uniform(2.0, 5.0),
+        drift_grip=rng.uniform(0.2, 0.8),
+        angular_damping=rng.uniform(0.94, 0.98),
+        drift_assist_force=rng.uniform(1000, 2000),
+        oversteer_strength=rng.uniform(3.0, 12.0),
+    )
+
+
+def random_controls(rng, count):
+    # Held inputs change every few ticks, like a human driver
+    throttle = np.array([rng.random() < 0.8 for _ in range(count)])
+    brake = np.array([rng.random() < 0.1 for _ in range(count)])
+    steer = np.array([rng.choice((-1, 0, 0, 1)) for _ in range(count)])
+    drift = np.array([rng.random() < 0.3 for _ in range(count)])
+    return throttle, brake, steer, drift
+
+
+def relative_error(fleet_value, car_value):
+    fleet_value = np.asarray(fleet_value, dtype=np.float64)
+    car_value = np.asarray(car_value, dtype=np.float64)
+    return float(np.abs(fleet_value - car_value).max() / max(1.0, np.abs(car_value).max()))
+
+
+def near_gear_boundary(car):
+    speed_ratio = min(car.velocity.length() / car.stats.max_speed, 1)
+    return any(abs(speed_ratio - ratio) < GEAR_BOUNDARY for ratio in GEAR_RATIOS[1:])
+
+
+def compare(fleet, scalar_cars, errors):
+    for i, car in enumerate(scalar_cars):
+        errors["position"] = max(errors["position"], relative_error(fleet.position[i], tuple(car.position)))
+        errors["velocity"] = max(errors["velocity"], relative_error(fleet.velocity[i], tuple(car.velocity)))
+        errors["angle"] = max(errors["angle"], relative_error(fleet.angle[i], car.angle))
+        errors["angular_velocity"] = max(
+            errors["angular_velocity"],
+            relative_error(fleet.angular_velocity[i], car.angular_velocity)
+        )
+
+        if near_gear_boundary(car):
+            errors["boundary_skips"] += 1
+            continue
+
+        errors["engine_rpm"] = max(
+            errors["engine_rpm"],
+            abs(fleet.engine_rpm[i] - car.engine_rpm)
+        )
+        if fleet.current_gear[i] != car.current_gear:
+            errors["gear_mismatches"] += 1
+
+
+def run(cars=32, ticks=1200, seed=1, dt=PHYSICS_DT, surfaces=False, interval=DEFAULT_INTERVAL):
+    rng = random.Random(seed)
+
+    scalar_cars = [Car(0, 0, random_stats(rng)) for _ in range(cars)]
+    fleet = CarFleet(capacity=cars)
+
+    if surfaces:
+        track = TrackMap.default()
+        grid = SurfaceGrid(track)
+        fleet.surface_grid = grid
+
+        # Scattered around the spawn, so cars cross on and off the tarmac
+        for car in scalar_cars:
+            car.surface_grid = grid
+            car.position.update(
+                track.spawn.x + rng.uniform(-800, 800),
+                track.spawn.y + rng.uniform(-400, 400)
+            )
+            car.store_previous_state()
+
+    for car in scalar_cars:
+        fleet.add_from_car(car)
+
+    errors = {
+        "position": 0.0,
+        "velocity": 0.0,
+        "angle": 0.0,
+        "angular_velocity": 0.0,
+        "engine_rpm": 0.0,
+        "gear_mismatches": 0,
+        "boundary_skips": 0,
+    }
+
+    controls = random_controls(rng, cars)
+
+    # Both models run free from the same start state, so divergence
+    # that builds up over many ticks shows up in the comparison.
+    for tick in range(1, ticks + 1):
+        if (tick - 1) % 30 == 0:
+            controls = random_controls(rng, cars)
+
+        throttle, brake, steer, drift = controls
+
+        for i, car in enumerate(scalar_cars):
+            car.step(dt, throttle[i], brake[i], steer[i], drift[i])
+
+        fleet.step(dt, throttle, brake, steer, drift)
+
+        if tick % interval == 0 or tick == ticks:
+            compare(fleet, scalar_cars, errors)
+
+    return errors
+
+
+def check(errors):
+    return (
+        errors["position"] <= POSITION_TOLERANCE and
+        errors["velocity"] <= VELOCITY_TOLERANCE and
+        errors["angle"] <= ANGLE_TOLERANCE and
+        errors["angular_velocity"] <= ANGLE_TOLERANCE and
+        errors["engine_rpm"] <= RPM_TOLERANCE and
+        errors["gear_mismatches"] == 0
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cars", type=int, default=32)
+    parser.add_argument("--ticks", type=int, default=1200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--surfaces", action="store_true", help="drive on the default track's surfaces")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL, help="ticks between comparisons")
+    args = parser.parse_args()
+
+    errors = run(args.cars, args.ticks, args.seed, surfaces=args.surfaces, interval=args.interval)
+
+    for name, value in errors.items():
+        print(f"{name:>18}: {value}")
+
+    passed = check(errors)
+    print("PASS" if passed else "FAIL")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
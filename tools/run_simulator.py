@@ -0,0 +1,265 @@
+"""
+Monte Carlo run simulator for upgrade and economy balancing.
+
+Plays whole runs headlessly: RunManager timers expire, upgrades are
+offered from its seeded pool, a selection policy picks one and it is
+applied to a Car. Runs are spread over a process pool, and the
+distribution of final stats, rarity frequencies and level reached is
+written as CSV (one row per run) and/or JSON (summary).
+
+Usage (from the repository root):
+    python -m tools.run_simulator --runs 20000 --policy greedy --json summary.json
+    python -m tools.run_simulator --policy scripted --script 0 1 2 --csv runs.csv
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.run_manager import RunManager
+from core.upgrades.base_upgrade import RARITY_WEIGHTS
+from vehicles.car import Car
+from vehicles.car_stats import STAT_NAMES
+
+
+DEFAULT_LEVELS = 10
+BATCH_SIZE = 250
+
+# How much the greedy policy values each stat, relative to its base
+GREEDY_WEIGHTS = {
+    "acceleration": 1.0,
+    "max_speed": 1.0,
+    "grip": 0.5,
+    "oversteer_strength": 0.25,
+}
+
+
+# ==========================================================
+# POLICIES
+# ==========================================================
+
+class RandomPolicy:
+    def choose(self, car, upgrades, rng, level):
+        return rng.randrange(len(upgrades))
+
+
+class GreedyPolicy:
+    """Picks the upgrade that most raises a weighted sum of stat gains."""
+
+    def __init__(self, weights=GREEDY_WEIGHTS):
+        self.weights = weights
+
+    def score(self, car):
+        stats = car.stats
+        base = car.base_stats
+        return sum(
+            weight * getattr(stats, name) / getattr(base, name)
+            for name, weight in self.weights.items()
+        )
+
+    def choose(self, car, upgrades, rng, level):
+        snapshot = car.stat_stack.snapshot()
+        scores = []
+
+        for upgrade in upgrades:
+            upgrade.apply(car)
+            scores.append(self.score(car))
+            car.stat_stack.restore(snapshot)
+
+        return scores.index(max(scores))
+
+
+class ScriptedPolicy:
+    """Picks offer indices from a fixed script, one per level, looping."""
+
+    def __init__(self, script):
+        self.script = list(script)
+
+    def choose(self, car, upgrades, rng, level):
+        return self.script[(level - 1) % len(self.script)] % len(upgrades)
+
+
+def make_policy(name, script=None):
+    if name == "random":
+        return RandomPolicy()
+    if name == "greedy":
+        return GreedyPolicy()
+    if name == "scripted":
+        return ScriptedPolicy(script or [0])
+    raise ValueError(f"Unknown policy: {name}")
+
+
+# ==========================================================
+# SIMULATION
+# ==========================================================
+
+def simulate_run(seed, policy, levels=DEFAULT_LEVELS):
+    run_manager = RunManager(seed=seed)
+    car = Car(0, 0)
+    rng = random.Random(f"{seed}:policy")
+
+    offered = Counter()
+    chosen = Counter()
+    chosen_types = Counter()
+
+    while run_manager.current_level <= levels:
+        # Let the level timer run out
+        run_manager.update(run_manager.level_duration)
+
+        upgrades = run_manager.available_upgrades
+        if not upgrades:
+            break
+
+        offered.update(upgrade.rarity for upgrade in upgrades)
+
+        index = policy.choose(car, upgrades, rng, run_manager.current_level)
+
+        upgrade = upgrades[index]
+        chosen[upgrade.rarity] += 1
+        chosen_types[type(upgrade).__name__] += 1
+
+        run_manager.apply_upgrade(car, upgrade)
+
+    result = {
+        "seed": seed,
+        "level_reached": run_manager.current_level,
+        "total_money": run_manager.total_money,
+    }
+    result.update(zip(STAT_NAMES, car.stats.as_tuple()))
+
+    for rarity in RARITY_WEIGHTS:
+        result[f"offered_{rarity.lower()}"] = offered[rarity]
+        result[f"chosen_{rarity.lower()}"] = chosen[rarity]
+
+    result["chosen_types"] = dict(chosen_types)
+    return result
+
+
+def _simulate_batch(seeds, policy_name, script, levels):
+    policy = make_policy(policy_name, script)
+    return [simulate_run(seed, policy, levels) for seed in seeds]
+
+
+def simulate_runs(runs, policy_name="random", script=None, levels=DEFAULT_LEVELS, seed=0, workers=None):
+    seeds = [seed * 1_000_003 + i for i in range(runs)]
+    batches = [seeds[i:i + BATCH_SIZE] for i in range(0, runs, BATCH_SIZE)]
+
+    if workers == 1:
+        results = []
+        for batch in batches:
+            results.extend(_simulate_batch(batch, policy_name, script, levels))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_simulate_batch, batch, policy_name, script, levels)
+            for batch in batches
+        ]
+
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+
+# ==========================================================
+# REPORTING
+# ==========================================================
+
+def summarize(results):
+    summary = {"runs": len(results), "stats": {}, "rarity": {}, "level_reached": {}}
+
+    # No runs means nothing to summarize, not a crash on empty arrays
+    if not results:
+        return summary
+
+    for name in STAT_NAMES:
+        values = np.array([result[name] for result in results], dtype=np.float64)
+        summary["stats"][name] = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "p5": float(np.percentile(values, 5)),
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "max": float(values.max()),
+        }
+
+    for kind in ("offered", "chosen"):
+        totals = {
+            rarity: sum(result[f"{kind}_{rarity.lower()}"] for result in results)
+            for rarity in RARITY_WEIGHTS
+        }
+        count = sum(totals.values()) or 1
+        summary["rarity"][kind] = {
+            rarity: total / count for rarity, total in totals.items()
+        }
+
+    levels = Counter(result["level_reached"] for result in results)
+    summary["level_reached"] = {str(level): levels[level] for level in sorted(levels)}
+
+    types = Counter()
+    for result in results:
+        types.update(result["chosen_types"])
+    summary["chosen_types"] = dict(types)
+
+    return summary
+
+
+def write_csv(path, results):
+    fields = [key for key in results[0] if key != "chosen_types"] if results else []
+
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=positive_int, default=10000)
+    parser.add_argument("--levels", type=int, default=DEFAULT_LEVELS)
+    parser.add_argument("--policy", choices=("random", "greedy", "scripted"), default="random")
+    parser.add_argument("--script", type=int, nargs="+", help="offer indices for the scripted policy")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=positive_int, default=os.cpu_count())
+    parser.add_argument("--csv", help="write one row per run to this file")
+    parser.add_argument("--json", help="write the summary to this file")
+    args = parser.parse_args()
+
+    results = simulate_runs(
+        args.runs,
+        args.policy,
+        args.script,
+        args.levels,
+        args.seed,
+        args.workers
+    )
+    summary = summarize(results)
+
+    if args.csv:
+        write_csv(args.csv, results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
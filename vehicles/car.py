@@ -1,8 +1,23 @@
 import pygame
-from vehicles.car_stats import CarStats
+from vehicles.car_stats import CarStats, StatStack
+from vehicles.sprite_cache import sprite_cache
+from core.assets import assets
+from settings import DAMPING_REFERENCE_HZ
+
+
+CAR_IMAGE = "assets/images/corvette_c4_grand_sport.png"
+
+# Per-tick drag, tuned at DAMPING_REFERENCE_HZ
+VELOCITY_DRAG = 0.992
+
+# Speed ratio at which each gear starts
+GEAR_RATIOS = (0.0, 0.18, 0.35, 0.55, 0.75, 0.9, 1.0)
 
 
 class Car:
+    # Shared by every car; the quality governor turns shadows off
+    shadows = True
+
     def __init__(self, x, y, stats=None):
         self.position = pygame.Vector2(x, y)
         self.velocity = pygame.Vector2(0, 0)
@@ -10,22 +25,39 @@ class Car:
         self.angle = 0
         self.angular_velocity = 0
 
-        self.original_image = pygame.image.load(
-            "assets/images/corvette_c4_grand_sport.png"
-        ).convert_alpha()
+        # Last physics state, for render interpolation
+        self.previous_position = self.position.copy()
+        self.previous_angle = self.angle
+
+        # Whether the last step was in drift mode (for tire effects)
+        self.drifting = False
+
+        # Surface under the car (a SurfaceGrid), scaling grip and drag;
+        # without one the car drives on tarmac everywhere
+        self.surface_grid = None
+        self.surface = None
 
         self.size = (50, 30)
 
+        # =============================
+        # Sprites (shared rotation cache)
+        # =============================
+        # Loaded on first draw, so cars can be simulated without a display
+        self.image_key = CAR_IMAGE
+        self.shadow_key = ("shadow", self.size)
+        self.original_image = None
+
         # =============================
         # Stats System (Upgrade-Ready)
         # =============================
+        # Base stats are shared, never mutated; upgrades go on the stack
         self.base_stats = stats if stats else CarStats()
-        self.stats = self.base_stats.copy()
+        self.stat_stack = StatStack(self.base_stats)
 
         # =============================
         # Gear System
         # =============================
-        self.gear_ratios = [0.0, 0.18, 0.35, 0.55, 0.75, 0.9, 1.0]
+        self.gear_ratios = list(GEAR_RATIOS)
         self.current_gear = 1
         self.max_gears = len(self.gear_ratios) - 1
         self.engine_rpm = 0.0
@@ -33,43 +65,54 @@ class Car:
     # ==========================================================
     # UPDATE
     # ==========================================================
-    def update(self, dt):
-        keys = pygame.key.get_pressed()
+    def update(self, dt, controls):
+        self.step(
+            dt,
+            controls.throttle,
+            controls.brake,
+            controls.steer,
+            controls.drift,
+        )
+
+    def step(self, dt, throttle, brake, steer_input, drift):
+        self.store_previous_state()
+
+        stats = self.stats
+
+        grip_scale = drag_scale = 1.0
+        surface_grid = self.surface_grid
+        if surface_grid is not None:
+            self.surface = surface_grid.surface_at(*self.position)
+            grip_scale, drag_scale = surface_grid.surface_multipliers[self.surface]
 
         forward = pygame.Vector2(1, 0).rotate(-self.angle)
         right = pygame.Vector2(0, 1).rotate(-self.angle)
 
         speed = self.velocity.length()
-        speed_ratio = min(speed / self.stats.max_speed, 1)
+        speed_ratio = min(speed / stats.max_speed, 1)
 
         # -------------------
         # Acceleration
         # -------------------
         accel_factor = min(max(0, 1 - speed_ratio) * 1.5, 1)
 
-        if keys[pygame.K_w]:
+        if throttle:
             self.velocity += (
-                forward * self.stats.acceleration * accel_factor * dt
+                forward * stats.acceleration * accel_factor * dt
             )
 
-        if keys[pygame.K_s]:
+        if brake:
             self.velocity -= (
-                forward * self.stats.brake_force * dt
+                forward * stats.brake_force * dt
             )
 
         # -------------------
         # Steering
         # -------------------
-        steer_input = 0
-        if keys[pygame.K_a]:
-            steer_input = 1
-        if keys[pygame.K_d]:
-            steer_input = -1
-
         steering_factor = 0.6 + speed_ratio * 0.8
 
         self.angular_velocity += (
-            steer_input * self.stats.turn_speed * steering_factor * dt
+            steer_input * stats.turn_speed * steering_factor * dt
         )
 
         # -------------------
@@ -91,24 +134,25 @@ class Car:
         # -------------------
         # Drift Mode
         # -------------------
-        drifting = keys[pygame.K_SPACE] and speed > 180
+        drifting = drift and speed > 180
+        self.drifting = drifting
 
         if drifting:
-            grip = self.stats.drift_grip
+            grip = stats.drift_grip * grip_scale
 
             # Arcade rear kick
             self.velocity += (
                 right * steer_input *
-                self.stats.drift_assist_force * dt
+                stats.drift_assist_force * dt
             )
 
             # Oversteer rotation
             self.angular_velocity += (
                 slip_angle *
-                self.stats.oversteer_strength * dt
+                stats.oversteer_strength * dt
             )
         else:
-            grip = self.stats.grip
+            grip = stats.grip * grip_scale
 
         lateral_velocity *= max(0, 1 - grip * dt)
         self.velocity = forward_velocity + lateral_velocity
@@ -116,15 +160,19 @@ class Car:
         # -------------------
         # Drag + Speed Cap
         # -------------------
-        self.velocity *= 0.992
+        # Damping constants were tuned per 60 Hz frame; scale them by
+        # dt so handling is the same at any physics rate.
+        damping_steps = dt * DAMPING_REFERENCE_HZ
 
-        if self.velocity.length() > self.stats.max_speed:
-            self.velocity.scale_to_length(self.stats.max_speed)
+        self.velocity *= VELOCITY_DRAG ** (damping_steps * drag_scale)
+
+        if self.velocity.length() > stats.max_speed:
+            self.velocity.scale_to_length(stats.max_speed)
 
         # -------------------
         # Angular Motion
         # -------------------
-        self.angular_velocity *= self.stats.angular_damping
+        self.angular_velocity *= stats.angular_damping ** damping_steps
         self.angle += self.angular_velocity * dt
 
         # -------------------
@@ -136,7 +184,7 @@ class Car:
         # Automatic Gear + RPM
         # ======================================================
         speed = self.velocity.length()
-        speed_ratio = min(speed / self.stats.max_speed, 1)
+        speed_ratio = min(speed / stats.max_speed, 1)
 
         for i in range(1, self.max_gears + 1):
             if speed_ratio < self.gear_ratios[i]:
@@ -153,15 +201,56 @@ class Car:
         gear_progress = max(0, min(gear_progress, 1))
 
         throttle_boost = 0.0
-        if keys[pygame.K_w]:
+        if throttle:
             throttle_boost = 0.15 * (1 - gear_progress)
 
         self.engine_rpm = min(1.0, gear_progress + throttle_boost)
 
+    def store_previous_state(self):
+        self.previous_position.update(self.position)
+        self.previous_angle = self.angle
+
+    def get_render_state(self, alpha):
+        position = self.previous_position.lerp(self.position, alpha)
+        angle = self.previous_angle + (self.angle - self.previous_angle) * alpha
+        return position, angle
+
     # ==========================================================
     # DRAW
     # ==========================================================
-    def draw(self, surface, offset):
+    def draw(self, surface, offset, alpha=1.0):
+        if self.original_image is None:
+            self._load_sprites()
+
+        position, angle = self.get_render_state(alpha)
+
+        if self.shadows:
+            rotated_shadow = sprite_cache.get(self.shadow_key, angle - 90)
+
+            shadow_rect = rotated_shadow.get_rect(
+                center=position - offset + pygame.Vector2(0, 5)
+            )
+
+            surface.blit(rotated_shadow, shadow_rect)
+
+        rotated_surface = sprite_cache.get(self.image_key, angle - 90)
+
+        rotated_rect = rotated_surface.get_rect(
+            center=position - offset
+        )
+
+        surface.blit(rotated_surface, rotated_rect)
+
+    def _load_sprites(self):
+        if not sprite_cache.has_source(self.image_key):
+            sprite_cache.register(self.image_key, assets.image(self.image_key))
+
+        if not sprite_cache.has_source(self.shadow_key):
+            sprite_cache.register(self.shadow_key, self._build_shadow())
+
+        self.original_image = sprite_cache.sources[self.image_key]
+
+    def _build_shadow(self):
         shadow_width = int(self.size[0] * 0.8)
         shadow_height = int(self.size[1] * 2)
 
@@ -176,31 +265,29 @@ class Car:
             shadow_surface.get_rect()
         )
 
-        rotated_shadow = pygame.transform.rotate(
-            shadow_surface,
-            self.angle - 90
-        )
+        return shadow_surface
 
-        shadow_rect = rotated_shadow.get_rect(
-            center=self.position - offset + pygame.Vector2(0, 5)
-        )
+    # ==========================================================
+    # ACCESSORS
+    # ==========================================================
+    @property
+    def stats(self):
+        # Effective stats; read-only, change them through stat_stack
+        return self.stat_stack.effective
 
-        surface.blit(rotated_shadow, shadow_rect)
+    def get_rear_wheel_positions(self, position=None, angle=None):
+        if position is None:
+            position = self.position
+        if angle is None:
+            angle = self.angle
 
-        rotated_surface = pygame.transform.rotate(
-            self.original_image,
-            self.angle - 90
-        )
+        forward = pygame.Vector2(1, 0).rotate(-angle)
+        right = pygame.Vector2(0, 1).rotate(-angle)
 
-        rotated_rect = rotated_surface.get_rect(
-            center=self.position - offset
-        )
+        axle = position - forward * (self.size[0] * 0.3)
+        track = right * (self.size[1] * 0.35)
+        return axle - track, axle + track
 
-        surface.blit(rotated_surface, rotated_rect)
-
-    # ==========================================================
-    # ACCESSORS
-    # ==========================================================
     def get_engine_rpm(self):
         return self.engine_rpm
 
@@ -0,0 +1,295 @@
+import numpy as np
+from vehicles.car import GEAR_RATIOS, VELOCITY_DRAG
+from vehicles.car_stats import CarStats, STAT_NAMES
+from settings import DAMPING_REFERENCE_HZ
+
+
+STAT_COLUMNS = STAT_NAMES
+
+_GEAR_THRESHOLDS = np.array(GEAR_RATIOS[1:], dtype=np.float64)
+_GEAR_LOWER = np.array(GEAR_RATIOS, dtype=np.float64)
+_GEAR_UPPER = np.array(
+    [GEAR_RATIOS[min(i + 1, len(GEAR_RATIOS) - 1)] for i in range(len(GEAR_RATIOS))],
+    dtype=np.float64
+)
+
+
+def _length(vectors):
+    # Same arithmetic as Vector2.length(), which np.hypot can differ from by an ulp
+    return np.sqrt(vectors[:, 0] * vectors[:, 0] + vectors[:, 1] * vectors[:, 1])
+
+
+# Vector2.rotate snaps to a quarter turn within this many radians
+_ROTATE_EPSILON = 1e-6
+_QUARTER_COS = np.array([1.0, 0.0, -1.0, 0.0])
+_QUARTER_SIN = np.array([0.0, 1.0, 0.0, -1.0])
+
+
+def _rotation(degrees):
+    # cos and sin as Vector2.rotate computes them: wrapped to [0, 2pi)
+    # first, and exact at (or very near) multiples of 90 degrees
+    radians = np.fmod(degrees * np.pi / 180, 2 * np.pi)
+    radians[radians < 0] += 2 * np.pi
+
+    cos = np.cos(radians)
+    sin = np.sin(radians)
+
+    quarter = np.fmod(radians + _ROTATE_EPSILON, np.pi / 2) < 2 * _ROTATE_EPSILON
+    if quarter.any():
+        turns = ((radians[quarter] + _ROTATE_EPSILON) / (np.pi / 2)).astype(np.int64) % 4
+        cos[quarter] = _QUARTER_COS[turns]
+        sin[quarter] = _QUARTER_SIN[turns]
+
+    return cos, sin
+
+
+class CarFleet:
+    """
+    Struct-of-arrays car physics for large numbers of cars.
+
+    Runs the same driving model as Car.step, but for every car in one
+    batched NumPy step. Controls are passed per step as arrays (or
+    scalars broadcast to every car). Set surface_grid to scale grip
+    and drag by the surface under each car, as Car does.
+    """
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.capacity = 0
+
+        self.position = np.zeros((0, 2))
+        self.velocity = np.zeros((0, 2))
+        self.angle = np.zeros(0)
+        self.angular_velocity = np.zeros(0)
+        self.current_gear = np.zeros(0, dtype=np.int64)
+        self.engine_rpm = np.zeros(0)
+
+        self.previous_position = np.zeros((0, 2))
+        self.previous_angle = np.zeros(0)
+
+        self.stats = {name: np.zeros(0) for name in STAT_COLUMNS}
+
+        self.surface_grid = None
+
+        self._grow(capacity)
+
+    # ==========================================================
+    # CARS
+    # ==========================================================
+    def add_car(self, x, y, stats=None):
+        if self.count == self.capacity:
+            self._grow(max(1, self.capacity * 2))
+
+        index = self.count
+        self.count += 1
+
+        self.position[index] = (x, y)
+        self.velocity[index] = 0
+        self.angle[index] = 0
+        self.angular_velocity[index] = 0
+        self.current_gear[index] = 1
+        self.engine_rpm[index] = 0
+        self.previous_position[index] = (x, y)
+        self.previous_angle[index] = 0
+
+        self.set_stats(index, stats if stats else CarStats())
+        return index
+
+    def add_from_car(self, car):
+        index = self.add_car(car.position.x, car.position.y, car.stats)
+        self.load_car_state(index, car)
+        return index
+
+    def set_stats(self, index, stats):
+        for name in STAT_COLUMNS:
+            self.stats[name][index] = getattr(stats, name)
+
+    def load_car_state(self, index, car):
+        self.position[index] = car.position
+        self.velocity[index] = car.velocity
+        self.angle[index] = car.angle
+        self.angular_velocity[index] = car.angular_velocity
+        self.current_gear[index] = car.current_gear
+        self.engine_rpm[index] = car.engine_rpm
+        self.previous_position[index] = car.previous_position
+        self.previous_angle[index] = car.previous_angle
+
+    def store_car_state(self, index, car):
+        car.position.update(*self.position[index])
+        car.velocity.update(*self.velocity[index])
+        car.angle = float(self.angle[index])
+        car.angular_velocity = float(self.angular_velocity[index])
+        car.current_gear = int(self.current_gear[index])
+        car.engine_rpm = float(self.engine_rpm[index])
+        car.previous_position.update(*self.previous_position[index])
+        car.previous_angle = float(self.previous_angle[index])
+
+    # ==========================================================
+    # UPDATE
+    # ==========================================================
+    def step(self, dt, throttle, brake, steer_input, drift):
+        n = self.count
+        if n == 0:
+            return
+
+        position = self.position[:n]
+        velocity = self.velocity[:n]
+        angle = self.angle[:n]
+        angular_velocity = self.angular_velocity[:n]
+
+        self.previous_position[:n] = position
+        self.previous_angle[:n] = angle
+
+        throttle = np.broadcast_to(np.asarray(throttle, dtype=bool), (n,))
+        brake = np.broadcast_to(np.asarray(brake, dtype=bool), (n,))
+        steer_input = np.broadcast_to(np.asarray(steer_input, dtype=np.float64), (n,))
+        drift = np.broadcast_to(np.asarray(drift, dtype=bool), (n,))
+
+        acceleration = self.stats["acceleration"][:n]
+        brake_force = self.stats["brake_force"][:n]
+        turn_speed = self.stats["turn_speed"][:n]
+        max_speed = self.stats["max_speed"][:n]
+        grip = self.stats["grip"][:n]
+        drift_grip = self.stats["drift_grip"][:n]
+        angular_damping = self.stats["angular_damping"][:n]
+        oversteer_strength = self.stats["oversteer_strength"][:n]
+
+        grip_scale = drag_scale = 1.0
+        if self.surface_grid is not None:
+            grip_scale, drag_scale = self.surface_grid.multipliers(position)
+            drag_scale = drag_scale[:, None]
+
+        # Car.step rotates (1, 0) and (0, 1) by -angle degrees
+        cos, sin = _rotation(-angle)
+        forward = np.stack((cos, sin), axis=1)
+        right = np.stack((-sin, cos), axis=1)
+
+        speed = _length(velocity)
+        speed_ratio = np.minimum(speed / max_speed, 1)
+
+        # -------------------
+        # Acceleration
+        # -------------------
+        accel_factor = np.minimum(np.maximum(0, 1 - speed_ratio) * 1.5, 1)
+
+        thrust = np.where(throttle, acceleration * accel_factor * dt, 0.0)
+        thrust -= np.where(brake, brake_force * dt, 0.0)
+        velocity += forward * thrust[:, None]
+
+        # -------------------
+        # Steering
+        # -------------------
+        steering_factor = 0.6 + speed_ratio * 0.8
+        angular_velocity += steer_input * turn_speed * steering_factor * dt
+
+        # -------------------
+        # Separate Velocity
+        # -------------------
+        forward_speed = np.einsum("ij,ij->i", velocity, forward)
+        lateral_speed = np.einsum("ij,ij->i", velocity, right)
+
+        # -------------------
+        # Slip Angle
+        # -------------------
+        # Matches Vector2.angle_to: an unwrapped heading difference
+        slip_angle = np.degrees(
+            np.arctan2(forward[:, 1], forward[:, 0]) -
+            np.arctan2(velocity[:, 1], velocity[:, 0])
+        )
+        slip_angle = np.where(speed > 5, slip_angle, 0.0)
+
+        # -------------------
+        # Drift Mode
+        # -------------------
+        # The arcade rear kick in Car.step is overwritten when the
+        # velocity is recombined below, so only oversteer is applied.
+        drifting = drift & (speed > 180)
+
+        angular_velocity += np.where(
+            drifting,
+            slip_angle * oversteer_strength * dt,
+            0.0
+        )
+
+        wheel_grip = np.where(drifting, drift_grip, grip) * grip_scale
+        lateral_speed *= np.maximum(0, 1 - wheel_grip * dt)
+
+        velocity[:] = (
+            forward * forward_speed[:, None] +
+            right * lateral_speed[:, None]
+        )
+
+        # -------------------
+        # Drag + Speed Cap
+        # -------------------
+        damping_steps = dt * DAMPING_REFERENCE_HZ
+
+        velocity *= VELOCITY_DRAG ** (damping_steps * drag_scale)
+
+        speed = _length(velocity)
+        over = speed > max_speed
+        if over.any():
+            velocity[over] *= (max_speed[over] / speed[over])[:, None]
+
+            # Measured again, as Car does: the scaled length can land an
+            # ulp off max_speed, which decides the top gear
+            speed = _length(velocity)
+
+        # -------------------
+        # Angular Motion
+        # -------------------
+        angular_velocity *= angular_damping ** damping_steps
+        angle += angular_velocity * dt
+
+        # -------------------
+        # Position
+        # -------------------
+        position += velocity * dt
+
+        # ======================================================
+        # Automatic Gear + RPM
+        # ======================================================
+        speed_ratio = np.minimum(speed / max_speed, 1)
+
+        gear = np.searchsorted(_GEAR_THRESHOLDS, speed_ratio, side="right")
+        self.current_gear[:n] = gear
+
+        lower = _GEAR_LOWER[gear]
+        upper = _GEAR_UPPER[gear]
+
+        gear_span = np.maximum(upper - lower, 0.001)
+        gear_progress = np.clip((speed_ratio - lower) / gear_span, 0, 1)
+
+        throttle_boost = np.where(throttle, 0.15 * (1 - gear_progress), 0.0)
+        self.engine_rpm[:n] = np.minimum(1.0, gear_progress + throttle_boost)
+
+    # ==========================================================
+    # ACCESSORS
+    # ==========================================================
+    def get_render_positions(self, alpha):
+        n = self.count
+        previous = self.previous_position[:n]
+        return previous + (self.position[:n] - previous) * alpha
+
+    # ==========================================================
+    # STORAGE
+    # ==========================================================
+    def _grow(self, capacity):
+        def grown(array):
+            new = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            new[:self.count] = array[:self.count]
+            return new
+
+        self.position = grown(self.position)
+        self.velocity = grown(self.velocity)
+        self.angle = grown(self.angle)
+        self.angular_velocity = grown(self.angular_velocity)
+        self.current_gear = grown(self.current_gear)
+        self.engine_rpm = grown(self.engine_rpm)
+        self.previous_position = grown(self.previous_position)
+        self.previous_angle = grown(self.previous_angle)
+
+        for name in STAT_COLUMNS:
+            self.stats[name] = grown(self.stats[name])
+
+        self.capacity = capacity
@@ -1,4 +1,21 @@
+STAT_NAMES = (
+    "acceleration",
+    "brake_force",
+    "turn_speed",
+    "max_speed",
+    "grip",
+    "drift_grip",
+    "angular_damping",
+    "drift_assist_force",
+    "oversteer_strength",
+)
+
+STAT_INDEX = {name: i for i, name in enumerate(STAT_NAMES)}
+
+
 class CarStats:
+    __slots__ = STAT_NAMES
+
     def __init__(
         self,
         acceleration=420,
@@ -21,15 +38,112 @@ class CarStats:
         self.drift_assist_force = drift_assist_force
         self.oversteer_strength = oversteer_strength
 
+    @classmethod
+    def from_values(cls, values):
+        return cls(*values)
+
+    def as_tuple(self):
+        return tuple(getattr(self, name) for name in STAT_NAMES)
+
+    def set_values(self, values):
+        for name, value in zip(STAT_NAMES, values):
+            setattr(self, name, value)
+
     def copy(self):
-        return CarStats(
-            self.acceleration,
-            self.brake_force,
-            self.turn_speed,
-            self.max_speed,
-            self.grip,
-            self.drift_grip,
-            self.angular_damping,
-            self.drift_assist_force,
-            self.oversteer_strength,
-        )
+        return CarStats(*self.as_tuple())
+
+
+# ==========================================================
+# MODIFIERS
+# ==========================================================
+
+class StatModifier:
+    ADD = "add"
+    MULTIPLY = "multiply"
+
+    __slots__ = ("stat", "op", "value")
+
+    def __init__(self, stat, op, value):
+        self.stat = stat
+        self.op = op
+        self.value = value
+
+    def __repr__(self):
+        sign = "+" if self.op == StatModifier.ADD else "x"
+        return f"StatModifier({self.stat} {sign}{self.value})"
+
+
+class StatStack:
+    """
+    Base stats plus an ordered stack of applied modifiers.
+
+    The base block is never mutated, so many cars can share one. The
+    effective stats are folded from the stack only after it changes,
+    into a single CarStats that is reused, so reading stats each tick
+    allocates nothing. Entries are stored as an immutable tuple, so a
+    snapshot is just a reference to it.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.entries = ()   # ((source, (StatModifier, ...)), ...)
+
+        self._effective = base.copy()
+        self._dirty = False
+
+    @property
+    def effective(self):
+        if self._dirty:
+            self._recompute()
+        return self._effective
+
+    # ==========================================================
+    # STACK
+    # ==========================================================
+    def push(self, modifiers, source=None, replace=False):
+        # replace drops everything pushed before, like a fresh car
+        entry = (source, tuple(modifiers))
+
+        if replace:
+            self.entries = (entry,)
+        else:
+            self.entries = self.entries + (entry,)
+
+        self._dirty = True
+
+    def clear(self):
+        self.entries = ()
+        self._dirty = True
+
+    def set_base(self, base):
+        self.base = base
+        self._dirty = True
+
+    def snapshot(self):
+        return self.entries
+
+    def restore(self, snapshot):
+        self.entries = snapshot
+        self._dirty = True
+
+    # ==========================================================
+    # INTERNALS
+    # ==========================================================
+    def _recompute(self):
+        values = list(self.base.as_tuple())
+
+        # Applied in order, exactly as if each upgrade had edited the stats
+        for _, modifiers in self.entries:
+            for modifier in modifiers:
+                # Stats from a newer build's save ride along untouched
+                index = STAT_INDEX.get(modifier.stat)
+                if index is None:
+                    continue
+
+                if modifier.op == StatModifier.ADD:
+                    values[index] += modifier.value
+                else:
+                    values[index] *= modifier.value
+
+        self._effective.set_values(values)
+        self._dirty = False
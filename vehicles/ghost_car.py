@@ -0,0 +1,92 @@
+import pygame
+from vehicles.car import Car
+from vehicles.sprite_cache import sprite_cache
+from core.assets import assets
+from systems.replay import ReplayReader
+from settings import GHOST_ALPHA
+
+
+class GhostCar(Car):
+    """
+    A translucent car driven by a replay file.
+
+    Replayed inputs drive the normal physics model (with collision
+    and surfaces, when given a CollisionWorld and SurfaceGrid), and the car is snapped onto each
+    keyframe as it passes, so the ghost stays on the recorded line
+    even where its stats or the track differ from the recording.
+    """
+
+    def __init__(self, replay, tick=0, stats=None, collision=None, surface_grid=None):
+        # A reader passed in belongs to the caller; one opened here is closed by close()
+        self.owns_reader = not isinstance(replay, ReplayReader)
+        self.reader = ReplayReader(replay) if self.owns_reader else replay
+        self.collision = collision
+
+        super().__init__(0, 0, stats)
+        self.surface_grid = surface_grid
+
+        self.image_key = ("ghost", self.image_key)
+        self.shadow_key = ("ghost", self.shadow_key)
+
+        self.seek(tick)
+
+    @property
+    def finished(self):
+        return self.input.finished
+
+    def close(self):
+        if self.owns_reader:
+            self.reader.close()
+
+    def seek(self, tick):
+        # Start from the keyframe before tick and simulate up to it
+        start = 0
+        if self.reader.keyframe_ticks:
+            index = self.reader.keyframe_before(tick)
+            start = self.reader.keyframe_ticks[index]
+            self.reader.keyframe(index).apply(self)
+
+        self.input = self.reader.playback(start)
+
+        dt = 1 / self.reader.physics_hz
+        while self.input.tick < tick and not self.finished:
+            self.advance(dt)
+
+        self.store_previous_state()
+
+    def advance(self, dt):
+        """Play the next recorded tick (Car.update, driven by the replay)."""
+        controls = self.input.sample()
+
+        keyframe = self.input.take_keyframe()
+        if keyframe is not None:
+            keyframe.apply(self)
+
+            # Drawn from the snapped state, not lerped across the snap
+            self.store_previous_state()
+
+        if self.finished:
+            self.store_previous_state()
+            return
+
+        super().update(dt, controls)
+
+        if self.collision is not None:
+            self.collision.resolve(self)
+
+    def _load_sprites(self):
+        base_image, base_shadow = self.image_key[1], self.shadow_key[1]
+
+        if not sprite_cache.has_source(self.image_key):
+            sprite_cache.register(self.image_key, _fade(assets.image(base_image)))
+
+        if not sprite_cache.has_source(self.shadow_key):
+            sprite_cache.register(self.shadow_key, _fade(self._build_shadow()))
+
+        self.original_image = sprite_cache.sources[self.image_key]
+
+
+def _fade(surface):
+    faded = surface.copy()
+    faded.fill((255, 255, 255, GHOST_ALPHA), special_flags=pygame.BLEND_RGBA_MULT)
+    return faded
@@ -0,0 +1,117 @@
+import pygame
+from collections import OrderedDict
+from settings import ROTATION_STEP, ROTATION_CACHE_BUDGET
+
+
+class RotationCache:
+    """
+    Pre-rotated sprite cache shared by every Car.
+
+    Source surfaces are registered once under a key (the image path,
+    or a shadow key) and rotated copies are stored per quantized
+    angle. Least recently used rotations are evicted once the cache
+    grows past its memory budget.
+    """
+
+    def __init__(self, step=ROTATION_STEP, budget=ROTATION_CACHE_BUDGET):
+        self.sources = {}
+        self.entries = OrderedDict()
+
+        self.step = step
+        self.steps_per_turn = max(1, round(360 / step))
+        self.budget = budget
+        self.memory_used = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    # ==========================================================
+    # SOURCES
+    # ==========================================================
+    def has_source(self, key):
+        return key in self.sources
+
+    def register(self, key, surface):
+        if key in self.sources:
+            self._drop_key(key)
+
+        self.sources[key] = surface
+
+    # ==========================================================
+    # LOOKUP
+    # ==========================================================
+    def quantize(self, angle):
+        return round(angle / self.step) % self.steps_per_turn
+
+    def get(self, key, angle):
+        index = self.quantize(angle)
+        entry_key = (key, index)
+
+        rotated = self.entries.get(entry_key)
+        if rotated is not None:
+            self.entries.move_to_end(entry_key)
+            self.hits += 1
+            return rotated
+
+        self.misses += 1
+        return self._build(entry_key)
+
+    def prebuild(self, key):
+        for index in range(self.steps_per_turn):
+            entry_key = (key, index)
+            if entry_key not in self.entries:
+                self._build(entry_key)
+
+    # ==========================================================
+    # CONFIGURATION
+    # ==========================================================
+    def set_step(self, step):
+        if step == self.step:
+            return
+
+        self.step = step
+        self.steps_per_turn = max(1, round(360 / step))
+        self.clear()
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self._evict()
+
+    def clear(self):
+        self.entries.clear()
+        self.memory_used = 0
+
+    # ==========================================================
+    # INTERNALS
+    # ==========================================================
+    def _build(self, entry_key):
+        key, index = entry_key
+
+        rotated = pygame.transform.rotate(
+            self.sources[key],
+            index * 360 / self.steps_per_turn
+        )
+
+        self.entries[entry_key] = rotated
+        self.memory_used += _surface_bytes(rotated)
+        self._evict()
+
+        return rotated
+
+    def _evict(self):
+        # Never evict the entry that was just inserted
+        while self.memory_used > self.budget and len(self.entries) > 1:
+            _, surface = self.entries.popitem(last=False)
+            self.memory_used -= _surface_bytes(surface)
+
+    def _drop_key(self, key):
+        for entry_key in [k for k in self.entries if k[0] == key]:
+            surface = self.entries.pop(entry_key)
+            self.memory_used -= _surface_bytes(surface)
+
+
+def _surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+sprite_cache = RotationCache()
@@ -0,0 +1,92 @@
+import math
+import pygame
+from collections import OrderedDict
+from settings import WORLD_CHUNK_SIZE, DECAL_MAX_CHUNKS
+
+
+SKID_COLOR = (25, 25, 25, 110)
+
+
+class DecalLayer:
+    """
+    Persistent world-space marks (skids), chunked like the world layer.
+
+    Marks are stamped once into transparent chunk surfaces and only
+    blitted afterwards, so a long run's worth of skids costs no more
+    to draw than a fresh track. At most max_chunks chunks are kept;
+    the one stamped least recently is dropped to make room.
+    """
+
+    def __init__(self, chunk_size=WORLD_CHUNK_SIZE, max_chunks=DECAL_MAX_CHUNKS):
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+
+    # ==========================================================
+    # STAMPING
+    # ==========================================================
+    def stamp_line(self, start, end, width=4, color=SKID_COLOR):
+        reach = width / 2 + 1
+        size = self.chunk_size
+
+        left = math.floor((min(start[0], end[0]) - reach) / size)
+        top = math.floor((min(start[1], end[1]) - reach) / size)
+        right = math.floor((max(start[0], end[0]) + reach) / size)
+        bottom = math.floor((max(start[1], end[1]) + reach) / size)
+
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                origin_x = cx * size
+                origin_y = cy * size
+
+                pygame.draw.line(
+                    self._chunk((cx, cy)),
+                    color,
+                    (start[0] - origin_x, start[1] - origin_y),
+                    (end[0] - origin_x, end[1] - origin_y),
+                    width
+                )
+
+    def clear(self):
+        self.chunks.clear()
+
+    def set_max_chunks(self, max_chunks):
+        self.max_chunks = max_chunks
+        while len(self.chunks) > max_chunks:
+            self.chunks.popitem(last=False)
+
+    def _chunk(self, key):
+        chunk = self.chunks.get(key)
+
+        if chunk is None:
+            chunk = pygame.Surface((self.chunk_size, self.chunk_size), pygame.SRCALPHA)
+            self.chunks[key] = chunk
+
+            while len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+
+        return chunk
+
+    # ==========================================================
+    # DRAW
+    # ==========================================================
+    def draw(self, surface, offset):
+        if not self.chunks:
+            return
+
+        size = self.chunk_size
+        left = round(offset.x)
+        top = round(offset.y)
+        width, height = surface.get_size()
+
+        for cx in range(left // size, (left + width) // size + 1):
+            for cy in range(top // size, (top + height) // size + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is not None:
+                    surface.blit(chunk, (cx * size - left, cy * size - top))
+
+    @property
+    def memory_used(self):
+        return len(self.chunks) * self.chunk_size * self.chunk_size * 4
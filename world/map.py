@@ -0,0 +1,460 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pygame
+from settings import WORLD_WIDTH, WORLD_HEIGHT, MAP_CHUNK_BUDGET
+
+
+GRASS_COLOR = (30, 150, 30)
+TARMAC_COLOR = (60, 60, 60)
+GRAVEL_COLOR = (150, 130, 100)
+WALL_COLOR = (200, 200, 200)
+
+
+class TrackShape:
+    def __init__(self, kind, bounds, color, center=None, radius=0):
+        self.kind = kind
+        self.bounds = bounds
+        self.color = color
+        self.center = center
+        self.radius = radius
+
+    def draw(self, surface, offset):
+        if self.kind == "rect":
+            pygame.draw.rect(surface, self.color, self.bounds.move(-offset))
+        elif self.kind == "circle":
+            pygame.draw.circle(surface, self.color, self.center - offset, self.radius)
+
+
+class TrackMap:
+    """
+    Static track geometry in world space.
+
+    Every edit bumps `version` and logs the touched area, so cached
+    rasterizations can rebuild only what changed.
+    """
+
+    def __init__(self, width=WORLD_WIDTH, height=WORLD_HEIGHT, background=GRASS_COLOR):
+        self.width = width
+        self.height = height
+        self.background = background
+
+        self.shapes = []
+        self.walls = []
+
+        self.spawn = pygame.Vector2(width // 2, height // 2)
+
+        self.version = 0
+        self.changes = []   # (version, world rect) per edit
+
+    @classmethod
+    def default(cls):
+        track = cls()
+
+        # Straight
+        track.add_rect(pygame.Rect(1200, 1800, 1600, 200))
+
+        # Hairpin
+        track.add_rect(pygame.Rect(2600, 1400, 400, 400))
+
+        # Drift circle
+        track.add_circle((1800, 1300), 300)
+
+        # Straight barriers
+        track.add_wall(pygame.Rect(1100, 1700, 1800, 20))
+        track.add_wall(pygame.Rect(1100, 2000, 1800, 20))
+
+        # The world centre sits on the lower barrier; start on the straight
+        track.spawn = pygame.Vector2(2000, 1900)
+
+        return track
+
+    # ==========================================================
+    # EDITING
+    # ==========================================================
+    def add_rect(self, rect, color=TARMAC_COLOR):
+        rect = pygame.Rect(rect)
+        self.shapes.append(TrackShape("rect", rect, color))
+        self._changed(rect)
+
+    def add_circle(self, center, radius, color=TARMAC_COLOR):
+        center = pygame.Vector2(center)
+        bounds = pygame.Rect(0, 0, radius * 2, radius * 2)
+        bounds.center = center
+
+        self.shapes.append(TrackShape("circle", bounds, color, center, radius))
+        self._changed(bounds)
+
+    def add_wall(self, rect):
+        rect = pygame.Rect(rect)
+        self.walls.append(rect)
+        self._changed(rect)
+
+    def clear(self):
+        self.shapes.clear()
+        self.walls.clear()
+        self._changed(self.get_bounds())
+
+    def _changed(self, rect):
+        self.version += 1
+        self.changes.append((self.version, rect.inflate(2, 2)))
+
+    def changes_since(self, version):
+        return [rect for change_version, rect in self.changes if change_version > version]
+
+    # ==========================================================
+    # ACCESSORS
+    # ==========================================================
+    def get_bounds(self):
+        return pygame.Rect(0, 0, self.width, self.height)
+
+    # Everything is in memory; these only exist to match TileMap
+    def prefetch(self, rect):
+        pass
+
+    def is_ready(self, region):
+        return True
+
+    # ==========================================================
+    # DRAW
+    # ==========================================================
+    def draw_region(self, surface, region):
+        # Rasterize the world rect `region` into surface at (0, 0)
+        surface.fill(self.background)
+
+        offset = pygame.Vector2(region.topleft)
+        for shape in self.shapes:
+            if shape.bounds.colliderect(region):
+                shape.draw(surface, offset)
+
+        for wall in self.walls:
+            if wall.colliderect(region):
+                pygame.draw.rect(surface, WALL_COLOR, wall.move(-offset))
+
+
+# ==========================================================
+# STREAMED TILE MAPS
+# ==========================================================
+
+MAP_FILE = "map.json"
+MAP_FORMAT_VERSION = 1
+
+
+class ChunkStreamer:
+    """
+    Loads chunks on a background thread and keeps the most recently
+    used ones under a memory budget.
+
+    request() replaces the list of chunks wanted (nearest first), so a
+    camera that moves on never waits behind loads it no longer needs.
+    Finished loads are moved into the cache on the calling thread, and
+    only that thread touches the cache; fetch() loads a chunk there and
+    then, for callers that can't wait for the worker. The budget has to
+    hold every chunk requested at once, or they will evict each other.
+    """
+
+    def __init__(self, load, budget=MAP_CHUNK_BUDGET):
+        self.load = load
+        self.budget = budget
+
+        self.chunks = OrderedDict()
+        self.memory_used = 0
+        self.failed = {}        # key -> the exception its load raised
+
+        self.loads = 0
+        self.evictions = 0
+
+        self._wake = threading.Condition()
+        self._wanted = []
+        self._loading = None
+        self._loaded = []
+        self._worker = None
+
+    # ==========================================================
+    # REQUESTS
+    # ==========================================================
+    def request(self, keys):
+        self.collect()
+
+        missing = []
+        for key in keys:
+            if key in self.chunks:
+                self.chunks.move_to_end(key)
+            elif key not in self.failed:
+                missing.append(key)
+
+        with self._wake:
+            self._wanted = [key for key in missing if key != self._loading]
+
+            if self._wanted:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, daemon=True)
+                    self._worker.start()
+                self._wake.notify_all()
+
+    def get(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def has(self, key):
+        return key in self.chunks or key in self.failed
+
+    def fetch(self, key):
+        """The chunk at key, loaded on the calling thread if it isn't cached."""
+        chunk = self.get(key)
+        if chunk is None:
+            chunk = self.load(key)
+            self._store(key, chunk)
+            self._evict()
+        return chunk
+
+    def wait(self):
+        # Block until everything requested so far is loaded
+        with self._wake:
+            while self._wanted or self._loading is not None:
+                self._wake.wait()
+        self.collect()
+
+    # ==========================================================
+    # CACHE
+    # ==========================================================
+    def collect(self):
+        with self._wake:
+            loaded, self._loaded = self._loaded, []
+
+        for key, chunk, error in loaded:
+            if error is not None:
+                self.failed[key] = error
+            elif key not in self.chunks:
+                self._store(key, chunk)
+
+        self._evict()
+
+    def _store(self, key, chunk):
+        self.chunks[key] = chunk
+        self.memory_used += chunk.nbytes
+        self.loads += 1
+
+    def _evict(self):
+        # Never evict the chunk that was just loaded
+        while self.memory_used > self.budget and len(self.chunks) > 1:
+            _, chunk = self.chunks.popitem(last=False)
+            self.memory_used -= chunk.nbytes
+            self.evictions += 1
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self.collect()
+
+    # ==========================================================
+    # WORKER
+    # ==========================================================
+    def _run(self):
+        while True:
+            with self._wake:
+                while not self._wanted:
+                    self._wake.wait()
+                key = self._wanted.pop(0)
+                self._loading = key
+
+            chunk = error = None
+            try:
+                chunk = self.load(key)
+            except Exception as e:
+                error = e
+
+            with self._wake:
+                self._loaded.append((key, chunk, error))
+                self._loading = None
+                self._wake.notify_all()
+
+
+class TileMap:
+    """
+    Tile map streamed from disk a chunk at a time.
+
+    A map is a directory holding map.json (tile and chunk size, the
+    tile palette, walls and spawn) and one .npy array of tile IDs per
+    non-empty chunk under chunks/. prefetch() streams in the chunks
+    around a rect, and the least recently used are dropped once they
+    pass the memory budget, so memory stays flat however big the world
+    is. Walls stay resident for collision.
+
+    Chunks that are not loaded yet read as the background tile, and
+    is_ready() is False for regions that still have any, so callers
+    know not to cache what they drew from them.
+    """
+
+    def __init__(self, path, meta, budget=MAP_CHUNK_BUDGET):
+        self.path = path
+
+        self.tile_size = meta["tile_size"]
+        self.chunk_tiles = meta["chunk_tiles"]
+        self.chunk_size = self.tile_size * self.chunk_tiles
+        self.chunks_x, self.chunks_y = meta["chunks"]
+
+        self.width = self.chunks_x * self.chunk_size
+        self.height = self.chunks_y * self.chunk_size
+
+        self.tile_names = [tile["name"] for tile in meta["tiles"]]
+        self.palette = np.array([tile["color"] for tile in meta["tiles"]], dtype=np.uint8)
+        self.background_tile = meta["background"]
+        self.background = tuple(int(c) for c in self.palette[self.background_tile])
+
+        self.walls = [pygame.Rect(wall) for wall in meta["walls"]]
+        self.spawn = pygame.Vector2(meta["spawn"])
+
+        # Chunks with a file; every other chunk is all background
+        self.stored = {tuple(key) for key in meta["stored"]}
+
+        # Loaded maps are never edited
+        self.version = 0
+
+        self.streamer = ChunkStreamer(self._load_chunk, budget)
+
+    @classmethod
+    def load(cls, path, budget=MAP_CHUNK_BUDGET):
+        with open(os.path.join(path, MAP_FILE)) as f:
+            meta = json.load(f)
+
+        if meta.get("version") != MAP_FORMAT_VERSION:
+            raise ValueError(f"Unsupported map version: {meta.get('version')}")
+
+        return cls(path, meta, budget)
+
+    def chunk_path(self, key):
+        cx, cy = key
+        return os.path.join(self.path, "chunks", f"{cx}_{cy}.npy")
+
+    def _load_chunk(self, key):
+        chunk = np.load(self.chunk_path(key))
+
+        if chunk.shape != (self.chunk_tiles, self.chunk_tiles):
+            raise ValueError(f"Chunk {key} has shape {chunk.shape}")
+        return chunk
+
+    # ==========================================================
+    # STREAMING
+    # ==========================================================
+    def chunks_in(self, rect):
+        size = self.chunk_size
+
+        first_x = max(0, rect.left // size)
+        first_y = max(0, rect.top // size)
+        last_x = min(self.chunks_x - 1, (rect.right - 1) // size)
+        last_y = min(self.chunks_y - 1, (rect.bottom - 1) // size)
+
+        for cy in range(first_y, last_y + 1):
+            for cx in range(first_x, last_x + 1):
+                yield cx, cy
+
+    def prefetch(self, rect):
+        """Stream in the chunks overlapping rect, nearest its centre first."""
+        size = self.chunk_size
+        center_x, center_y = rect.center
+
+        keys = [key for key in self.chunks_in(rect) if key in self.stored]
+        keys.sort(key=lambda key: (
+            ((key[0] + 0.5) * size - center_x) ** 2 +
+            ((key[1] + 0.5) * size - center_y) ** 2
+        ))
+
+        self.streamer.request(keys)
+
+    def is_ready(self, region):
+        self.streamer.collect()
+        return all(
+            self.streamer.has(key)
+            for key in self.chunks_in(region)
+            if key in self.stored
+        )
+
+    # ==========================================================
+    # TILES
+    # ==========================================================
+    def chunk(self, key):
+        """
+        Tiles of chunk key, loaded on the calling thread if it isn't
+        streamed in, or None if it is all background. For physics,
+        which can't read unloaded chunks as background.
+        """
+        if key not in self.stored:
+            return None
+        return self.streamer.fetch(key)
+
+    def read_tiles(self, first_x, first_y, last_x, last_y, load=False):
+        """
+        Tile IDs for tile columns first_x..last_x-1 and rows first_y..last_y-1.
+
+        Chunks not streamed in read as background, unless load is set.
+        """
+        tiles = np.full((last_y - first_y, last_x - first_x), self.background_tile, dtype=np.uint8)
+        n = self.chunk_tiles
+
+        for cy in range(max(0, first_y // n), min(self.chunks_y, -(-last_y // n))):
+            for cx in range(max(0, first_x // n), min(self.chunks_x, -(-last_x // n))):
+                if load:
+                    chunk = self.chunk((cx, cy))
+                else:
+                    chunk = self.streamer.get((cx, cy))
+                if chunk is None:
+                    continue
+
+                # Overlap of this chunk with the requested tiles
+                left = max(first_x, cx * n)
+                top = max(first_y, cy * n)
+                right = min(last_x, (cx + 1) * n)
+                bottom = min(last_y, (cy + 1) * n)
+
+                tiles[top - first_y:bottom - first_y, left - first_x:right - first_x] = (
+                    chunk[top - cy * n:bottom - cy * n, left - cx * n:right - cx * n]
+                )
+
+        return tiles
+
+    def tile_at(self, x, y):
+        tile_x = int(x // self.tile_size)
+        tile_y = int(y // self.tile_size)
+        return int(self.read_tiles(tile_x, tile_y, tile_x + 1, tile_y + 1)[0, 0])
+
+    # ==========================================================
+    # ACCESSORS
+    # ==========================================================
+    def get_bounds(self):
+        return pygame.Rect(0, 0, self.width, self.height)
+
+    def changes_since(self, version):
+        return []
+
+    # ==========================================================
+    # DRAW
+    # ==========================================================
+    def draw_region(self, surface, region):
+        # One pixel per tile, scaled up in a single blit
+        size = self.tile_size
+        first_x = region.left // size
+        first_y = region.top // size
+        last_x = -(-region.right // size)
+        last_y = -(-region.bottom // size)
+
+        tiles = self.read_tiles(first_x, first_y, last_x, last_y)
+        pixels = pygame.surfarray.make_surface(self.palette[tiles.T])
+        scaled = pygame.transform.scale(pixels, (tiles.shape[1] * size, tiles.shape[0] * size))
+
+        surface.blit(scaled, (first_x * size - region.left, first_y * size - region.top))
+
+        offset = pygame.Vector2(region.topleft)
+        for wall in self.walls:
+            if wall.colliderect(region):
+                pygame.draw.rect(surface, WALL_COLOR, wall.move(-offset))
+
+
+def load_track(path):
+    """The tile map baked at path, or the built-in track if there is none."""
+    if path and os.path.exists(os.path.join(path, MAP_FILE)):
+        return TileMap.load(path)
+    return TrackMap.default()
@@ -7,18 +7,16 @@ class Player:
         self.position = pygame.Vector2(x, y)
         self.speed = 600  # fast for testing
 
-    def update(self, dt):
-        keys = pygame.key.get_pressed()
-
+    def update(self, dt, controls):
         direction = pygame.Vector2(0, 0)
 
-        if keys[pygame.K_w]:
+        if controls.throttle:
             direction.y -= 1
-        if keys[pygame.K_s]:
+        if controls.brake:
             direction.y += 1
-        if keys[pygame.K_a]:
+        if controls.left:
             direction.x -= 1
-        if keys[pygame.K_d]:
+        if controls.right:
             direction.x += 1
 
         if direction.length() > 0:
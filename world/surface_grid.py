@@ -0,0 +1,343 @@
+import math
+import numpy as np
+from world.map import TileMap, ChunkStreamer, TARMAC_COLOR, GRAVEL_COLOR
+from settings import (
+    SURFACE_CELL_SIZE, SURFACE_MAX_DISTANCE, SURFACE_DISTANCE_BUDGET,
+    SURFACE_GRIP, SURFACE_DRAG
+)
+
+
+class SurfaceType:
+    GRASS = 0       # everything off the track
+    TARMAC = 1
+    GRAVEL = 2
+
+
+SURFACE_NAMES = ("grass", "tarmac", "gravel")
+
+# Track shapes are tarmac unless painted as gravel
+SHAPE_SURFACES = {
+    TARMAC_COLOR: SurfaceType.TARMAC,
+    GRAVEL_COLOR: SurfaceType.GRAVEL,
+}
+
+
+class SurfaceGrid:
+    """
+    Surface type and distance to the track edge, baked per grid cell.
+
+    Every cell holds the surface under its centre and the signed
+    distance from there to the edge of the track (negative on the
+    track, positive off it), so lookups are an index instead of a
+    geometric test against every shape. Distances are exact off the
+    track and a lower bound on it where shapes overlap; anything
+    further off than max_distance reads as max_distance, which keeps
+    the bake to the cells around each shape.
+
+    Streamed tile maps are too big to bake up front. Each cell reads
+    the tile under its centre when asked, loading that chunk through
+    the map's streamer if it isn't in. Distances are baked a block of
+    cells at a time, from the tiles around the block, and the blocks
+    are kept in a ChunkStreamer of their own under a memory budget.
+    They are measured between cell centres, so they are good to about
+    half a cell.
+
+    Scalar lookups take x, y; batched ones take an (n, 2) array of
+    positions. Anywhere off the grid is grass, max_distance away.
+    """
+
+    def __init__(self, world_map, cell_size=SURFACE_CELL_SIZE, max_distance=SURFACE_MAX_DISTANCE):
+        self.world_map = world_map
+        self.cell_size = cell_size
+        self.max_distance = max_distance
+        self.tiled = isinstance(world_map, TileMap)
+
+        self.grip = np.array([SURFACE_GRIP[name] for name in SURFACE_NAMES])
+        self.drag = np.array([SURFACE_DRAG[name] for name in SURFACE_NAMES])
+
+        # (grip, drag) as plain floats for the per-car path, by surface
+        self.surface_multipliers = tuple(zip(self.grip.tolist(), self.drag.tolist()))
+
+        self.bake()
+
+    # ==========================================================
+    # BAKING
+    # ==========================================================
+    def sync(self):
+        if self.world_map.version != self.map_version:
+            self.bake()
+
+    def bake(self):
+        bounds = self.world_map.get_bounds()
+        size = self.cell_size
+
+        self.columns = math.ceil(bounds.width / size)
+        self.rows = math.ceil(bounds.height / size)
+
+        if self.tiled:
+            self._bake_tiles()
+        else:
+            self.surface, self.distance = self._bake_shapes()
+
+            # Python lists index several times faster than NumPy for one cell
+            self._surface_rows = self.surface.tolist()
+
+        self.map_version = self.world_map.version
+
+    def _bake_shapes(self):
+        size = self.cell_size
+
+        # Cell centres in world space; float32 halves the bake time
+        x = ((np.arange(self.columns, dtype=np.float32) + 0.5) * size)[None, :]
+        y = ((np.arange(self.rows, dtype=np.float32) + 0.5) * size)[:, None]
+
+        surface = np.full((self.rows, self.columns), SurfaceType.GRASS, dtype=np.uint8)
+        distance = np.full((self.rows, self.columns), self.max_distance, dtype=np.float32)
+
+        # Later shapes cover earlier ones, as they are drawn
+        for shape in self.world_map.shapes:
+            # Cells past max_distance from the shape keep the clamp
+            reach = shape.bounds.inflate(self.max_distance * 2, self.max_distance * 2)
+            first_column = max(0, reach.left // size)
+            first_row = max(0, reach.top // size)
+            last_column = min(self.columns, -(-reach.right // size))
+            last_row = min(self.rows, -(-reach.bottom // size))
+
+            if first_column >= last_column or first_row >= last_row:
+                continue
+
+            cells = (slice(first_row, last_row), slice(first_column, last_column))
+            cell_x = x[:, cells[1]]
+            cell_y = y[cells[0], :]
+
+            if shape.kind == "rect":
+                rect = shape.bounds
+                qx = np.abs(cell_x - rect.centerx) - rect.width / 2
+                qy = np.abs(cell_y - rect.centery) - rect.height / 2
+                shape_distance = (
+                    np.hypot(np.maximum(qx, 0), np.maximum(qy, 0)) +
+                    np.minimum(np.maximum(qx, qy), 0)
+                )
+            else:
+                shape_distance = np.hypot(cell_x - shape.center.x, cell_y - shape.center.y) - shape.radius
+
+            surface[cells][shape_distance < 0] = SHAPE_SURFACES.get(shape.color, SurfaceType.TARMAC)
+            np.minimum(distance[cells], shape_distance, out=distance[cells])
+
+        return surface, distance
+
+    def _bake_tiles(self):
+        # Nothing is read here; tiles are looked up, and distance blocks
+        # baked, as they are first asked for
+        world_map = self.world_map
+
+        # Tiles named after a surface are that surface; other track
+        # tiles are tarmac, as unpainted shapes are
+        tile_surfaces = [
+            SURFACE_NAMES.index(name) if name in SURFACE_NAMES else
+            SurfaceType.GRASS if tile == world_map.background_tile else
+            SurfaceType.TARMAC
+            for tile, name in enumerate(world_map.tile_names)
+        ]
+        self.tile_surfaces = np.array(tile_surfaces, dtype=np.uint8)
+        self.track_tiles = np.arange(len(tile_surfaces)) != world_map.background_tile
+
+        # Plain ints for the per-car path
+        self._tile_surfaces = tuple(tile_surfaces)
+        self._background_surface = tile_surfaces[world_map.background_tile]
+
+        # Tiles per cell, to find the tile under a cell's centre
+        self._tile_step = self.cell_size / world_map.tile_size
+
+        # A block of distances per map chunk
+        self.block_cells = max(1, world_map.chunk_size // self.cell_size)
+        self.distance_blocks = ChunkStreamer(self._bake_distance_block, SURFACE_DISTANCE_BUDGET)
+
+    def _bake_distance_block(self, key):
+        # Every cell within max_distance of the block is in the window,
+        # so its distances match a bake of the whole map
+        bx, by = key
+        n = self.block_cells
+        reach = math.ceil(self.max_distance / self.cell_size) + 1
+
+        first_column = max(0, bx * n - reach)
+        first_row = max(0, by * n - reach)
+        last_column = min(self.columns, (bx + 1) * n + reach)
+        last_row = min(self.rows, (by + 1) * n + reach)
+
+        # Tiles under each cell centre in the window
+        step = self._tile_step
+        tile_x = ((np.arange(first_column, last_column) + 0.5) * step).astype(np.int64)
+        tile_y = ((np.arange(first_row, last_row) + 0.5) * step).astype(np.int64)
+        tiles = self.world_map.read_tiles(
+            tile_x[0], tile_y[0], tile_x[-1] + 1, tile_y[-1] + 1, load=True
+        )
+        on_track = self.track_tiles[tiles[np.ix_(tile_y - tile_y[0], tile_x - tile_x[0])]]
+
+        # Centre to centre, less half a cell to reach the edge between them
+        half = self.cell_size / 2
+        outside = self._distance_to(on_track) - half
+        inside = self._distance_to(~on_track) - half
+
+        distance = np.where(on_track, -inside, outside)
+        np.clip(distance, -self.max_distance, self.max_distance, out=distance)
+
+        # Crop the window back to the block
+        top = by * n - first_row
+        left = bx * n - first_column
+        return distance[top:top + n, left:left + n].astype(np.float32)
+
+    def _distance_to(self, mask):
+        """Distance from each cell centre to the nearest masked one (inf past max_distance)."""
+        size = self.cell_size
+        reach = math.ceil(self.max_distance / size) + 1
+        rows, columns = mask.shape
+
+        # Exact Euclidean distance, one axis at a time: squared cells to
+        # the nearest masked cell in each column, then across the rows.
+        # Anything further than reach cells stays infinite.
+        column_squared = np.where(mask, 0.0, np.inf).astype(np.float32)
+        for k in range(1, min(reach, rows) + 1):
+            square = np.float32(k * k)
+            np.minimum(column_squared[:-k], np.where(mask[k:], square, np.inf), out=column_squared[:-k])
+            np.minimum(column_squared[k:], np.where(mask[:-k], square, np.inf), out=column_squared[k:])
+
+        squared = column_squared.copy()
+        for k in range(1, min(reach, columns) + 1):
+            square = np.float32(k * k)
+            np.minimum(squared[:, :-k], column_squared[:, k:] + square, out=squared[:, :-k])
+            np.minimum(squared[:, k:], column_squared[:, :-k] + square, out=squared[:, k:])
+
+        return np.sqrt(squared) * size
+
+    # ==========================================================
+    # SCALAR LOOKUPS
+    # ==========================================================
+    def _cell(self, x, y):
+        # Same rounding as the batched lookups, so Car and CarFleet agree
+        column = math.floor(x / self.cell_size)
+        row = math.floor(y / self.cell_size)
+
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return row, column
+        return None
+
+    def surface_at(self, x, y):
+        # Inlined _cell: this runs for every car on every tick
+        column = math.floor(x / self.cell_size)
+        row = math.floor(y / self.cell_size)
+
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            if self.tiled:
+                return self._tile_surface(row, column)
+            return self._surface_rows[row][column]
+        return SurfaceType.GRASS
+
+    def _tile_surface(self, row, column):
+        world_map = self.world_map
+        n = world_map.chunk_tiles
+
+        tile_x = int((column + 0.5) * self._tile_step)
+        tile_y = int((row + 0.5) * self._tile_step)
+
+        tiles = world_map.chunk((tile_x // n, tile_y // n))
+        if tiles is None:
+            return self._background_surface
+        return self._tile_surfaces[tiles.item(tile_y % n, tile_x % n)]
+
+    def distance_at(self, x, y):
+        cell = self._cell(x, y)
+        if cell is None:
+            return self.max_distance
+
+        if self.tiled:
+            row, column = cell
+            n = self.block_cells
+            block = self.distance_blocks.fetch((column // n, row // n))
+            return float(block[row % n, column % n])
+        return float(self.distance[cell])
+
+    def on_track_at(self, x, y):
+        return self.distance_at(x, y) < 0
+
+    # ==========================================================
+    # BATCHED LOOKUPS
+    # ==========================================================
+    def _cells(self, positions):
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+
+        columns = np.floor(positions[:, 0] / self.cell_size).astype(np.int64)
+        rows = np.floor(positions[:, 1] / self.cell_size).astype(np.int64)
+
+        inside = (columns >= 0) & (columns < self.columns) & (rows >= 0) & (rows < self.rows)
+
+        # Outside cells read (0, 0) and are overwritten by the caller
+        return np.where(inside, rows, 0), np.where(inside, columns, 0), inside
+
+    def _tiles_under(self, rows, columns):
+        """Tile IDs under the centres of the given cells, loading chunks as needed."""
+        world_map = self.world_map
+        n = world_map.chunk_tiles
+
+        tile_x = ((columns + 0.5) * self._tile_step).astype(np.int64)
+        tile_y = ((rows + 0.5) * self._tile_step).astype(np.int64)
+
+        tiles = np.full(len(rows), world_map.background_tile, dtype=np.uint8)
+        chunk_x = tile_x // n
+        chunk_y = tile_y // n
+
+        for key in set(zip(chunk_x.tolist(), chunk_y.tolist())):
+            chunk = world_map.chunk(key)
+            if chunk is None:
+                continue
+
+            in_chunk = (chunk_x == key[0]) & (chunk_y == key[1])
+            tiles[in_chunk] = chunk[tile_y[in_chunk] % n, tile_x[in_chunk] % n]
+
+        return tiles
+
+    def surfaces_at(self, positions):
+        rows, columns, inside = self._cells(positions)
+
+        if self.tiled:
+            surface = self.tile_surfaces[self._tiles_under(rows, columns)]
+        else:
+            surface = self.surface[rows, columns]
+        return np.where(inside, surface, SurfaceType.GRASS)
+
+    def distances_at(self, positions):
+        rows, columns, inside = self._cells(positions)
+
+        if self.tiled:
+            distance = self._block_distances(rows, columns)
+        else:
+            distance = self.distance[rows, columns]
+        return np.where(inside, distance, self.max_distance)
+
+    def _block_distances(self, rows, columns):
+        n = self.block_cells
+        block_x = columns // n
+        block_y = rows // n
+
+        distance = np.empty(len(rows), dtype=np.float32)
+        for key in set(zip(block_x.tolist(), block_y.tolist())):
+            block = self.distance_blocks.fetch(key)
+
+            in_block = (block_x == key[0]) & (block_y == key[1])
+            distance[in_block] = block[rows[in_block] % n, columns[in_block] % n]
+
+        return distance
+
+    def on_track(self, positions):
+        return self.distances_at(positions) < 0
+
+    # ==========================================================
+    # PHYSICS
+    # ==========================================================
+    def multipliers_at(self, x, y):
+        """(grip, drag) multipliers for the surface at x, y."""
+        return self.surface_multipliers[self.surface_at(x, y)]
+
+    def multipliers(self, positions):
+        surfaces = self.surfaces_at(positions)
+        return self.grip[surfaces], self.drag[surfaces]
@@ -0,0 +1,110 @@
+import pygame
+from collections import OrderedDict
+from settings import WORLD_CHUNK_SIZE, WORLD_LAYER_MAX_CHUNKS
+
+
+class ChunkedWorldLayer:
+    """
+    Static world rasterized once into fixed-size chunk surfaces.
+
+    Chunks are built the first time they come into view and only
+    rebuilt when the map reports a change that touches them. Each
+    frame blits just the chunks that overlap the viewport. At most
+    max_chunks are kept, dropping the least recently drawn, and chunks
+    of a streamed map that isn't loaded there yet are drawn uncached.
+    """
+
+    def __init__(self, world_map, chunk_size=WORLD_CHUNK_SIZE, max_chunks=WORLD_LAYER_MAX_CHUNKS):
+        self.world_map = world_map
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+
+        self.chunks = OrderedDict()
+        self.map_version = world_map.version
+
+        bounds = world_map.get_bounds()
+        self.chunks_x = -(-bounds.width // chunk_size)
+        self.chunks_y = -(-bounds.height // chunk_size)
+
+    # ==========================================================
+    # CHUNKS
+    # ==========================================================
+    def sync(self):
+        if self.world_map.version == self.map_version:
+            return
+
+        for rect in self.world_map.changes_since(self.map_version):
+            for key in self.chunks_in(rect):
+                self.chunks.pop(key, None)
+
+        self.map_version = self.world_map.version
+
+    def chunks_in(self, rect):
+        size = self.chunk_size
+
+        first_x = max(0, rect.left // size)
+        first_y = max(0, rect.top // size)
+        last_x = min(self.chunks_x - 1, (rect.right - 1) // size)
+        last_y = min(self.chunks_y - 1, (rect.bottom - 1) // size)
+
+        for cy in range(first_y, last_y + 1):
+            for cx in range(first_x, last_x + 1):
+                yield cx, cy
+
+    def get_chunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        # Checked first: a load landing mid-build is picked up next frame
+        ready = self.world_map.is_ready(self.chunk_region(key))
+        chunk = self.build_chunk(key)
+
+        if ready:
+            self.chunks[key] = chunk
+            while len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+
+        return chunk
+
+    def chunk_region(self, key):
+        cx, cy = key
+        size = self.chunk_size
+        return pygame.Rect(cx * size, cy * size, size, size)
+
+    def build_chunk(self, key):
+        region = self.chunk_region(key)
+        chunk = pygame.Surface(region.size).convert()
+        self.world_map.draw_region(chunk, region)
+
+        return chunk
+
+    def prebuild(self):
+        # Only as many as the cache holds; the rest build on demand
+        for key in self.chunks_in(self.world_map.get_bounds()):
+            if len(self.chunks) >= self.max_chunks:
+                break
+            self.get_chunk(key)
+
+    # ==========================================================
+    # DRAW
+    # ==========================================================
+    def draw(self, surface, offset):
+        self.sync()
+
+        left = round(offset.x)
+        top = round(offset.y)
+        view = pygame.Rect(left, top, *surface.get_size())
+
+        # Chunks cover the whole world; only fill what lies outside it
+        if not self.world_map.get_bounds().contains(view):
+            surface.fill(self.world_map.background)
+
+        size = self.chunk_size
+        for key in self.chunks_in(view):
+            cx, cy = key
+            surface.blit(
+                self.get_chunk(key),
+                (cx * size - left, cy * size - top)
+            )